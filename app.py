@@ -1,9 +1,15 @@
 import streamlit as st
+from backend.candidate_store import content_hash
+from backend.captcha_service import get_captcha_service
 from backend.document_extractor import extract_text
-from backend.resume_analyzer import get_semantic_analysis
-import random
-import string
-from captcha.image import ImageCaptcha
+from backend.job_queue import submit, get_job, start_workers, DONE, FAILED
+from backend.profiling import start_from_env
+from backend.result_view import (RANKED_PAGE_SIZE, RECRUITER_MODE, RESUME_PAGE_CHARS, SKILL_PAGE_SIZE,
+                                 analysis_fragments, chips_html, ranked_rows, result_hash, text_pages)
+import hashlib
+import json
+import os
+import time
 
 st.set_page_config(layout="wide")
 
@@ -14,6 +20,8 @@ if "analysis_done" not in st.session_state:
     st.session_state.analysis_done = False
 if "analysis_result" not in st.session_state:
     st.session_state.analysis_result = None
+if "job_id" not in st.session_state:
+    st.session_state.job_id = None
 if "extracted_text" not in st.session_state:
     st.session_state.extracted_text = None
 if "page" not in st.session_state:
@@ -22,10 +30,26 @@ if "user_name" not in st.session_state:
     st.session_state.user_name = ""
 if "user_email" not in st.session_state:
     st.session_state.user_email = ""
-if "captcha_answer" not in st.session_state:
-    st.session_state.captcha_answer = ""
-if "captcha_question" not in st.session_state:
-    st.session_state.captcha_question = ""
+if "captcha_token" not in st.session_state:
+    st.session_state.captcha_token = ""
+if "submitted_resumes" not in st.session_state:
+    st.session_state.submitted_resumes = []
+
+# Background workers run the analyses so the UI returns immediately. They are started
+# once per server process; set PROSCAN_WORKERS=0 when running `python -m backend.job_queue`
+# separately instead.
+@st.cache_resource
+def _start_job_workers():
+    return start_workers(int(os.environ.get("PROSCAN_WORKERS", "2")))
+
+_start_job_workers()
+
+# With PROSCAN_PROFILE=stacks, the server process is sampled too (see backend/profiling.py).
+@st.cache_resource
+def _start_profiling():
+    start_from_env()
+
+_start_profiling()
 
 # Theme Toggle Button
 def toggle_theme():
@@ -202,25 +226,69 @@ def landing_page():
             st.rerun()
         st.markdown("</div>", unsafe_allow_html=True)
 
+def display_chips(chips, key):
+    """Shows skill chips a page at a time, with a button to show more."""
+    shown_key = f"chips_shown_{key}"
+    shown = st.session_state.get(shown_key, SKILL_PAGE_SIZE)
+    st.markdown(chips_html(chips[:shown]), unsafe_allow_html=True)
+    if len(chips) > shown:
+        if st.button(f"Show more ({len(chips) - shown} left)", key=f"more_{key}"):
+            st.session_state[shown_key] = shown + SKILL_PAGE_SIZE
+            st.rerun()
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _ranked_page(jd_text, page, content_hashes):
+    from backend.candidate_store import CandidateStore
+
+    store = CandidateStore()
+    try:
+        jd_id = store.find_job_description_id(jd_text)
+        if jd_id is None:
+            return 0, []
+        offset = (page - 1) * RANKED_PAGE_SIZE
+        hashes = None if content_hashes is None else list(content_hashes)
+        analyses = store.ranked_analyses(jd_id, RANKED_PAGE_SIZE, offset, hashes)
+        return store.count_analyses(jd_id, hashes), ranked_rows(analyses, offset, show_email=RECRUITER_MODE)
+    finally:
+        store.close()
+
+def display_ranked_candidates(jd_text):
+    """
+    Compact table of the candidates analyzed against this job description, best first:
+    every stored candidate in recruiter mode, otherwise the resumes submitted in this session.
+    """
+    content_hashes = None if RECRUITER_MODE else tuple(st.session_state.submitted_resumes)
+    total, rows = _ranked_page(jd_text, st.session_state.get("ranked_page", 1), content_hashes)
+    if total < 2:
+        return
+    with st.expander(f"🏆 All {total} candidates for this job description"):
+        pages = (total + RANKED_PAGE_SIZE - 1) // RANKED_PAGE_SIZE
+        if pages > 1:
+            page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key="ranked_page")
+            total, rows = _ranked_page(jd_text, page, content_hashes)
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+
 def display_analysis(analysis_result, extracted_text):
     if not analysis_result or "error" in analysis_result:
         error_message = analysis_result.get("details", "An unknown error occurred.") if analysis_result else "Analysis result is empty."
         st.error(f"Failed to perform analysis. Please try again. Error: {error_message}")
         return
 
-    # Calculate scores and colors
-    similarity_score = analysis_result.get("match_score", 0)
-    color = "red" if similarity_score < 20 else "yellow" if similarity_score < 50 else "lightgreen" if similarity_score < 70 else "green"
+    duplicate_of = analysis_result.get("duplicate_of")
+    if duplicate_of:
+        st.info(
+            f"This resume is nearly identical ({duplicate_of['similarity']:.0%} similar) to candidate "
+            f"#{duplicate_of['candidate_id']}, who was analyzed before."
+        )
+    if analysis_result.get("degraded"):
+        st.warning("The AI analysis took too long, so this is a quick skill-based score. Run the analysis again for the full report.")
 
-    # Skills Analysis
-    skills_analysis = analysis_result.get("skills_analysis", {})
-    all_matching_skills = []
-    all_missing_skills = []
-    
-    for skill_type in ["technical_skills", "soft_skills", "keywords"]:
-        if skill_type in skills_analysis:
-            all_matching_skills.extend(skills_analysis[skill_type].get("matching", []))
-            all_missing_skills.extend(skills_analysis[skill_type].get("missing", []))
+    # HTML for the score ring, skill chips and course cards is built once per result
+    # and reused on every rerun.
+    analysis_key = st.session_state.get("analysis_key") or result_hash(analysis_result)
+    fragments = analysis_fragments(analysis_result, analysis_key)
+    all_matching_skills = fragments["matching_chips"]
+    all_missing_skills = fragments["missing_chips"]
 
     # Main Analysis Container
     st.markdown("""
@@ -252,17 +320,7 @@ def display_analysis(analysis_result, extracted_text):
     st.markdown('<div class="analysis-section">', unsafe_allow_html=True)
     col1, col2 = st.columns([1, 2])
     with col1:
-        st.markdown(f"""
-            <div style="display: flex; justify-content: center;">
-                <div style="position: relative; width: 200px; height: 200px;">
-                    <svg width="200" height="200" viewBox="0 0 200 200">
-                        <circle cx="100" cy="100" r="90" fill="none" stroke="#e6e6e6" stroke-width="10"></circle>
-                        <circle cx="100" cy="100" r="90" fill="none" stroke="{color}" stroke-width="10" stroke-dasharray="{2 * 3.14159 * 90}" stroke-dashoffset="{2 * 3.14159 * 90 * (1 - similarity_score / 100)}" transform="rotate(-90 100 100)"></circle>
-                    </svg>
-                    <div style="position: absolute; top: 50%; left: 50%; transform: translate(-50%, -50%); font-size: 2rem; font-weight: bold;">{similarity_score}%</div>
-                </div>
-            </div>
-        """, unsafe_allow_html=True)
+        st.markdown(fragments["score_ring"], unsafe_allow_html=True)
     with col2:
         st.markdown("<h3 class='section-heading'>📝 Executive Summary</h3>", unsafe_allow_html=True)
         st.write(analysis_result.get("executive_summary", "No summary available."))
@@ -276,11 +334,7 @@ def display_analysis(analysis_result, extracted_text):
         st.markdown("<h4 class='section-heading'>💫 Matching Skills</h4>", unsafe_allow_html=True)
         if all_matching_skills:
             st.success(f"✨ Found {len(all_matching_skills)} matching skills:")
-            st.markdown(f"""
-                <div style="display: flex; flex-wrap: wrap; gap: 10px;">
-                    {''.join([f'<span style="background-color: #2E8B57; color: white; padding: 5px 10px; border-radius: 15px;">{skill} ✓</span>' for skill in all_matching_skills])}
-                </div>
-            """, unsafe_allow_html=True)
+            display_chips(all_matching_skills, f"matching_{analysis_key}")
         else:
             st.info("No direct skill matches found 🔍")
     
@@ -288,11 +342,7 @@ def display_analysis(analysis_result, extracted_text):
         st.markdown("<h4 class='section-heading'>🎯 Missing Skills</h4>", unsafe_allow_html=True)
         if all_missing_skills:
             st.warning(f"⚠️ Identified {len(all_missing_skills)} potential gaps:")
-            st.markdown(f"""
-                <div style="display: flex; flex-wrap: wrap; gap: 10px;">
-                    {''.join([f'<span style="background-color: #FF4500; color: white; padding: 5px 10px; border-radius: 15px;">{skill} ⚡</span>' for skill in all_missing_skills])}
-                </div>
-            """, unsafe_allow_html=True)
+            display_chips(all_missing_skills, f"missing_{analysis_key}")
         else:
             st.success("✅ No significant skill gaps identified!")
     st.markdown('</div>', unsafe_allow_html=True)
@@ -321,36 +371,29 @@ def display_analysis(analysis_result, extracted_text):
     # Learning Recommendations Section
     st.markdown('<div class="analysis-section">', unsafe_allow_html=True)
     st.markdown('<h3 class="section-heading">📚 Recommended Learning</h3>', unsafe_allow_html=True)
-    recommended_courses = analysis_result.get("recommended_courses", [])
-    if recommended_courses:
-        for course in recommended_courses:
-            # Udemy search URL with filters for top-rated courses
-            search_url = (
-                'https://www.udemy.com/courses/search/'
-                f'?q={course["skill"].replace(" ", "%20")}'
-                '&sort=rating'  # Sort by rating
-                '&ratings=4.5'  # Minimum 4.5 stars
-                '&instructional_level=all'
-            )
-            
-            st.markdown(f"""
-            <div class="course-card">
-                <div class="course-title">
-                    <a href="{search_url}" target="_blank">Find top-rated courses for: {course['skill']}</a>
-                </div>
-                <div class="course-description">
-                    {course['description']}
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+    if fragments["courses"]:
+        st.markdown("".join(fragments["courses"]), unsafe_allow_html=True)
     else:
         st.info("No specific course recommendations at this time.")
     st.markdown('</div>', unsafe_allow_html=True)
 
-    # Original Resume Section (Collapsible)
+    # Original Resume Section (Collapsible), one page at a time
     with st.expander("View Original Resume"):
         if extracted_text:
-            st.code(extracted_text)
+            pages = text_pages(extracted_text, RESUME_PAGE_CHARS)
+            page = 1
+            if len(pages) > 1:
+                page = st.number_input(f"Page (of {len(pages)})", min_value=1, max_value=len(pages), value=1,
+                                       key=f"resume_page_{analysis_key}")
+            start, end = pages[page - 1]
+            st.code(extracted_text[start:end])
+
+    st.download_button(
+        "⬇️ Download analysis (JSON)",
+        json.dumps(analysis_result, indent=2),
+        file_name="analysis.json",
+        mime="application/json",
+    )
 
 def main_app():
     # Theme Toggle Button
@@ -373,13 +416,12 @@ def main_app():
     uploaded_file = st.file_uploader("Upload your resume (PDF/DOCX)", type=["pdf", "docx"])
     jd_input = st.text_area("Job Description Input", height=200, placeholder="Paste Job Description here", label_visibility="hidden")
 
-    # Captcha
-    if not st.session_state.captcha_question:
-        captcha_text = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-        st.session_state.captcha_answer = captcha_text
-        st.session_state.captcha_question = captcha_text
-        image_captcha = ImageCaptcha()
-        st.session_state.captcha_image_data = image_captcha.generate(captcha_text)
+    # Captcha: a pre-rendered challenge whose signed token any replica can verify.
+    captcha = get_captcha_service()
+    if not st.session_state.captcha_token:
+        challenge = captcha.issue()
+        st.session_state.captcha_token = challenge["token"]
+        st.session_state.captcha_image_data = challenge["image"]
 
     st.image(st.session_state.captcha_image_data)
 
@@ -388,8 +430,7 @@ def main_app():
         user_captcha_input = st.text_input("Enter the text from the image above", key="user_captcha", label_visibility="collapsed")
     with col2:
         if st.button("Refresh Captcha", key="refresh_captcha"):
-            st.session_state.captcha_question = ""
-            st.session_state.captcha_answer = ""
+            st.session_state.captcha_token = ""
             st.rerun()
 
     analyze = st.button("Analyze Resume", use_container_width=True)
@@ -401,31 +442,63 @@ def main_app():
             st.warning("Please upload a resume to continue.")
         elif not jd_input:
             st.warning("Paste a job description to analyze your resume.")
-        elif user_captcha_input.lower() != st.session_state.captcha_answer.lower():
-            st.error("Incorrect captcha. Please try again.")
+        elif not captcha.verify(st.session_state.captcha_token, user_captcha_input, consume=False):
+            st.error("Incorrect or expired captcha. Please try again.")
         else:
-            # 2. If all inputs are valid, proceed with analysis
-            with st.spinner("Performing AI analysis... This may take a moment."):
-                resume_bytes = uploaded_file.read()
-                resume_text = extract_text(resume_bytes, uploaded_file.name)
-                st.session_state.extracted_text = resume_text
-
-                if not resume_text:
-                    st.error("Could not extract text from the uploaded resume.")
-                    st.session_state.analysis_done = False # Ensure we don't show old results
-                else:
-                    analysis = get_semantic_analysis(resume_text, jd_input)
-                    st.session_state.analysis_result = analysis # Store result regardless of success or error
-                    st.session_state.analysis_done = True
-
-                    # 3. Reset captcha and rerun to display results
-                    st.session_state.captcha_question = ""
-                    st.session_state.captcha_answer = ""
-                    st.session_state.captcha_image_data = None
-                    st.rerun()
+            # 2. If all inputs are valid, queue the analysis and return immediately
+            resume_bytes = uploaded_file.read()
+            resume_text = extract_text(resume_bytes, uploaded_file.name)
+            st.session_state.extracted_text = resume_text
+
+            if not resume_text:
+                st.error("Could not extract text from the uploaded resume.")
+                st.session_state.analysis_done = False # Ensure we don't show old results
+            else:
+                # Resubmitting the same resume and JD reuses the existing job and its result
+                # (a degraded result is analyzed again).
+                idempotency_key = hashlib.sha256(f"{resume_text}\x00{jd_input}".encode("utf-8")).hexdigest()
+                st.session_state.job_id = submit(
+                    "analyze_resume",
+                    {"resume_text": resume_text, "jd_text": jd_input},
+                    idempotency_key=idempotency_key,
+                )
+                st.session_state.analysis_done = False
+                resume_hash = content_hash(resume_text)
+                if resume_hash not in st.session_state.submitted_resumes:
+                    st.session_state.submitted_resumes.append(resume_hash)
+
+                # 3. Use up the captcha, then rerun to poll for results
+                captcha.consume(st.session_state.captcha_token)
+                st.session_state.captcha_token = ""
+                st.session_state.captcha_image_data = None
+                st.rerun()
+
+    # Poll the background job until its result is ready
+    if st.session_state.job_id and not st.session_state.analysis_done:
+        job = get_job(st.session_state.job_id)
+        if job is None:
+            st.session_state.job_id = None
+        elif job["status"] == DONE:
+            st.session_state.analysis_result = job["result"]
+            st.session_state.analysis_key = result_hash(job["result"])
+            st.session_state.analysis_done = True
+            st.session_state.job_id = None
+        elif job["status"] == FAILED:
+            st.session_state.analysis_result = {
+                "error": "Failed to get analysis from the AI model.",
+                "details": job["error"],
+            }
+            st.session_state.analysis_done = True
+            st.session_state.job_id = None
+        else:
+            st.progress(job["progress"], text=job["message"] or "Waiting for an available worker...")
+            time.sleep(1)
+            st.rerun()
 
     if st.session_state.analysis_done:
         display_analysis(st.session_state.analysis_result, st.session_state.extracted_text)
+        if jd_input and not (st.session_state.analysis_result or {}).get("error"):
+            display_ranked_candidates(jd_input)
 
 if st.session_state.page == "landing":
     landing_page()
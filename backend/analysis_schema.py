@@ -0,0 +1,352 @@
+import json
+import re
+from typing import List, Optional, Tuple
+
+# Marks fields without a usable default: an analysis missing one of them is an error.
+REQUIRED = object()
+
+_FENCE_PATTERN = re.compile(r"```(?:json)?", re.IGNORECASE)
+_NUMBER_PATTERN = re.compile(r"-?\d+(?:\.\d+)?")
+_NULL_STRINGS = {"", "null", "none", "n/a", "not found", "not available"}
+
+# How far back a truncated response is cut before giving up, in list/object elements.
+MAX_TRUNCATION_CUTS = 50
+
+
+def _string(value) -> str:
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError("expected a non-empty string")
+    return value.strip()
+
+
+def _nullable_string(value) -> Optional[str]:
+    if value is None or (isinstance(value, str) and value.strip().lower() in _NULL_STRINGS):
+        return None
+    return _string(value)
+
+
+def _score(value) -> int:
+    if isinstance(value, bool):
+        raise ValueError("expected a score")
+    if isinstance(value, str):
+        match = _NUMBER_PATTERN.search(value)
+        if not match:
+            raise ValueError("expected a score")
+        value = float(match.group())
+    if not isinstance(value, (int, float)):
+        raise ValueError("expected a score")
+    return int(round(min(max(value, 0), 100)))
+
+
+def _string_list(value) -> List[str]:
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, list):
+        raise ValueError("expected a list")
+    return [str(item).strip() for item in value if isinstance(item, (str, int, float)) and str(item).strip()]
+
+
+def _skill_group(value) -> dict:
+    if not isinstance(value, dict):
+        raise ValueError("expected matching and missing lists")
+    return {
+        "matching": _string_list(value.get("matching", [])),
+        "missing": _string_list(value.get("missing", [])),
+    }
+
+
+def _skills_analysis(value) -> dict:
+    if not isinstance(value, dict):
+        raise ValueError("expected skill groups")
+    groups = {}
+    for group in ("technical_skills", "soft_skills", "keywords"):
+        if group in value:
+            groups[group] = _skill_group(value[group])
+    if "technical_skills" not in groups:
+        raise ValueError("technical_skills is missing")
+    return groups
+
+
+def _requirement_scores(value) -> List[dict]:
+    if not isinstance(value, list):
+        raise ValueError("expected a list")
+    scores = []
+    for item in value:
+        if not isinstance(item, dict):
+            continue
+        try:
+            entry = {"id": int(item.get("id")), "score": _score(item.get("score"))}
+        except (TypeError, ValueError):
+            continue
+        try:
+            entry["evidence"] = _nullable_string(item.get("evidence"))
+        except ValueError:
+            entry["evidence"] = None
+        scores.append(entry)
+    return scores
+
+
+def _objects(*required_keys, optional_keys=()):
+    """Coerces a list of objects, dropping entries without all `required_keys`."""
+    def coerce(value) -> List[dict]:
+        if not isinstance(value, list):
+            raise ValueError("expected a list")
+        objects = []
+        for item in value:
+            if not isinstance(item, dict):
+                continue
+            try:
+                entry = {key: _string(item.get(key)) for key in required_keys}
+                entry.update({key: _nullable_string(item.get(key)) for key in optional_keys})
+            except ValueError:
+                continue
+            objects.append(entry)
+        return objects
+    return coerce
+
+
+# The analysis result as display_analysis and the candidate store consume it:
+# field -> (coerce function, default when missing, format shown to the model).
+# Coerce functions normalize near-misses (a score of "85%", a comma-separated skill
+# string) and raise ValueError for values that cannot be used.
+ANALYSIS_SCHEMA = {
+    "candidate_name": (_nullable_string, None, '"<string|null>"'),
+    "email": (_nullable_string, None, '"<string|null>"'),
+    "phone": (_nullable_string, None, '"<string|null>"'),
+    "linkedin_url": (_nullable_string, None, '"<string|null>"'),
+    "github_url": (_nullable_string, None, '"<string|null>"'),
+    "match_score": (_score, REQUIRED, "<integer 0-100>"),
+    "executive_summary": (_string, REQUIRED, '"<string>"'),
+    "skills_analysis": (
+        _skills_analysis,
+        REQUIRED,
+        '{"technical_skills": {"matching": ["<skill>"], "missing": ["<skill>"]}, '
+        '"soft_skills": {"matching": ["<skill>"], "missing": ["<skill>"]}, '
+        '"keywords": {"matching": ["<keyword>"], "missing": ["<keyword>"]}}',
+    ),
+    "experience_analysis": (_string, "", '"<string>"'),
+    "project_analysis": (
+        _objects("title", "summary"), [], '[{"title": "<Project Title>", "summary": "<Project Summary>"}]'
+    ),
+    "interview_questions": (_string_list, [], '["<Question 1>", "<Question 2>"]'),
+    "overall_vibe": (_string, "", '"<string>"'),
+    "recommended_courses": (
+        _objects("skill", "description", optional_keys=("course_title", "url")),
+        [],
+        '[{"skill": "<missing_skill>", "course_title": "<Udemy Course Title>", '
+        '"description": "<Brief course description>", "url": "<plausible_udemy_url>"}]',
+    ),
+}
+
+
+_CONTACT_FIELDS = ("candidate_name", "email", "phone", "linkedin_url", "github_url")
+
+# The partial analysis of one part of a long resume (see chunked_analysis.py). Fields
+# shared with ANALYSIS_SCHEMA are merged into it; "requirements" rates each numbered JD
+# requirement on the evidence in this part only.
+CHUNK_SCHEMA = {field: ANALYSIS_SCHEMA[field] for field in _CONTACT_FIELDS}
+CHUNK_SCHEMA.update({
+    "match_score": ANALYSIS_SCHEMA["match_score"],
+    "requirements": (
+        _requirement_scores, [], '[{"id": <requirement number>, "score": <integer 0-100>, "evidence": "<string|null>"}]'
+    ),
+    "skills_analysis": ANALYSIS_SCHEMA["skills_analysis"],
+    "experience_analysis": ANALYSIS_SCHEMA["experience_analysis"],
+    "project_analysis": ANALYSIS_SCHEMA["project_analysis"],
+    "interview_questions": ANALYSIS_SCHEMA["interview_questions"],
+    "overall_vibe": ANALYSIS_SCHEMA["overall_vibe"],
+    "recommended_courses": ANALYSIS_SCHEMA["recommended_courses"],
+})
+
+
+def _is_complete_value(text: str) -> bool:
+    """Whether text (outside any string) ends with a value that cannot have been cut short."""
+    return text.endswith(('"', "}", "]", "true", "false", "null"))
+
+
+def _follows_value(out: List[str]) -> bool:
+    """Whether the repaired output so far (outside any string) ends with a complete value."""
+    end = len(out)
+    while end and out[end - 1] in " \t\r\n":
+        end -= 1
+    tail = "".join(out[max(0, end - 5):end])
+    return _is_complete_value(tail) or tail[-1:].isdigit()
+
+
+_VALUE_START_PATTERN = re.compile(r'\s*(?:["{\[\]}\-0-9]|true\b|false\b|null\b)')
+_KEY_PATTERN = re.compile(r'\s*"(?:[^"\\\n]|\\.)*"\s*:')
+
+
+def _ends_string(text: str, position: int) -> bool:
+    """
+    Whether the quote at `position`, inside a string, closes it: JSON structure must
+    follow (after a comma, the start of another value), or the next key when the comma
+    is missing. In `"a "b", c"` the quote after b is part of the string.
+    """
+    following = position + 1
+    while following < len(text) and text[following] in " \t\r\n":
+        following += 1
+    if following == len(text) or text[following] in ":}]":
+        return True
+    if text[following] != ",":
+        return _KEY_PATTERN.match(text, position + 1) is not None
+    return following + 1 == len(text) or _VALUE_START_PATTERN.match(text, following + 1) is not None
+
+
+def repair_json(text: str) -> Optional[str]:
+    """
+    Repairs the usual defects of model-generated JSON in one pass over the text:
+    text before or after the object, raw newlines and unescaped quotes inside
+    strings, trailing and missing commas, and output cut off mid-way. A truncated
+    object keeps every element that was complete; the element that was cut off is
+    dropped, as is everything from a defect that cannot be repaired.
+
+    Returns:
+        Repaired JSON text that parses, or None if nothing could be recovered.
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+    out = []
+    stack = []
+    # (length of out, open brackets) at each point where the object could be cut:
+    # just before a comma, or just after an opening bracket.
+    cuts = []
+    in_string = escaped = closed = False
+    position, length = start, len(text)
+    while position < length:
+        char = text[position]
+        if in_string:
+            if escaped:
+                escaped = False
+                out.append(char)
+            elif char == "\\":
+                escaped = True
+                out.append(char)
+            elif char == '"':
+                if _ends_string(text, position):
+                    in_string = False
+                    out.append(char)
+                else:
+                    out.append('\\"')
+            elif char == "\n":
+                out.append("\\n")
+            elif char == "\r":
+                out.append("\\r")
+            elif char == "\t":
+                out.append("\\t")
+            else:
+                out.append(char)
+        elif char == '"':
+            if _follows_value(out):
+                # A value, then another one without the comma between them.
+                cuts.append((len(out), tuple(stack)))
+                out.append(",")
+            in_string = True
+            out.append(char)
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+            out.append(char)
+            cuts.append((len(out), tuple(stack)))
+        elif char in "}]":
+            while out and out[-1] in " \t\r\n":
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            if not stack:
+                break
+            out.append(stack.pop())
+            if not stack:
+                # Anything after the top-level object is dropped.
+                closed = True
+                break
+        elif char == ",":
+            cuts.append((len(out), tuple(stack)))
+            out.append(char)
+        else:
+            out.append(char)
+        position += 1
+
+    attempts = []
+    if closed:
+        attempts.append("".join(out))
+    else:
+        # Truncated output: close what is open, keeping only complete elements.
+        if escaped:
+            out.pop()
+        partial = "".join(out).rstrip()
+        if not in_string and _is_complete_value(partial):
+            attempts.append(partial + "".join(reversed(stack)))
+    # Failing that, keep the elements before the last cut that gives valid JSON.
+    for cut, open_brackets in reversed(cuts[-MAX_TRUNCATION_CUTS:]):
+        attempts.append("".join(out[:cut]).rstrip() + "".join(reversed(open_brackets)))
+    for attempt in attempts:
+        try:
+            json.loads(attempt)
+        except ValueError:
+            continue
+        return attempt
+    return None
+
+
+def parse_json(text: str):
+    """
+    Parses the JSON object in a model response, repairing it if needed.
+
+    Returns:
+        The parsed object, or None if nothing usable could be recovered.
+    """
+    text = _FENCE_PATTERN.sub("", text or "").strip()
+    start = text.find("{")
+    if start < 0:
+        return None
+    try:
+        # Ignores anything after the object.
+        return json.JSONDecoder().raw_decode(text, start)[0]
+    except ValueError:
+        pass
+    repaired = repair_json(text)
+    try:
+        return json.loads(repaired) if repaired is not None else None
+    except ValueError:
+        return None
+
+
+def validate_analysis(data, schema: dict = ANALYSIS_SCHEMA) -> Tuple[dict, List[str]]:
+    """
+    Checks a parsed response against a schema, ANALYSIS_SCHEMA by default.
+
+    Returns:
+        The analysis with every usable field normalized (unknown fields are kept),
+        and the schema fields that are missing or unusable.
+    """
+    if not isinstance(data, dict):
+        return {}, list(schema)
+    analysis, missing = dict(data), []
+    for field, (coerce, _, _) in schema.items():
+        if field not in data:
+            missing.append(field)
+            continue
+        try:
+            analysis[field] = coerce(data[field])
+        except (TypeError, ValueError):
+            del analysis[field]
+            missing.append(field)
+    return analysis, missing
+
+
+def fill_defaults(analysis: dict, missing: List[str], schema: dict = ANALYSIS_SCHEMA) -> List[str]:
+    """Fills missing fields that have a default. Returns the required fields still missing."""
+    still_missing = []
+    for field in missing:
+        default = schema[field][1]
+        if default is REQUIRED:
+            still_missing.append(field)
+        else:
+            analysis[field] = list(default) if isinstance(default, list) else default
+    return still_missing
+
+
+def field_formats(fields: List[str], schema: dict = ANALYSIS_SCHEMA) -> str:
+    """The JSON format of the given fields, for a prompt asking for only those fields."""
+    return ",\n".join(f'  "{field}": {schema[field][2]}' for field in fields)
@@ -0,0 +1,322 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from array import array
+from typing import Dict, List, Optional
+
+from backend.config import DATA_DIR
+
+DEFAULT_DB_PATH = os.environ.get("PROSCAN_STORE_DB", os.path.join(DATA_DIR, "candidates.db"))
+
+# Skills are stored one row per (candidate, skill) with the experience in months, so
+# filters such as "python with at least 36 months" are answered from the
+# (skill, experience_months) index. Analyses are indexed by (jd_id, match_score)
+# so "match_score >= 70 for JD X" is a range scan, and by analysis time for exports.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    id INTEGER PRIMARY KEY,
+    content_hash TEXT NOT NULL UNIQUE,
+    name TEXT,
+    email TEXT,
+    phone TEXT,
+    linkedin TEXT,
+    github TEXT,
+    resume_text TEXT NOT NULL,
+    entities TEXT,
+    embedding BLOB,
+    created_at REAL NOT NULL,
+    revision INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_candidates_email ON candidates(email);
+
+CREATE TABLE IF NOT EXISTS candidate_skills (
+    candidate_id INTEGER NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+    skill TEXT NOT NULL,
+    category TEXT,
+    experience_months REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (candidate_id, skill)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_skills_skill_exp ON candidate_skills(skill, experience_months, candidate_id);
+CREATE INDEX IF NOT EXISTS idx_skills_category ON candidate_skills(category, candidate_id);
+
+CREATE TABLE IF NOT EXISTS job_descriptions (
+    id INTEGER PRIMARY KEY,
+    content_hash TEXT NOT NULL UNIQUE,
+    title TEXT,
+    jd_text TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS analyses (
+    candidate_id INTEGER NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+    jd_id INTEGER NOT NULL REFERENCES job_descriptions(id) ON DELETE CASCADE,
+    match_score REAL,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (candidate_id, jd_id)
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_jd_score ON analyses(jd_id, match_score);
+CREATE INDEX IF NOT EXISTS idx_analyses_created ON analyses(created_at, candidate_id, jd_id);
+"""
+
+
+def content_hash(text: str) -> str:
+    """Returns a stable hash of the text, ignoring surrounding whitespace."""
+    return hashlib.sha256(text.strip().encode("utf-8")).hexdigest()
+
+
+def _pack_embedding(embedding) -> Optional[bytes]:
+    if embedding is None:
+        return None
+    return array("f", [float(x) for x in embedding]).tobytes()
+
+
+def _unpack_embedding(blob: Optional[bytes]) -> Optional[List[float]]:
+    if blob is None:
+        return None
+    values = array("f")
+    values.frombytes(blob)
+    return values.tolist()
+
+
+class CandidateStore:
+    """Persistent store of parsed resumes, job descriptions and their analyses."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or DEFAULT_DB_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(_SCHEMA)
+        with self.conn:
+            columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(candidates)")}
+            if "revision" not in columns:
+                # Stores created before revisions existed: every candidate counts as changed.
+                self.conn.execute("ALTER TABLE candidates ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+                self.conn.execute("UPDATE candidates SET revision = id")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_candidates_revision ON candidates(revision)")
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def add_candidate(self, resume_text: str, entities: Optional[dict] = None, embedding=None) -> int:
+        """
+        Stores a resume with its parsed entities and embedding.
+
+        The same resume text always maps to the same candidate id. Passing entities
+        or an embedding for an existing candidate replaces the stored ones, and drops
+        the candidate's stored requirement matches if they changed. Every insert or
+        change gives the candidate a new, store-wide increasing `revision`, which
+        incremental readers such as the skill index use to pick up re-parsed candidates.
+
+        Args:
+            resume_text: The extracted resume text.
+            entities: Output of `extract_resume`, including `categorized_skills`.
+            embedding: A sequence of floats representing the resume.
+
+        Returns:
+            The candidate id.
+        """
+        key = content_hash(resume_text)
+        entities = entities or {}
+        contact = entities.get("contact", {})
+        fields = {
+            "name": entities.get("name"),
+            "email": entities.get("email", contact.get("email")),
+            "phone": entities.get("phone", contact.get("phone")),
+            "linkedin": entities.get("linkedin", contact.get("linkedin")),
+            "github": entities.get("github", contact.get("github")),
+        }
+        with self.conn:
+            row = self.conn.execute(
+                "SELECT id, entities, embedding FROM candidates WHERE content_hash = ?", (key,)
+            ).fetchone()
+            # Unique and increasing, as the write transaction serializes writers.
+            revision = self.conn.execute("SELECT COALESCE(MAX(revision), 0) + 1 FROM candidates").fetchone()[0]
+            if row is None:
+                candidate_id = self.conn.execute(
+                    "INSERT INTO candidates (content_hash, name, email, phone, linkedin, github, "
+                    "resume_text, entities, embedding, created_at, revision) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, fields["name"], fields["email"], fields["phone"], fields["linkedin"], fields["github"],
+                     resume_text, json.dumps(entities) if entities else None, _pack_embedding(embedding), time.time(),
+                     revision),
+                ).lastrowid
+            else:
+                candidate_id = row["id"]
+                changed = ((entities and json.dumps(entities) != row["entities"])
+                           or (embedding is not None and _pack_embedding(embedding) != row["embedding"]))
+                if changed and self._has_table("requirement_matches"):
+                    # Matches are computed from the skills and embedding (backend/requirement_scoring.py).
+                    self.conn.execute("DELETE FROM requirement_matches WHERE candidate_id = ?", (candidate_id,))
+                if changed:
+                    self.conn.execute("UPDATE candidates SET revision = ? WHERE id = ?", (revision, candidate_id))
+                if entities:
+                    self.conn.execute(
+                        "UPDATE candidates SET name = ?, email = ?, phone = ?, linkedin = ?, github = ?, "
+                        "entities = ? WHERE id = ?",
+                        (fields["name"], fields["email"], fields["phone"], fields["linkedin"], fields["github"],
+                         json.dumps(entities), candidate_id),
+                    )
+                if embedding is not None:
+                    self.conn.execute(
+                        "UPDATE candidates SET embedding = ? WHERE id = ?", (_pack_embedding(embedding), candidate_id)
+                    )
+
+            if entities.get("categorized_skills"):
+                self.conn.execute("DELETE FROM candidate_skills WHERE candidate_id = ?", (candidate_id,))
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO candidate_skills (candidate_id, skill, category, experience_months) "
+                    "VALUES (?, ?, ?, ?)",
+                    [
+                        (candidate_id, skill["name"].lower(), category, skill.get("experience") or 0)
+                        for category, skills in entities["categorized_skills"].items()
+                        for skill in skills
+                    ],
+                )
+        return candidate_id
+
+    def _has_table(self, name: str) -> bool:
+        return self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        ).fetchone() is not None
+
+    def add_job_description(self, jd_text: str, title: Optional[str] = None) -> int:
+        """Stores a job description and returns its id. The same text maps to the same id."""
+        key = content_hash(jd_text)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO job_descriptions (content_hash, title, jd_text, created_at) VALUES (?, ?, ?, ?)",
+                (key, title, jd_text, time.time()),
+            )
+            return self.conn.execute("SELECT id FROM job_descriptions WHERE content_hash = ?", (key,)).fetchone()["id"]
+
+    def find_candidate_id(self, resume_text: str) -> Optional[int]:
+        row = self.conn.execute("SELECT id FROM candidates WHERE content_hash = ?", (content_hash(resume_text),)).fetchone()
+        return row["id"] if row else None
+
+    def find_job_description_id(self, jd_text: str) -> Optional[int]:
+        row = self.conn.execute("SELECT id FROM job_descriptions WHERE content_hash = ?", (content_hash(jd_text),)).fetchone()
+        return row["id"] if row else None
+
+    def save_analysis(self, candidate_id: int, jd_id: int, result: dict) -> None:
+        """Stores (or replaces) the analysis of a candidate against a job description."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO analyses (candidate_id, jd_id, match_score, result, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (candidate_id, jd_id, result.get("match_score"), json.dumps(result), time.time()),
+            )
+
+    def get_analysis(self, candidate_id: int, jd_id: int) -> Optional[dict]:
+        row = self.conn.execute(
+            "SELECT result FROM analyses WHERE candidate_id = ? AND jd_id = ?", (candidate_id, jd_id)
+        ).fetchone()
+        return json.loads(row["result"]) if row else None
+
+    def ranked_analyses(self, jd_id: int, limit: int = 50, offset: int = 0,
+                        content_hashes: Optional[List[str]] = None) -> List[dict]:
+        """
+        Returns a page of the candidates analyzed against a job description, best
+        match first, with the candidate id, name, email, match score and decoded result.
+
+        Args:
+            content_hashes: Only include the candidates with these resume hashes
+                (see `content_hash`), e.g. the resumes submitted in one session.
+        """
+        where, params = self._ranked_filter(jd_id, content_hashes)
+        rows = self.conn.execute(
+            "SELECT a.candidate_id, c.name, c.email, a.match_score, a.result "
+            f"FROM analyses a JOIN candidates c ON c.id = a.candidate_id WHERE {where} "
+            "ORDER BY a.match_score DESC, a.candidate_id LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        )
+        return [dict(row, result=json.loads(row["result"])) for row in rows]
+
+    def count_analyses(self, jd_id: int, content_hashes: Optional[List[str]] = None) -> int:
+        where, params = self._ranked_filter(jd_id, content_hashes)
+        return self.conn.execute(
+            f"SELECT COUNT(*) FROM analyses a JOIN candidates c ON c.id = a.candidate_id WHERE {where}", params
+        ).fetchone()[0]
+
+    @staticmethod
+    def _ranked_filter(jd_id: int, content_hashes: Optional[List[str]]):
+        if content_hashes is None:
+            return "a.jd_id = ?", [jd_id]
+        placeholders = ", ".join("?" * len(content_hashes)) or "NULL"
+        return f"a.jd_id = ? AND c.content_hash IN ({placeholders})", [jd_id, *content_hashes]
+
+    def get_candidate(self, candidate_id: int) -> Optional[dict]:
+        """Returns the stored candidate, with entities and embedding decoded."""
+        row = self.conn.execute("SELECT * FROM candidates WHERE id = ?", (candidate_id,)).fetchone()
+        if row is None:
+            return None
+        candidate = dict(row)
+        candidate["entities"] = json.loads(candidate["entities"]) if candidate["entities"] else {}
+        candidate["embedding"] = _unpack_embedding(candidate["embedding"])
+        return candidate
+
+    def query(
+        self,
+        skills: Optional[List[str]] = None,
+        min_experience: Optional[Dict[str, float]] = None,
+        jd_id: Optional[int] = None,
+        min_score: Optional[float] = None,
+        limit: int = 100,
+    ) -> List[dict]:
+        """
+        Finds candidates matching all of the given filters.
+
+        Example: candidates with kubernetes, at least 36 months of python and a match
+        score of at least 70 for JD 3:
+
+            store.query(skills=["kubernetes"], min_experience={"python": 36}, jd_id=3, min_score=70)
+
+        Args:
+            skills: Skills the candidate must have.
+            min_experience: Minimum months of experience per skill.
+            jd_id: Restrict to candidates analyzed against this job description.
+            min_score: Minimum match score for `jd_id`.
+            limit: Maximum number of rows returned.
+
+        Returns:
+            A list of dicts with the candidate id, name, email and, when `jd_id`
+            is given, the match score. Ordered by match score when available.
+
+        Raises:
+            ValueError: `min_score` is given without `jd_id`; a score only means
+                something against one job description.
+        """
+        if min_score is not None and jd_id is None:
+            raise ValueError("min_score requires jd_id")
+        requirements = {skill.lower(): 0 for skill in skills or []}
+        for skill, months in (min_experience or {}).items():
+            requirements[skill.lower()] = max(requirements.get(skill.lower(), 0), months)
+
+        clauses, params = [], []
+        for skill, months in requirements.items():
+            clauses.append(
+                "c.id IN (SELECT candidate_id FROM candidate_skills WHERE skill = ? AND experience_months >= ?)"
+            )
+            params.extend([skill, months])
+
+        if jd_id is not None:
+            sql = "SELECT c.id, c.name, c.email, a.match_score FROM analyses a JOIN candidates c ON c.id = a.candidate_id"
+            clauses.insert(0, "a.jd_id = ?")
+            params.insert(0, jd_id)
+            if min_score is not None:
+                clauses.insert(1, "a.match_score >= ?")
+                params.insert(1, min_score)
+            order = " ORDER BY a.match_score DESC"
+        else:
+            sql = "SELECT c.id, c.name, c.email FROM candidates c"
+            order = " ORDER BY c.created_at DESC"
+
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += order + " LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in self.conn.execute(sql, params)]
@@ -0,0 +1,136 @@
+import collections
+import hashlib
+import hmac
+import os
+import queue
+import secrets
+import string
+import threading
+import time
+from typing import Optional
+
+# Tokens are signed with this key. Every replica must share it for any of them to
+# verify a challenge another one issued; without it, each process makes up its own.
+CAPTCHA_SECRET = os.environ.get("PROSCAN_CAPTCHA_SECRET", "")
+# Seconds a challenge can be answered for.
+CAPTCHA_TTL = int(os.environ.get("PROSCAN_CAPTCHA_TTL", "600"))
+# Pre-rendered challenges kept ready, and how many are rendered per second at most
+# while refilling, so refills never compete with requests for the CPU.
+POOL_SIZE = int(os.environ.get("PROSCAN_CAPTCHA_POOL_SIZE", "64"))
+REFILL_PER_SECOND = float(os.environ.get("PROSCAN_CAPTCHA_REFILL_RATE", "20"))
+
+CAPTCHA_LENGTH = 6
+CAPTCHA_ALPHABET = string.ascii_uppercase + string.digits
+# Nonces of answered challenges remembered per process, so a solved challenge
+# cannot be replayed on the same replica.
+USED_NONCES = 10000
+
+
+def _normalize(answer: str) -> str:
+    return (answer or "").strip().upper()
+
+
+class CaptchaService:
+    """
+    Hands out pre-rendered captcha challenges and verifies answers statelessly.
+
+    A background thread keeps a bounded pool of rendered images filled with one
+    reused ImageCaptcha generator. A challenge's token carries its expiry and an
+    HMAC of the answer, so any process with the same secret can check an answer
+    without shared session state; the answer itself is never sent to the browser.
+    """
+
+    def __init__(self, secret: Optional[str] = None, pool_size: int = POOL_SIZE,
+                 refill_per_second: float = REFILL_PER_SECOND, ttl: int = CAPTCHA_TTL):
+        from captcha.image import ImageCaptcha
+
+        secret = secret or CAPTCHA_SECRET
+        if not secret:
+            print("PROSCAN_CAPTCHA_SECRET is not set; captchas only verify on this server process.")
+            secret = secrets.token_hex(32)
+        self.secret = secret.encode("utf-8")
+        self.ttl = ttl
+        self.refill_interval = 1 / refill_per_second if refill_per_second > 0 else 0
+        self.pool = queue.Queue(maxsize=pool_size)
+        self._generator = ImageCaptcha()
+        self._generator_lock = threading.Lock()
+        self._used_nonces = collections.OrderedDict()
+        self._used_lock = threading.Lock()
+        self._filler = threading.Thread(target=self._fill, name="captcha-pool", daemon=True)
+        self._filler.start()
+
+    def _render(self) -> tuple:
+        answer = "".join(secrets.choice(CAPTCHA_ALPHABET) for _ in range(CAPTCHA_LENGTH))
+        with self._generator_lock:
+            image = self._generator.generate(answer).getvalue()
+        return answer, image
+
+    def _fill(self) -> None:
+        while True:
+            try:
+                challenge = self._render()
+            except Exception as e:
+                print(f"Captcha rendering failed: {e}")
+                time.sleep(1)
+                continue
+            # Blocks while the pool is full.
+            self.pool.put(challenge)
+            time.sleep(self.refill_interval)
+
+    def _sign(self, expires: int, nonce: str, answer: str) -> str:
+        message = f"{expires}.{nonce}.{_normalize(answer)}".encode("utf-8")
+        return hmac.new(self.secret, message, hashlib.sha256).hexdigest()
+
+    def issue(self) -> dict:
+        """
+        Returns a challenge: the PNG "image" to show and the "token" to send back
+        with the answer. Comes from the pool, or is rendered now if it is empty.
+        """
+        try:
+            answer, image = self.pool.get_nowait()
+        except queue.Empty:
+            answer, image = self._render()
+        expires = int(time.time()) + self.ttl
+        nonce = secrets.token_hex(8)
+        return {"image": image, "token": f"{expires}.{nonce}.{self._sign(expires, nonce, answer)}"}
+
+    def verify(self, token: Optional[str], answer: str, consume: bool = True) -> bool:
+        """
+        Whether the answer solves the token's challenge, which has not expired or
+        been used on this process. A correct answer uses the challenge up unless
+        `consume` is False; call `consume` once the guarded action has happened.
+        """
+        try:
+            expires_text, nonce, signature = (token or "").split(".")
+            expires = int(expires_text)
+        except ValueError:
+            return False
+        if expires < time.time() or not hmac.compare_digest(signature, self._sign(expires, nonce, answer)):
+            return False
+        with self._used_lock:
+            if nonce in self._used_nonces:
+                return False
+        if consume:
+            self.consume(token)
+        return True
+
+    def consume(self, token: str) -> None:
+        """Marks a challenge as used on this process."""
+        nonce = token.split(".")[1]
+        with self._used_lock:
+            self._used_nonces[nonce] = True
+            while len(self._used_nonces) > USED_NONCES:
+                self._used_nonces.popitem(last=False)
+
+
+_service: Optional[CaptchaService] = None
+_lock = threading.Lock()
+
+
+def get_captcha_service() -> CaptchaService:
+    """Returns the process-wide CaptchaService, starting its pool on first use."""
+    global _service
+    with _lock:
+        if _service is None:
+            _service = CaptchaService()
+        return _service
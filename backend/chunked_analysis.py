@@ -0,0 +1,233 @@
+import collections
+import itertools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List
+
+from backend.analysis_schema import CHUNK_SCHEMA, field_formats, fill_defaults, parse_json, validate_analysis
+from backend.model_router import BudgetExceeded
+from backend.section_segmenter import segment
+
+# Resumes longer than this (in characters, about 3,000 tokens) are analyzed in parts
+# of at most this size. Each part takes about as long as a one-page resume, and all
+# parts are analyzed at once.
+CHUNK_CHARS = int(os.environ.get("PROSCAN_CHUNK_CHARS", "12000"))
+MAX_CONCURRENT_CHUNKS = int(os.environ.get("PROSCAN_CHUNK_CONCURRENCY", "8"))
+# A requirement with a best score at or above this counts as met in the summary.
+MET_SCORE = 60
+MAX_INTERVIEW_QUESTIONS = 5
+MAX_RECOMMENDED_COURSES = 5
+
+CHUNK_PROMPT_TEMPLATE = """
+You are an expert HR analyst. A long resume is being analyzed against a job description one part at a time.
+You are given part {part} of {parts}. Base every field ONLY on this part of the resume; other parts are
+analyzed separately and the results are merged.
+
+**Instructions:**
+1.  Extract the candidate's name, email, phone, LinkedIn and GitHub URLs if they appear in this part, else `null`.
+2.  Rate every numbered requirement below from 0 to 100 by the evidence in this part, quoting or
+    summarizing the best evidence in one sentence. Rate 0 with `null` evidence if this part says nothing about it.
+3.  Give a "match_score" from 0 to 100 for this part alone.
+4.  List matching and missing technical skills, soft skills and keywords, projects, 1-2 interview
+    questions, the overall tone, and up to 3 Udemy courses for missing skills, as for a full analysis.
+5.  Return ONLY a single, clean JSON object with exactly these fields:
+{{
+{fields}
+}}
+
+**Requirements:**
+{requirements}
+
+**Job Description:**
+---
+{jd_text}
+---
+
+**Resume (part {part} of {parts}):**
+---
+{chunk}
+---
+
+**Analysis of this part (JSON Output Only):**
+"""
+
+
+def _split_long(text: str, max_chars: int) -> List[str]:
+    """Splits text into pieces of at most max_chars, at paragraph or line breaks where possible."""
+    pieces = []
+    while len(text) > max_chars:
+        cut = text.rfind("\n\n", 0, max_chars)
+        if cut <= 0:
+            cut = text.rfind("\n", 0, max_chars)
+        if cut <= 0:
+            cut = text.rfind(" ", 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        pieces.append(text[:cut].strip())
+        text = text[cut:]
+    if text.strip():
+        pieces.append(text.strip())
+    return pieces
+
+
+def split_resume(text: str, max_chars: int = CHUNK_CHARS) -> List[str]:
+    """
+    Splits a resume into parts of at most max_chars, keeping sections together.
+
+    Whole sections are packed into parts in document order. A section too long for a
+    part is split at paragraph breaks, and each of its pieces repeats the heading.
+    """
+    parts, current = [], ""
+    for section in segment(text):
+        heading = text[section.heading_start:section.start].strip()
+        body = text[section.start:section.end].strip()
+        block = f"{heading}\n{body}" if heading else body
+        if not block:
+            continue
+        if len(block) > max_chars:
+            room = max(max_chars - len(heading) - 1, max_chars // 2)
+            blocks = [f"{heading}\n{piece}" if heading else piece for piece in _split_long(body, room)]
+        else:
+            blocks = [block]
+        for block in blocks:
+            if current and len(current) + 2 + len(block) > max_chars:
+                parts.append(current)
+                current = ""
+            current = f"{current}\n\n{block}" if current else block
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _unique(values: Iterable, key: Callable = str.lower) -> list:
+    """Values in first-seen order, without repeats of the same key (case-insensitive text by default)."""
+    seen, unique = set(), []
+    for value in values:
+        if key(value) not in seen:
+            seen.add(key(value))
+            unique.append(value)
+    return unique
+
+
+def merge_chunk_analyses(chunks: List[dict], requirements: List[str], weights: List[float]) -> dict:
+    """
+    Merges per-part analyses into one analysis in the full result schema.
+
+    The merge only depends on the parts and their order: contact details come from
+    the first part that has them, skills are united (a skill matched in any part is
+    not missing), each requirement keeps its best-rated evidence, and the match
+    score is the weighted mean of the best requirement scores.
+    """
+    analysis = {}
+    for field in ("candidate_name", "email", "phone", "linkedin_url", "github_url"):
+        analysis[field] = next((chunk[field] for chunk in chunks if chunk.get(field)), None)
+
+    skills_analysis = {}
+    for group in ("technical_skills", "soft_skills", "keywords"):
+        matching = _unique(skill for chunk in chunks
+                           for skill in chunk["skills_analysis"].get(group, {}).get("matching", []))
+        matched = {skill.lower() for skill in matching}
+        missing = _unique(skill for chunk in chunks
+                          for skill in chunk["skills_analysis"].get(group, {}).get("missing", [])
+                          if skill.lower() not in matched)
+        skills_analysis[group] = {"matching": matching, "missing": missing}
+    analysis["skills_analysis"] = skills_analysis
+
+    best = [{"requirement": requirement, "score": 0, "evidence": None, "part": None} for requirement in requirements]
+    for part, chunk in enumerate(chunks, 1):
+        for rating in chunk["requirements"]:
+            position = rating["id"] - 1
+            if 0 <= position < len(best) and rating["score"] > best[position]["score"]:
+                best[position].update(score=rating["score"], evidence=rating["evidence"], part=part)
+    analysis["requirement_evidence"] = best
+
+    total_weight = sum(weights)
+    if total_weight:
+        weighted = sum(entry["score"] * weight for entry, weight in zip(best, weights))
+        analysis["match_score"] = round(weighted / total_weight)
+    else:
+        # No requirements could be split out of the JD; the strongest part decides.
+        analysis["match_score"] = max(chunk["match_score"] for chunk in chunks)
+
+    met = [entry for entry in best if entry["score"] >= MET_SCORE]
+    unmet = [entry["requirement"] for entry in best if entry["score"] < MET_SCORE]
+    summary = f"This long resume was analyzed in {len(chunks)} parts."
+    if requirements:
+        summary += f" It shows clear evidence for {len(met)} of {len(requirements)} requirements."
+        if unmet:
+            summary += " Weakest areas: " + "; ".join(unmet[:3]) + "."
+    analysis["executive_summary"] = summary
+
+    analysis["experience_analysis"] = " ".join(
+        chunk["experience_analysis"] for chunk in chunks if chunk["experience_analysis"]
+    )
+    analysis["project_analysis"] = _unique(
+        (project for chunk in chunks for project in chunk["project_analysis"]), key=lambda project: project["title"].lower()
+    )
+    # Take questions from every part in turn so early parts do not crowd out later ones.
+    analysis["interview_questions"] = _unique(
+        question
+        for round_ in itertools.zip_longest(*(chunk["interview_questions"] for chunk in chunks))
+        for question in round_ if question
+    )[:MAX_INTERVIEW_QUESTIONS]
+    # most_common keeps first-seen order among ties.
+    vibes = collections.Counter(chunk["overall_vibe"] for chunk in chunks if chunk["overall_vibe"])
+    analysis["overall_vibe"] = vibes.most_common(1)[0][0] if vibes else ""
+    all_matched = {skill.lower() for group in skills_analysis.values() for skill in group["matching"]}
+    analysis["recommended_courses"] = _unique(
+        (course for chunk in chunks for course in chunk["recommended_courses"]
+         if course["skill"].lower() not in all_matched),
+        key=lambda course: course["skill"].lower(),
+    )[:MAX_RECOMMENDED_COURSES]
+    return analysis
+
+
+def analyze_in_chunks(router, resume_text: str, jd_text: str, depth: str, budget: float,
+                      max_chars: int = CHUNK_CHARS) -> dict:
+    """
+    Map-reduce analysis of a long resume: every part is analyzed concurrently against
+    the JD's numbered requirements, then the parts are merged with
+    `merge_chunk_analyses`. Parts that fail are left out and counted in "chunks".
+
+    Raises:
+        BudgetExceeded: No part was analyzed within the budget.
+        ValueError: No part returned a usable analysis.
+    """
+    from backend.requirement_scoring import requirement_weight, split_requirements
+
+    started = time.monotonic()
+    requirements = split_requirements(jd_text)
+    numbered = "\n".join(f"{i}. {requirement}" for i, requirement in enumerate(requirements, 1)) or "(none listed)"
+    fields = field_formats(list(CHUNK_SCHEMA), CHUNK_SCHEMA)
+    parts = split_resume(resume_text, max_chars)
+
+    def analyze(part: int) -> dict:
+        prompt = CHUNK_PROMPT_TEMPLATE.format(
+            part=part + 1, parts=len(parts), fields=fields, requirements=numbered, jd_text=jd_text, chunk=parts[part]
+        )
+        response = router.generate(prompt, depth=depth, budget=budget - (time.monotonic() - started))
+        chunk, missing = validate_analysis(parse_json(response["text"]), CHUNK_SCHEMA)
+        missing = fill_defaults(chunk, missing, CHUNK_SCHEMA)
+        if missing:
+            raise ValueError(f"part {part + 1} is missing {', '.join(missing)}")
+        return chunk
+
+    chunks, errors = [], []
+    with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_CHUNKS, len(parts)) or 1) as executor:
+        futures = [executor.submit(analyze, part) for part in range(len(parts))]
+        # Collected in document order so the merge does not depend on timing.
+        for future in futures:
+            try:
+                chunks.append(future.result())
+            except Exception as e:
+                print(f"Analysis of a resume part failed: {e}")
+                errors.append(e)
+    if not chunks:
+        if any(isinstance(error, BudgetExceeded) for error in errors):
+            raise BudgetExceeded(f"none of {len(parts)} resume parts were analyzed in time")
+        raise ValueError(f"none of {len(parts)} resume parts could be analyzed: {errors[-1] if errors else ''}")
+
+    analysis = merge_chunk_analyses(chunks, requirements, [requirement_weight(r) for r in requirements])
+    analysis["chunks"] = {"analyzed": len(chunks), "total": len(parts)}
+    return analysis
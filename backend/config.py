@@ -0,0 +1,9 @@
+import os
+
+# Local state (job queue, candidate store, indexes) is kept under DATA_DIR. The default
+# is resolved relative to this file so it does not depend on the working directory
+# Streamlit was started from.
+DATA_DIR = os.environ.get(
+    "PROSCAN_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"),
+)
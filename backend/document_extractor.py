@@ -11,7 +11,9 @@ def _extract_text_from_pdf(pdf_bytes):
         for page in reader.pages:
             page_text = page.extract_text()
             if page_text:
-                text += page_text
+                # Start each page on a new line so a heading at the top of a page
+                # stays on a line of its own (see backend/section_segmenter.py).
+                text += page_text if not text or text.endswith("\n") else "\n" + page_text
         return text
     except Exception as e:
         print(f"Error extracting text from PDF: {e}")
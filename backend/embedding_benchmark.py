@@ -0,0 +1,186 @@
+import itertools
+import json
+import multiprocessing
+import os
+import queue as queue_module
+import resource
+import sys
+import time
+
+import numpy as np
+
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "embedding_fixtures.json")
+# Scores from another backend (the int8 onnx one) must stay within this many points
+# of the reference backend on the fixture set.
+SCORE_TOLERANCE = 2.0
+# Seconds one backend may take to load and run before it counts as failed.
+BACKEND_TIMEOUT = 600
+# Backends whose batch size and thread count can be swept (see onnx_encoder.py).
+SWEEPABLE = ("onnx",)
+
+
+def _run_backend(backend: str, fixtures: list, repeats: int, queue, environment: dict) -> None:
+    """Loads one backend in a fresh process and measures it on the fixtures."""
+    # Select the backend before jd_comparator loads its module-level model, so only
+    # one model is resident in this process.
+    os.environ.update(environment)
+    os.environ["PROSCAN_EMBEDDING_BACKEND"] = backend
+    os.environ["PROSCAN_MODEL_SERVER"] = "off"
+    started = time.perf_counter()
+    from backend import jd_comparator
+    from backend.jd_comparator import encode_skills, similarity_from_embeddings
+    encoder = jd_comparator.model
+    load_seconds = time.perf_counter() - started
+
+    latencies, scores, embeddings = [], [], []
+    for _ in range(repeats):
+        for pair in fixtures:
+            started = time.perf_counter()
+            resume_embeddings = encode_skills(pair["resume"], encoder)
+            jd_embeddings = encode_skills(pair["jd"], encoder)
+            scores.append(similarity_from_embeddings(resume_embeddings, jd_embeddings))
+            latencies.append(time.perf_counter() - started)
+    for pair in fixtures:
+        embeddings.append(encode_skills(pair["resume"] + pair["jd"], encoder))
+
+    queue.put({
+        "load_seconds": load_seconds,
+        "latencies": latencies,
+        "scores": scores[:len(fixtures)],
+        "embeddings": [e.tolist() for e in embeddings],
+        # ru_maxrss is in kilobytes on Linux.
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    })
+
+
+def _runs(backends, batch_sizes, threads) -> list:
+    """(label, backend, environment) of each run: one per backend, or one per batch size and thread count."""
+    runs = []
+    for backend in backends:
+        if backend not in SWEEPABLE or not (batch_sizes or threads):
+            runs.append((backend, backend, {}))
+            continue
+        for batch_size, num_threads in itertools.product(batch_sizes or [None], threads or [None]):
+            label, environment = backend, {}
+            if batch_size is not None:
+                label += f" b={batch_size}"
+                environment["PROSCAN_ONNX_BATCH_SIZE"] = str(batch_size)
+            if num_threads is not None:
+                label += f" t={num_threads}"
+                environment["PROSCAN_ONNX_THREADS"] = str(num_threads)
+            runs.append((label, backend, environment))
+    return runs
+
+
+def _collect(process, queue, timeout: float) -> dict:
+    """Waits for the result of a backend process; an "error" result if it dies or times out."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return queue.get(timeout=1.0)
+        except queue_module.Empty:
+            pass
+        if not process.is_alive():
+            try:
+                # It may have put its result just before exiting.
+                return queue.get(timeout=1.0)
+            except queue_module.Empty:
+                return {"error": f"exited with code {process.exitcode} without a result"}
+        if time.monotonic() > deadline:
+            process.terminate()
+            return {"error": f"timed out after {timeout:.0f}s"}
+
+
+def run_benchmark(backends=("torch", "onnx"), repeats: int = 20, fixtures_path: str = FIXTURES_PATH,
+                  tolerance: float = SCORE_TOLERANCE, batch_sizes=(), threads=(),
+                  timeout: float = BACKEND_TIMEOUT) -> dict:
+    """
+    Compares embedding backends on the fixture set.
+
+    Each backend runs in its own process so resident memory is measured in isolation.
+
+    Args:
+        batch_sizes, threads: Run the onnx backend once per combination of these
+            batch sizes and thread counts instead of with its defaults.
+        timeout: Seconds each run may take before it is stopped and reported as failed.
+
+    Returns:
+        Per-run latency and memory, the score and embedding deviation of each run
+        from the first one, and whether its scores are "within_tolerance". A run
+        that crashed or timed out has only an "error".
+    """
+    with open(fixtures_path, "r", encoding="utf-8") as f:
+        fixtures = json.load(f)
+
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    for label, backend, environment in _runs(backends, batch_sizes, threads):
+        queue = ctx.Queue()
+        process = ctx.Process(target=_run_backend, args=(backend, fixtures, repeats, queue, environment))
+        process.start()
+        results[label] = _collect(process, queue, timeout)
+        process.join()
+
+    reference_label, reference = next(iter(results.items()))
+    report = {}
+    for backend, result in results.items():
+        if "error" in result:
+            report[backend] = {"error": result["error"]}
+            continue
+        if "error" in reference:
+            report[backend] = {"error": f"reference backend {reference_label} failed"}
+            continue
+        latencies = np.array(result["latencies"]) * 1000
+        score_diffs = np.abs(np.array(result["scores"]) - np.array(reference["scores"]))
+        cosines = [
+            float(np.mean(np.sum(np.array(a) * np.array(b), axis=1) /
+                          (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))))
+            for a, b in zip(result["embeddings"], reference["embeddings"])
+        ]
+        report[backend] = {
+            "load_seconds": round(result["load_seconds"], 2),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+            "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+            "max_rss_mb": round(result["max_rss_mb"], 1),
+            "max_score_diff": round(float(score_diffs.max()), 2),
+            "mean_score_diff": round(float(score_diffs.mean()), 2),
+            "min_embedding_cosine": round(min(cosines), 4),
+            "within_tolerance": bool(score_diffs.max() <= tolerance),
+        }
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Compare embedding backends for accuracy and speed.")
+    arg_parser.add_argument("--backends", nargs="+", default=["torch", "onnx"], help="Reference backend first.")
+    arg_parser.add_argument("--repeats", type=int, default=20)
+    arg_parser.add_argument("--tolerance", type=float, default=SCORE_TOLERANCE,
+                            help="Maximum score difference from the reference backend.")
+    arg_parser.add_argument("--batch-sizes", nargs="+", type=int, default=[],
+                            help="Sweep the onnx batch size over these values.")
+    arg_parser.add_argument("--threads", nargs="+", type=int, default=[],
+                            help="Sweep the onnx thread count over these values.")
+    arg_parser.add_argument("--timeout", type=float, default=BACKEND_TIMEOUT,
+                            help="Seconds each backend may take before it counts as failed.")
+    args = arg_parser.parse_args()
+
+    benchmark = run_benchmark(tuple(args.backends), args.repeats, tolerance=args.tolerance,
+                              batch_sizes=args.batch_sizes, threads=args.threads, timeout=args.timeout)
+    columns = ["load_seconds", "p50_ms", "p95_ms", "max_rss_mb", "max_score_diff", "mean_score_diff", "min_embedding_cosine"]
+    width = max(8, *(len(name) for name in benchmark))
+    print(f"{'backend':<{width}} " + "  ".join(columns))
+    for name, row in benchmark.items():
+        if "error" in row:
+            print(f"{name:<{width}} failed: {row['error']}")
+        else:
+            print(f"{name:<{width}} " + "  ".join(f"{row[column]:>{len(column)}}" for column in columns))
+    failed = [name for name, row in benchmark.items() if "error" in row]
+    if failed:
+        print(f"{', '.join(failed)} did not complete.")
+    inaccurate = [name for name, row in benchmark.items() if "error" not in row and not row["within_tolerance"]]
+    if inaccurate:
+        print(f"Scores of {', '.join(inaccurate)} differ from {args.backends[0]} by more than {args.tolerance} points.")
+    if failed or inaccurate:
+        sys.exit(1)
@@ -0,0 +1,257 @@
+import mmap
+import os
+import struct
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from backend.config import DATA_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-writer use only
+    fcntl = None
+
+DEFAULT_STORE_PATH = os.path.join(DATA_DIR, "embeddings")
+
+# Two files per store, both fixed-width so row i of one matches row i of the other:
+#   <path>.vec  64-byte header, then one row per embedding
+#   <path>.ids  one ID_WIDTH-byte, NUL-padded UTF-8 id per row
+# Rows are only ever appended. The header's row count is updated after the rows are
+# written, so readers never see a partial row and a crashed writer's tail is ignored.
+_MAGIC = b"PSEMBED\x00"
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sIIIQ")
+_HEADER_SIZE = 64
+_COUNT_OFFSET = 20
+ID_WIDTH = 64
+
+FLOAT16 = "float16"
+INT8 = "int8"
+_DTYPE_CODES = {FLOAT16: 1, INT8: 2}
+_DTYPE_NAMES = {code: name for name, code in _DTYPE_CODES.items()}
+
+# Rows scored per step in search(), bounding the float32 scratch memory.
+_SEARCH_CHUNK_ROWS = 65536
+
+
+def _row_dtype(dtype: str, dim: int) -> np.dtype:
+    if dtype == FLOAT16:
+        return np.dtype([("vec", "<f2", (dim,))])
+    # int8 rows carry their own scale: value = vec * scale.
+    return np.dtype([("scale", "<f4"), ("vec", "i1", (dim,))])
+
+
+class EmbeddingStore:
+    """
+    Append-only, memory-mapped store of normalized embeddings keyed by string ids.
+
+    Any number of processes can open the same store for reading: the vectors are
+    mapped straight from the file, so they share the OS page cache instead of each
+    holding a private copy. Writes are serialized with a file lock.
+    """
+
+    def __init__(self, path: Optional[str] = None, dim: Optional[int] = None, dtype: str = FLOAT16):
+        """
+        Opens (or creates) a store.
+
+        Args:
+            path: Path prefix of the store files. Defaults to DEFAULT_STORE_PATH.
+            dim: Embedding dimension. Required when creating a new store.
+            dtype: FLOAT16 or INT8. Only used when creating a new store.
+        """
+        self.path = path or DEFAULT_STORE_PATH
+        self.vec_path = f"{self.path}.vec"
+        self.ids_path = f"{self.path}.ids"
+        if not os.path.exists(self.vec_path):
+            if dim is None:
+                raise ValueError(f"Embedding store {self.path} does not exist and no dimension was given.")
+            self._create(dim, dtype)
+
+        with open(self.vec_path, "rb") as f:
+            magic, version, self.dim, dtype_code, _ = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported embedding store: {self.vec_path}")
+        self.dtype = _DTYPE_NAMES[dtype_code]
+        self.row_dtype = _row_dtype(self.dtype, self.dim)
+
+        self.count = 0
+        self._rows = None
+        self._ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._vec_map = None
+        self.refresh()
+
+    def _create(self, dim: int, dtype: str) -> None:
+        if dtype not in _DTYPE_CODES:
+            raise ValueError(f"Unsupported dtype: {dtype}")
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.vec_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, dim, _DTYPE_CODES[dtype], 0).ljust(_HEADER_SIZE, b"\x00"))
+        open(self.ids_path, "ab").close()
+        try:
+            # Fails if another process created the store first, which is fine.
+            os.link(tmp_path, self.vec_path)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp_path)
+
+    @staticmethod
+    def _read_count(f) -> int:
+        f.seek(_COUNT_OFFSET)
+        return struct.unpack("<Q", f.read(8))[0]
+
+    def refresh(self) -> int:
+        """Maps rows appended by other processes since the last refresh. Returns the row count."""
+        with open(self.vec_path, "rb") as f:
+            count = self._read_count(f)
+            if count == self.count and self._rows is not None:
+                return count
+            # The previous mapping is released once no array refers to it.
+            size = _HEADER_SIZE + count * self.row_dtype.itemsize
+            self._vec_map = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) if count else None
+
+        self._rows = (
+            np.frombuffer(self._vec_map, dtype=self.row_dtype, count=count, offset=_HEADER_SIZE)
+            if count else np.empty(0, dtype=self.row_dtype)
+        )
+        with open(self.ids_path, "rb") as f:
+            f.seek(len(self._ids) * ID_WIDTH)
+            data = f.read((count - len(self._ids)) * ID_WIDTH)
+        for offset in range(0, len(data), ID_WIDTH):
+            row = len(self._ids)
+            key = data[offset:offset + ID_WIDTH].rstrip(b"\x00").decode("utf-8")
+            self._ids.append(key)
+            # Later rows replace earlier ones with the same id.
+            self._index[key] = row
+        self.count = count
+        return count
+
+    def _encode_rows(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        rows = np.zeros(len(vectors), dtype=self.row_dtype)
+        if self.dtype == FLOAT16:
+            rows["vec"] = vectors.astype(np.float16)
+        else:
+            scales = np.clip(np.abs(vectors).max(axis=1), 1e-12, None) / 127.0
+            rows["scale"] = scales
+            rows["vec"] = np.round(vectors / scales[:, None]).astype(np.int8)
+        return rows
+
+    def append(self, ids: Iterable[str], vectors) -> None:
+        """
+        Appends embeddings. Vectors are L2-normalized before quantization, so search
+        scores are cosine similarities. Re-appending an id supersedes its old row.
+        """
+        ids = [str(i) for i in ids]
+        rows = self._encode_rows(vectors)
+        if len(ids) != len(rows):
+            raise ValueError("The number of ids and vectors must match.")
+        encoded_ids = []
+        for key in ids:
+            raw = key.encode("utf-8")
+            if len(raw) > ID_WIDTH or b"\x00" in raw:
+                raise ValueError(f"Invalid embedding id: {key!r}")
+            encoded_ids.append(raw.ljust(ID_WIDTH, b"\x00"))
+
+        with open(self.vec_path, "r+b") as vec_file, open(self.ids_path, "r+b") as ids_file:
+            if fcntl:
+                fcntl.flock(vec_file, fcntl.LOCK_EX)
+            try:
+                count = self._read_count(vec_file)
+                # Anything past the committed count is the tail of a crashed write.
+                vec_file.seek(_HEADER_SIZE + count * self.row_dtype.itemsize)
+                vec_file.write(rows.tobytes())
+                vec_file.truncate()
+                ids_file.seek(count * ID_WIDTH)
+                ids_file.write(b"".join(encoded_ids))
+                ids_file.truncate()
+                vec_file.flush()
+                ids_file.flush()
+                os.fsync(vec_file.fileno())
+                os.fsync(ids_file.fileno())
+
+                vec_file.seek(_COUNT_OFFSET)
+                vec_file.write(struct.pack("<Q", count + len(rows)))
+                vec_file.flush()
+            finally:
+                if fcntl:
+                    fcntl.flock(vec_file, fcntl.LOCK_UN)
+        self.refresh()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: str) -> bool:
+        return str(key) in self._index
+
+    def _decode(self, rows: np.ndarray) -> np.ndarray:
+        if self.dtype == FLOAT16:
+            return rows["vec"].astype(np.float32)
+        return rows["vec"].astype(np.float32) * rows["scale"][:, None]
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Returns the float32 embedding for an id, or None."""
+        row = self._index.get(str(key))
+        if row is None:
+            return None
+        return self._decode(self._rows[row:row + 1])[0]
+
+    def search(self, query, k: int = 10, ids: Optional[Iterable[str]] = None) -> List[Tuple[str, float]]:
+        """
+        Finds the k ids most similar to the query.
+
+        Args:
+            query: A query embedding.
+            k: Number of results.
+            ids: Restrict the search to these ids.
+
+        Returns:
+            (id, cosine similarity) pairs, best first.
+        """
+        self.refresh()
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+
+        if ids is not None:
+            candidate_rows = np.array(sorted(self._index[str(i)] for i in ids if str(i) in self._index), dtype=np.int64)
+        else:
+            # Only the latest row of each id is live.
+            candidate_rows = np.fromiter(self._index.values(), dtype=np.int64, count=len(self._index))
+            candidate_rows.sort()
+        if len(candidate_rows) == 0:
+            return []
+
+        scores = np.empty(len(candidate_rows), dtype=np.float32)
+        for start in range(0, len(candidate_rows), _SEARCH_CHUNK_ROWS):
+            chunk = candidate_rows[start:start + _SEARCH_CHUNK_ROWS]
+            scores[start:start + len(chunk)] = self._decode(self._rows[chunk]) @ query
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self._ids[candidate_rows[i]], float(scores[i])) for i in top]
+
+    def close(self) -> None:
+        self._rows = None
+        self._vec_map = None
+
+
+_store: Optional[EmbeddingStore] = None
+_lock = threading.Lock()
+
+
+def get_embedding_store(dim: Optional[int] = None) -> EmbeddingStore:
+    """
+    Returns this process' EmbeddingStore at DEFAULT_STORE_PATH, opened on first use.
+    Kept open so each append only reads the rows added since the last one.
+    """
+    global _store
+    with _lock:
+        if _store is None:
+            _store = EmbeddingStore(dim=dim)
+        return _store
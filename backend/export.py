@@ -0,0 +1,310 @@
+import csv
+import io
+import json
+import os
+import sqlite3
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from backend.candidate_store import CandidateStore
+
+CSV = "csv"
+JSONL = "jsonl"
+STORE = "store"
+JOBS = "jobs"
+
+# Rows read from SQLite and written to the file at a time. Memory use depends on
+# this, not on how many analyses are exported.
+CHUNK_SIZE = 500
+
+SKILL_GROUPS = ("technical_skills", "soft_skills", "keywords")
+CSV_COLUMNS = (
+    ["candidate_id", "jd_id", "jd_title", "job_id", "candidate_name", "email", "phone", "linkedin_url", "github_url",
+     "match_score", "degraded"]
+    + [f"{kind}_{group}" for group in SKILL_GROUPS for kind in ("matching", "missing")]
+    + ["executive_summary", "analyzed_at"]
+)
+_CONTACT_FIELDS = ("candidate_name", "email", "phone", "linkedin_url", "github_url")
+# Stored candidate columns used when the analysis has no contact field.
+_STORE_CONTACT_COLUMNS = {"candidate_name": "name", "email": "email", "phone": "phone",
+                          "linkedin_url": "linkedin", "github_url": "github"}
+
+
+def iter_store_analyses(
+    store: CandidateStore,
+    jd_id: Optional[int] = None,
+    min_score: Optional[float] = None,
+    since: Optional[float] = None,
+    after: Optional[list] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[Tuple[list, dict]]:
+    """
+    Streams stored analyses, oldest first, one page of `chunk_size` rows at a time.
+
+    Pages are read by keyset (analyzed time, candidate id, JD id), so no read
+    transaction stays open between pages and a later export can continue `after`
+    the last row seen. A re-analyzed pair moves to the end and is exported again.
+
+    Yields:
+        (cursor, record) pairs; the record has the ids, JD title, analysis time,
+        stored contact details and the full analysis.
+    """
+    clauses, params = [], []
+    if jd_id is not None:
+        clauses.append("a.jd_id = ?")
+        params.append(jd_id)
+    if min_score is not None:
+        clauses.append("a.match_score >= ?")
+        params.append(min_score)
+    if since is not None:
+        clauses.append("a.created_at >= ?")
+        params.append(since)
+    cursor = list(after) if after else None
+    while True:
+        page_clauses, page_params = list(clauses), list(params)
+        if cursor:
+            page_clauses.append("(a.created_at, a.candidate_id, a.jd_id) > (?, ?, ?)")
+            page_params.extend(cursor)
+        sql = (
+            "SELECT a.candidate_id, a.jd_id, a.result, a.created_at, j.title AS jd_title, "
+            "c.name, c.email, c.phone, c.linkedin, c.github "
+            "FROM analyses a JOIN candidates c ON c.id = a.candidate_id "
+            "JOIN job_descriptions j ON j.id = a.jd_id"
+        )
+        if page_clauses:
+            sql += " WHERE " + " AND ".join(page_clauses)
+        sql += " ORDER BY a.created_at, a.candidate_id, a.jd_id LIMIT ?"
+        rows = store.conn.execute(sql, page_params + [chunk_size]).fetchall()
+        for row in rows:
+            cursor = [row["created_at"], row["candidate_id"], row["jd_id"]]
+            yield cursor, {
+                "candidate_id": row["candidate_id"],
+                "jd_id": row["jd_id"],
+                "jd_title": row["jd_title"],
+                "analyzed_at": row["created_at"],
+                "candidate": {field: row[column] for field, column in _STORE_CONTACT_COLUMNS.items()},
+                "analysis": json.loads(row["result"]),
+            }
+        if len(rows) < chunk_size:
+            return
+
+
+def iter_job_results(
+    db_path: Optional[str] = None,
+    kind: str = "analyze_resume",
+    min_score: Optional[float] = None,
+    since: Optional[float] = None,
+    after: Optional[list] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[Tuple[list, dict]]:
+    """
+    Streams the results of finished background jobs, in the order they finished.
+
+    Yields:
+        (cursor, record) pairs; the record has the job id, finish time and analysis.
+    """
+    from backend.job_queue import DEFAULT_DB_PATH, DONE
+
+    conn = sqlite3.connect(f"file:{db_path or DEFAULT_DB_PATH}?mode=ro", uri=True, timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        cursor = list(after) if after else None
+        while True:
+            clauses, params = ["kind = ?", "status = ?", "result IS NOT NULL"], [kind, DONE]
+            if since is not None:
+                clauses.append("updated_at >= ?")
+                params.append(since)
+            if cursor:
+                clauses.append("(updated_at, id) > (?, ?)")
+                params.extend(cursor)
+            rows = conn.execute(
+                f"SELECT id, result, updated_at FROM jobs WHERE {' AND '.join(clauses)} "
+                "ORDER BY updated_at, id LIMIT ?",
+                params + [chunk_size],
+            ).fetchall()
+            for row in rows:
+                cursor = [row["updated_at"], row["id"]]
+                analysis = json.loads(row["result"])
+                if min_score is not None and (analysis.get("match_score") or 0) < min_score:
+                    continue
+                yield cursor, {"job_id": row["id"], "analyzed_at": row["updated_at"], "analysis": analysis}
+            if len(rows) < chunk_size:
+                return
+    finally:
+        conn.close()
+
+
+def csv_row(record: dict) -> list:
+    """Flattens an export record into CSV_COLUMNS: scores, contact details and skill lists."""
+    analysis = record["analysis"]
+    candidate = record.get("candidate", {})
+    skills = analysis.get("skills_analysis") or {}
+    values = {
+        "candidate_id": record.get("candidate_id"),
+        "jd_id": record.get("jd_id"),
+        "jd_title": record.get("jd_title"),
+        "job_id": record.get("job_id"),
+        "match_score": analysis.get("match_score"),
+        "degraded": bool(analysis.get("degraded")),
+        "executive_summary": analysis.get("executive_summary"),
+        "analyzed_at": record.get("analyzed_at"),
+    }
+    for field in _CONTACT_FIELDS:
+        values[field] = analysis.get(field) or candidate.get(field)
+    for group in SKILL_GROUPS:
+        for kind in ("matching", "missing"):
+            values[f"{kind}_{group}"] = "; ".join((skills.get(group) or {}).get(kind) or [])
+    return [values[column] for column in CSV_COLUMNS]
+
+
+def _encode_chunk(records: List[dict], fmt: str) -> bytes:
+    if fmt == JSONL:
+        return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode("utf-8")
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(csv_row(record) for record in records)
+    return buffer.getvalue().encode("utf-8")
+
+
+def _csv_header() -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(CSV_COLUMNS)
+    return buffer.getvalue().encode("utf-8")
+
+
+def checkpoint_path(path: str) -> str:
+    return f"{path}.checkpoint"
+
+
+def _read_checkpoint(path: str) -> Optional[dict]:
+    try:
+        with open(checkpoint_path(path), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_checkpoint(path: str, checkpoint: dict) -> None:
+    tmp_path = f"{checkpoint_path(path)}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, checkpoint_path(path))
+
+
+def export(
+    path: str,
+    fmt: Optional[str] = None,
+    source: str = STORE,
+    resume: bool = False,
+    chunk_size: int = CHUNK_SIZE,
+    store: Optional[CandidateStore] = None,
+    jobs_db_path: Optional[str] = None,
+    progress=None,
+    **filters,
+) -> dict:
+    """
+    Exports analyses to a CSV or JSONL file in constant memory.
+
+    Records are streamed from the candidate store (or finished background jobs) and
+    written one chunk at a time. After each chunk, a checkpoint next to the file
+    records the last exported row and the file size. With `resume`, an export
+    continues from its checkpoint: an interrupted export picks up where it stopped
+    (a partly written chunk is cut off), and a finished one appends only the
+    analyses added or redone since, which suits periodic ATS syncs.
+
+    Args:
+        path: Output file.
+        fmt: CSV or JSONL. Defaults to the file extension.
+        source: STORE for stored analyses, JOBS for background job results.
+        resume: Continue from the checkpoint instead of starting over.
+        progress: Optional callback receiving the number of records exported so far.
+        **filters: jd_id, min_score and since (a Unix time), passed to the source.
+
+    Returns:
+        A summary with the records "exported" in this run, the "total" in the file
+        and the checkpoint "cursor".
+    """
+    fmt = fmt or (CSV if path.lower().endswith(".csv") else JSONL)
+    if fmt not in (CSV, JSONL):
+        raise ValueError(f"Unknown export format: {fmt}")
+    if source == JOBS and filters.get("jd_id") is not None:
+        raise ValueError("Job results cannot be filtered by jd_id")
+    filters = {key: value for key, value in filters.items() if value is not None}
+    # "since" only matters for the first run; after that the checkpoint cursor is later.
+    settings = {"format": fmt, "source": source,
+                "filters": {key: value for key, value in filters.items() if key != "since"}}
+
+    checkpoint = _read_checkpoint(path) if resume else None
+    if checkpoint is not None and {key: checkpoint.get(key) for key in settings} != settings:
+        raise ValueError(f"{checkpoint_path(path)} was written with different settings: {checkpoint}")
+    if checkpoint is None or not os.path.exists(path):
+        checkpoint = dict(settings, cursor=None, offset=0, total=0)
+
+    own_store = store is None and source == STORE
+    if own_store:
+        store = CandidateStore()
+    if source == STORE:
+        records: Iterable = iter_store_analyses(store, after=checkpoint["cursor"], chunk_size=chunk_size, **filters)
+    else:
+        records = iter_job_results(jobs_db_path, after=checkpoint["cursor"], chunk_size=chunk_size, **filters)
+
+    exported = 0
+    try:
+        with open(path, "r+b" if checkpoint["offset"] else "wb") as f:
+            f.seek(checkpoint["offset"])
+            f.truncate()
+            if fmt == CSV and checkpoint["offset"] == 0:
+                f.write(_csv_header())
+            chunk, cursor = [], checkpoint["cursor"]
+            for cursor, record in records:
+                chunk.append(record)
+                if len(chunk) == chunk_size:
+                    exported += _flush(f, path, chunk, fmt, cursor, checkpoint)
+                    if progress:
+                        progress(checkpoint["total"])
+            exported += _flush(f, path, chunk, fmt, cursor, checkpoint)
+    finally:
+        if own_store:
+            store.close()
+    return {"exported": exported, "total": checkpoint["total"], "cursor": checkpoint["cursor"]}
+
+
+def _flush(f, path: str, chunk: List[dict], fmt: str, cursor, checkpoint: dict) -> int:
+    """Writes a chunk, then checkpoints it. Returns the number of records written and clears the chunk."""
+    count = len(chunk)
+    if chunk:
+        f.write(_encode_chunk(chunk, fmt))
+    f.flush()
+    os.fsync(f.fileno())
+    checkpoint.update(cursor=cursor, offset=f.tell(), total=checkpoint["total"] + count)
+    _write_checkpoint(path, checkpoint)
+    chunk.clear()
+    return count
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    arg_parser = argparse.ArgumentParser(description="Export analyses to CSV or JSONL.")
+    arg_parser.add_argument("path", help="Output file; .csv for CSV, anything else for JSONL.")
+    arg_parser.add_argument("--format", choices=[CSV, JSONL])
+    arg_parser.add_argument("--source", choices=[STORE, JOBS], default=STORE)
+    arg_parser.add_argument("--jd-id", type=int)
+    arg_parser.add_argument("--min-score", type=float)
+    arg_parser.add_argument("--since-days", type=float, help="Only analyses from the last N days.")
+    arg_parser.add_argument("--resume", action="store_true",
+                            help="Continue an interrupted export, or append what is new since the last one.")
+    args = arg_parser.parse_args()
+
+    started = time.perf_counter()
+    summary = export(
+        args.path,
+        fmt=args.format,
+        source=args.source,
+        resume=args.resume,
+        progress=lambda total: print(f"{total} exported...", end="\r"),
+        jd_id=args.jd_id,
+        min_score=args.min_score,
+        since=time.time() - args.since_days * 86400 if args.since_days else None,
+    )
+    print(f"Exported {summary['exported']} analyses ({summary['total']} in {args.path}) "
+          f"in {time.perf_counter() - started:.1f}s")
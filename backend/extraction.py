@@ -0,0 +1,220 @@
+import re
+from typing import Callable, Dict, Iterable, List, Optional
+
+from backend.section_segmenter import HEADING_ALTERNATION, HEADINGS, canonical_section, join_sections, segment, select
+
+# Resume entity extraction. Each part of the output is produced by a named stage,
+# and callers choose which stages run:
+#   extract_resume(text)                          # everything
+#   extract_resume(text, stages=["contact"])      # regexes only, no model needed
+# Only the "ner" stage uses spaCy, so the pipeline is not even loaded unless it runs.
+
+_EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+# Various formats, e.g. +1 (123) 456-7890, 123-456-7890, 123.456.7890 ext 12
+_PHONE_PATTERN = re.compile(
+    r'(?:\+\d{1,4}[-.\s]?)?\(?\d{3,4}\)?[-.\s]?\d{3,4}[-.\s]?\d{3,4}(?:\s*(?:ext|x|\#)\s*\d{2,6})?'
+)
+_LINKEDIN_PATTERN = re.compile(r'(?:https?:\/\/)?(?:www\.)?linkedin\.com\/in\/[a-zA-Z0-9-]+\/?')
+_GITHUB_PATTERN = re.compile(r'(?:https?:\/\/)?(?:www\.)?github\.com\/[a-zA-Z0-9-]+\/?')
+
+# "Software Engineer at Acme Corp (Jan 2020 - Present)" and the same split over lines.
+_MONTH = r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*'
+_EXPERIENCE_ENTRY_PATTERN = re.compile(rf'''
+    ^(?!(?i:{HEADING_ALTERNATION})[ \t]*:?[ \t]*$)     # (not a section heading)
+    ([A-Z][a-z]+(?:[ \t][A-Z][a-z]+)*)          # Job Title (one line)
+    (?:\s+at\s+|\s*\n)                           # Separator
+    ([A-Z][a-zA-Z0-9\s,]+)                      # Company
+    (?:\s*\n|\s*\()                             # Separator
+    ({_MONTH}\s\d{{4}})                          # Start Date
+    (?:\s*-\s*)                                  # Separator
+    ({_MONTH}\s\d{{4}}|Present)                  # End Date
+''', re.VERBOSE | re.MULTILINE)
+
+EDUCATION_KEYWORDS = ["education", "academic background", "qualifications"]
+PROJECTS_KEYWORDS = ["projects", "personal projects", "academic projects"]
+
+# Sections the experience stage reads. A resume with none of them (no recognizable
+# headings) is processed whole. Skills are matched on the whole text: they are listed
+# in headers and under headings of every kind.
+EXPERIENCE_SECTIONS = ("experience",)
+
+# The candidate's name is almost always in the header, so NER first runs on this many
+# leading characters and only parses the whole resume if no name is found there.
+NER_WINDOW = 2000
+
+
+class ExtractionContext:
+    """The text being extracted, plus anything stages share (parsed lazily)."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self._nlp = None
+        self._sections = None
+
+    @property
+    def sections(self):
+        if self._sections is None:
+            self._sections = segment(self.text)
+        return self._sections
+
+    def section_text(self, names: Iterable[str], fallback: bool = True) -> str:
+        """The text of the named sections, or the whole text if there are none and `fallback` is set."""
+        sections = select(self.sections, names)
+        if not sections:
+            return self.text if fallback else ""
+        return join_sections(self.text, sections)
+
+    @property
+    def nlp(self):
+        if self._nlp is None:
+            from backend.models import get_nlp
+            self._nlp = get_nlp()
+        return self._nlp
+
+
+# Registry of stage names to the functions that run them. A stage receives the
+# context and returns the output fields it fills in.
+STAGES: Dict[str, Callable[[ExtractionContext], dict]] = {}
+
+
+def stage(name: str):
+    """Decorator that registers a function as an extraction stage."""
+    def register(func):
+        STAGES[name] = func
+        return func
+    return register
+
+
+def empty_result() -> dict:
+    """The output schema of `extract_resume`, with every field unset."""
+    return {
+        "name": None,
+        "contact": {"email": None, "phone": None, "linkedin": None, "github": None},
+        "skills": [],
+        "categorized_skills": {},
+        "experience": [],
+        "education": [],
+        "projects": [],
+    }
+
+
+def _first_match(pattern: re.Pattern, text: str) -> Optional[str]:
+    match = pattern.search(text)
+    return match.group(0) if match else None
+
+
+def extract_contact_info(text: str) -> Dict[str, Optional[str]]:
+    """Extract contact information from text, returning single entries for each."""
+    return {
+        "email": _first_match(_EMAIL_PATTERN, text),
+        "phone": _first_match(_PHONE_PATTERN, text),
+        "linkedin": _first_match(_LINKEDIN_PATTERN, text),
+        "github": _first_match(_GITHUB_PATTERN, text),
+    }
+
+
+def extract_experience(text: str) -> list:
+    """Extract work experience entries (title, company, start and end date) from resume text."""
+    return [
+        {
+            'title': match.group(1).strip(),
+            'company': match.group(2).strip(),
+            'start_date': match.group(3).strip(),
+            'end_date': match.group(4).strip()
+        }
+        for match in _EXPERIENCE_ENTRY_PATTERN.finditer(text)
+    ]
+
+
+def extract_section(text: str, keywords: Iterable[str]) -> Dict[str, str]:
+    """
+    Returns the body of every section whose heading is one of `keywords`.
+
+    Headings are recognized by backend.section_segmenter, and `keywords` may be
+    any of its heading aliases or canonical names.
+
+    Returns:
+        A dict of canonical section name to section text.
+    """
+    names = {keyword.lower() if keyword.lower() in HEADINGS else canonical_section(keyword) for keyword in keywords}
+    sections = {}
+    for section in select(segment(text), names):
+        body = text[section.start:section.end].strip()
+        sections[section.name] = f"{sections[section.name]}\n{body}" if section.name in sections else body
+    return sections
+
+
+def _lines(text: str) -> List[str]:
+    return [line.strip() for line in text.split('\n') if line.strip()]
+
+
+@stage("contact")
+def _contact_stage(ctx: ExtractionContext) -> dict:
+    return {"contact": extract_contact_info(ctx.text)}
+
+
+@stage("ner")
+def _ner_stage(ctx: ExtractionContext) -> dict:
+    def first_person(text):
+        return next((ent.text for ent in ctx.nlp(text).ents if ent.label_ == "PERSON"), None)
+
+    name = first_person(ctx.text[:NER_WINDOW])
+    if name is None and len(ctx.text) > NER_WINDOW:
+        name = first_person(ctx.text)
+    return {"name": name}
+
+
+@stage("skills")
+def _skills_stage(ctx: ExtractionContext) -> dict:
+    from backend.skill_matcher import extract_skills
+    return extract_skills(ctx.text)
+
+
+@stage("experience")
+def _experience_stage(ctx: ExtractionContext) -> dict:
+    return {"experience": extract_experience(ctx.section_text(EXPERIENCE_SECTIONS))}
+
+
+@stage("sections")
+def _sections_stage(ctx: ExtractionContext) -> dict:
+    return {
+        "education": _lines(ctx.section_text(["education"], fallback=False)),
+        "projects": _lines(ctx.section_text(["projects"], fallback=False)),
+    }
+
+
+DEFAULT_STAGES = ("contact", "ner", "skills", "experience", "sections")
+
+
+def extract_resume(text: str, stages: Optional[Iterable[str]] = None) -> dict:
+    """
+    Extracts entities from resume text.
+
+    Args:
+        text: The text content of the resume.
+        stages: Names of the stages to run (see STAGES). Defaults to all of them.
+
+    Returns:
+        A dict with every field of `empty_result()`. Fields of stages that did not
+        run keep their empty values.
+    """
+    ctx = ExtractionContext(text)
+    result = empty_result()
+    for name in stages if stages is not None else DEFAULT_STAGES:
+        if name not in STAGES:
+            raise ValueError(f"Unknown extraction stage: {name}")
+        result.update(STAGES[name](ctx))
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    arg_parser = argparse.ArgumentParser(description="Extract entities from a plain-text resume.")
+    arg_parser.add_argument("path", help="Path to a plain-text resume.")
+    arg_parser.add_argument("--stages", default=",".join(DEFAULT_STAGES), help="Comma-separated stages to run.")
+    args = arg_parser.parse_args()
+
+    with open(args.path, encoding="utf-8") as f:
+        print(json.dumps(extract_resume(f.read(), args.stages.split(",")), indent=2))
@@ -1,49 +1,90 @@
-from sentence_transformers import SentenceTransformer, util
 import numpy as np
 
+from backend.models import encoder_backend, get_encoder
+from backend.taxonomy import get_taxonomy
+
 # Load a pre-trained sentence transformer model. This is done once when the module is loaded.
-# The model is optimized for semantic similarity tasks.
-model = SentenceTransformer('all-MiniLM-L6-v2')
+# The model is optimized for semantic similarity tasks. When a model server runs on this
+# host, the model lives there and is shared by every process.
+model = get_encoder()
 
-def calculate_similarity(resume_skills: list, jd_skills: list) -> float:
+def encode_skills(skills: list, encoder=None) -> np.ndarray:
     """
-    Calculates a similarity score between resume skills and job description skills
-    using sentence embeddings and cosine similarity.
+    Encodes skills into embeddings, reusing the precomputed embeddings of the
+    compiled skill taxonomy for canonical skill names.
 
     Args:
-        resume_skills: A list of skills extracted from the resume.
-        jd_skills: A list of skills extracted from the job description.
-
-    Returns:
-        A float representing the similarity score, from 0 to 100.
+        skills: The skills to encode.
+        encoder: The model to use. Defaults to the module's model.
     """
-    if not jd_skills or not resume_skills:
-        return 0.0
+    encoder = encoder or model
+    embeddings = np.empty((len(skills), encoder.get_sentence_embedding_dimension()), dtype=np.float32)
 
-    # Convert skill lists to embeddings (vectors)
-    resume_embeddings = model.encode(resume_skills, convert_to_tensor=True)
-    jd_embeddings = model.encode(jd_skills, convert_to_tensor=True)
+    # The taxonomy embeddings are computed with the full-precision model.
+    taxonomy = get_taxonomy()
+    use_precomputed = encoder_backend(encoder) == "torch" and taxonomy.embeddings is not None
+    missing = []
+    for i, skill in enumerate(skills):
+        row = taxonomy.embedding_index.get(skill) if use_precomputed else None
+        if row is None:
+            missing.append(i)
+        else:
+            embeddings[i] = taxonomy.embeddings[row]
+    if missing:
+        embeddings[missing] = encoder.encode([skills[i] for i in missing], convert_to_numpy=True)
+    return embeddings
+
+def cosine_similarity_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Cosine similarity between every row of `a` and every row of `b`."""
+    a = a / np.clip(np.linalg.norm(a, axis=1, keepdims=True), 1e-12, None)
+    b = b / np.clip(np.linalg.norm(b, axis=1, keepdims=True), 1e-12, None)
+    return a @ b.T
+
+def similarity_from_embeddings(resume_embeddings: np.ndarray, jd_embeddings: np.ndarray) -> float:
+    """Scores already-encoded resume skills against already-encoded JD skills (0 to 100)."""
+    if len(resume_embeddings) == 0 or len(jd_embeddings) == 0:
+        return 0.0
 
     # Calculate cosine similarity between each resume skill and all JD skills
-    cosine_scores = util.cos_sim(resume_embeddings, jd_embeddings)
+    cosine_scores = cosine_similarity_matrix(resume_embeddings, jd_embeddings)
 
     # For each resume skill, find the highest similarity score against any JD skill.
     # This means if a resume has 'react', it will be matched with 'react.js' in the JD.
-    max_scores = np.max(cosine_scores.cpu().numpy(), axis=1)
-    
+    max_scores = np.max(cosine_scores, axis=1)
+
     # Calculate the average similarity for resume skills
     avg_resume_similarity = np.mean(max_scores) if len(max_scores) > 0 else 0
-    
+
     # Calculate how many of the JD skills were matched (similarity > 0.7)
-    matched_jd_skills = np.sum(np.max(cosine_scores.cpu().numpy(), axis=0) > 0.7)
-    jd_coverage = matched_jd_skills / len(jd_skills) if jd_skills else 0
-    
+    matched_jd_skills = np.sum(np.max(cosine_scores, axis=0) > 0.7)
+    jd_coverage = matched_jd_skills / len(jd_embeddings)
+
     # Combine both metrics (50% weight each)
     final_score = (avg_resume_similarity * 0.5 + jd_coverage * 0.5) * 100
-    
+
     # Apply a non-linear scaling to make the scores more meaningful
     # This makes it harder to get very high scores without good matches
     final_score = 100 * (1 - np.exp(-final_score / 30))
-    
+
     # Ensure the score is between 0 and 100
-    return min(max(round(final_score, 1), 0), 100)
+    return float(min(max(round(final_score, 1), 0), 100))
+
+def calculate_similarity(resume_skills: list, jd_skills: list) -> float:
+    """
+    Calculates a similarity score between resume skills and job description skills
+    using sentence embeddings and cosine similarity.
+
+    Args:
+        resume_skills: A list of skills extracted from the resume.
+        jd_skills: A list of skills extracted from the job description.
+
+    Returns:
+        A float representing the similarity score, from 0 to 100.
+    """
+    if not jd_skills or not resume_skills:
+        return 0.0
+
+    # Convert skill lists to embeddings (vectors)
+    resume_embeddings = encode_skills(resume_skills)
+    jd_embeddings = encode_skills(jd_skills)
+    return similarity_from_embeddings(resume_embeddings, jd_embeddings)
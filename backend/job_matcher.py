@@ -0,0 +1,347 @@
+import os
+import pickle
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from backend.candidate_store import content_hash
+from backend.config import DATA_DIR
+
+DEFAULT_INDEX_PATH = os.path.join(DATA_DIR, "job_index.bin")
+_FORMAT_VERSION = 2
+# JDs kept in the index; the least recently added or matched ones are dropped beyond this.
+MAX_INDEXED_JOBS = int(os.environ.get("PROSCAN_JOB_INDEX_SIZE", "10000"))
+
+# Same threshold as jd_comparator.similarity_from_embeddings: a JD skill counts as
+# covered when some resume skill is at least this similar to it.
+SKILL_MATCH_THRESHOLD = 0.7
+
+
+def _unit(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.clip(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12, None)
+
+
+class JobIndex:
+    """
+    Job descriptions prepared for matching one resume against all of them at once.
+
+    Each JD is reduced to its skills (with any minimum experience) once. Skills
+    are embedded once for the whole index, so scoring a resume is a single matrix
+    product against the skill vocabulary plus a few reductions per JD.
+
+    JDs are keyed by their id when they have one, else by their text, so two
+    requisitions with the same text stay apart and an edited JD replaces its old
+    text. Not thread-safe; the shared index is only used under `_lock`.
+    """
+
+    def __init__(self):
+        self.jobs: List[dict] = []
+        self._by_key: Dict[str, int] = {}
+        self.dirty = False
+        self.vocabulary: List[str] = []
+        self._vocabulary_index: Dict[str, int] = {}
+        self.embeddings: Optional[np.ndarray] = None
+        self.encoder_backend: Optional[str] = None
+        # Flattened (JD, skill) pairs: vocabulary column of each pair, and each JD's
+        # offset and number of pairs.
+        self._columns: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._sizes: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+    def add(self, jd_text: str, jd_id=None, title: Optional[str] = None) -> int:
+        """
+        Adds a job description, or replaces the text of the one with the same id, and
+        returns its position in the index. An unchanged JD is only marked as used.
+        """
+        digest = content_hash(jd_text)
+        key = f"id:{jd_id}" if jd_id is not None else f"text:{digest}"
+        position = self._by_key.get(key)
+        if position is not None and self.jobs[position]["hash"] == digest:
+            job = self.jobs[position]
+            job["title"] = job["title"] if title is None else title
+            job["used"] = time.time()
+            return position
+        from backend.skill_matcher import get_matcher
+
+        skills = {
+            skill["name"]: skill["experience"]
+            for category_skills in get_matcher().extract(jd_text)["categorized_skills"].values()
+            for skill in category_skills
+        }
+        for skill in skills:
+            if skill not in self._vocabulary_index:
+                self._vocabulary_index[skill] = len(self.vocabulary)
+                self.vocabulary.append(skill)
+        job = {"id": jd_id, "title": title, "key": key, "hash": digest, "text": jd_text, "skills": skills,
+               "used": time.time()}
+        if position is None:
+            position = len(self.jobs)
+            self.jobs.append(job)
+            self._by_key[key] = position
+        else:
+            self.jobs[position] = job
+        self._columns = None
+        self.dirty = True
+        return position
+
+    def add_many(self, jds: Iterable[Union[str, dict]]) -> List[int]:
+        """Adds JD texts or dicts with "text" and optional "id" and "title"."""
+        positions = []
+        for jd in jds:
+            if isinstance(jd, str):
+                positions.append(self.add(jd))
+            else:
+                positions.append(self.add(jd["text"], jd.get("id"), jd.get("title")))
+        return positions
+
+    def evict(self, max_jobs: int, keep: Iterable[int] = ()) -> None:
+        """
+        Drops the least recently used JDs beyond `max_jobs`, never those at the `keep`
+        positions, and the skills no remaining JD needs. Positions change.
+        """
+        if len(self.jobs) <= max_jobs:
+            return
+        keep = set(keep)
+        candidates = sorted((i for i in range(len(self.jobs)) if i not in keep), key=lambda i: self.jobs[i]["used"])
+        drop = set(candidates[:len(self.jobs) - max_jobs])
+        self.jobs = [job for i, job in enumerate(self.jobs) if i not in drop]
+        self._by_key = {job["key"]: i for i, job in enumerate(self.jobs)}
+        needed = {skill for job in self.jobs for skill in job["skills"]}
+        kept = [i for i, skill in enumerate(self.vocabulary) if skill in needed]
+        if self.embeddings is not None:
+            # Embedded skills are a prefix of the vocabulary, and stay one.
+            self.embeddings = self.embeddings[[i for i in kept if i < len(self.embeddings)]]
+        self.vocabulary = [self.vocabulary[i] for i in kept]
+        self._vocabulary_index = {skill: i for i, skill in enumerate(self.vocabulary)}
+        self._columns = None
+        self.dirty = True
+
+    def _prepare(self) -> None:
+        """Embeds new vocabulary skills and rebuilds the flattened JD -> skill columns."""
+        from backend.jd_comparator import encode_skills, model
+        from backend.models import encoder_backend
+
+        backend = encoder_backend(model)
+        if self.embeddings is None or self.encoder_backend != backend:
+            self.embeddings, self.encoder_backend = np.empty((0, model.get_sentence_embedding_dimension())), backend
+        if len(self.embeddings) < len(self.vocabulary):
+            new = _unit(encode_skills(self.vocabulary[len(self.embeddings):]))
+            self.embeddings = np.vstack([self.embeddings, new]).astype(np.float32)
+        if self._columns is None:
+            self._columns = np.array(
+                [self._vocabulary_index[skill] for job in self.jobs for skill in job["skills"]], dtype=np.int64
+            )
+            self._sizes = np.array([len(job["skills"]) for job in self.jobs], dtype=np.int64)
+            self._offsets = np.concatenate([[0], np.cumsum(self._sizes)[:-1]]).astype(np.int64)
+
+    def score(self, resume_skills: List[str],
+              resume_vectors: Optional[np.ndarray] = None) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Scores resume skills against every JD in one vectorized pass.
+
+        Args:
+            resume_vectors: The skills' unit embeddings, if already computed.
+
+        Returns:
+            One score (0 to 100) per JD, computed like jd_comparator.calculate_similarity,
+            and the (resume skill x vocabulary) similarities for `skill_matches`.
+        """
+        scores = np.zeros(len(self.jobs), dtype=np.float32)
+        if not resume_skills or not self.jobs:
+            return scores, None
+        from backend.jd_comparator import encode_skills
+
+        self._prepare()
+        if len(self._columns) == 0:
+            return scores, None
+        # (resume skills x vocabulary), then one column per (JD, skill) pair.
+        if resume_vectors is None:
+            resume_vectors = _unit(encode_skills(resume_skills))
+        similarities = resume_vectors @ self.embeddings.T
+        pairs = similarities[:, self._columns]
+
+        has_skills = self._sizes > 0
+        offsets = self._offsets[has_skills]
+        # Best JD skill per resume skill, per JD; then averaged over resume skills.
+        avg_resume_similarity = np.maximum.reduceat(pairs, offsets, axis=1).mean(axis=0)
+        # Share of each JD's skills matched by some resume skill.
+        covered = (pairs.max(axis=0) > SKILL_MATCH_THRESHOLD).astype(np.float32)
+        jd_coverage = np.add.reduceat(covered, offsets) / self._sizes[has_skills]
+
+        final = (avg_resume_similarity * 0.5 + jd_coverage * 0.5) * 100
+        final = 100 * (1 - np.exp(-final / 30))
+        scores[has_skills] = np.clip(np.round(final, 1), 0, 100)
+        return scores, similarities
+
+    def skill_matches(self, position: int, resume_skills: List[str], similarities: Optional[np.ndarray]) -> dict:
+        """Per-skill breakdown for one JD, from the similarities returned by `score`."""
+        job = self.jobs[position]
+        if similarities is None:
+            return {"matched_skills": [], "missing_skills": list(job["skills"])}
+        matched, missing = [], []
+        for skill, months in job["skills"].items():
+            column = similarities[:, self._vocabulary_index[skill]]
+            best = int(np.argmax(column))
+            if column[best] > SKILL_MATCH_THRESHOLD:
+                matched.append({
+                    "skill": skill,
+                    "resume_skill": resume_skills[best],
+                    "similarity": round(float(column[best]), 3),
+                    "required_months": months,
+                })
+            else:
+                missing.append(skill)
+        return {"matched_skills": matched, "missing_skills": missing}
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Writes the index atomically so readers never see a partial file."""
+        path = path or DEFAULT_INDEX_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        data = {
+            "version": _FORMAT_VERSION,
+            "jobs": self.jobs,
+            "vocabulary": self.vocabulary,
+            "embeddings": self.embeddings,
+            "encoder_backend": self.encoder_backend,
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "JobIndex":
+        with open(path or DEFAULT_INDEX_PATH, "rb") as f:
+            data = pickle.load(f)
+        if data.get("version") != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported job index version: {data.get('version')}")
+        index = cls()
+        index.jobs = data["jobs"]
+        index._by_key = {job["key"]: i for i, job in enumerate(index.jobs)}
+        index.vocabulary = data["vocabulary"]
+        index._vocabulary_index = {skill: i for i, skill in enumerate(index.vocabulary)}
+        index.embeddings = data["embeddings"]
+        index.encoder_backend = data["encoder_backend"]
+        return index
+
+
+_cached_index: Optional[JobIndex] = None
+_lock = threading.Lock()
+
+
+def _shared_index(jds: Iterable[Union[str, dict]], path: Optional[str]) -> Tuple[JobIndex, List[int]]:
+    """The process-wide index with `jds` added, and their positions. Call with `_lock` held."""
+    global _cached_index
+    if _cached_index is None:
+        try:
+            _cached_index = JobIndex.load(path)
+        except (OSError, ValueError, KeyError, pickle.UnpicklingError, EOFError):
+            _cached_index = JobIndex()
+    positions = _cached_index.add_many(jds)
+    if len(_cached_index) > MAX_INDEXED_JOBS:
+        keys = [_cached_index.jobs[position]["key"] for position in positions]
+        _cached_index.evict(MAX_INDEXED_JOBS, keep=positions)
+        positions = [_cached_index._by_key[key] for key in keys]
+    if _cached_index.dirty:
+        _cached_index._prepare()
+        _cached_index.save(path)
+    return _cached_index, positions
+
+
+def get_job_index(jds: Iterable[Union[str, dict]] = (), path: Optional[str] = None) -> JobIndex:
+    """
+    Returns the process-wide JobIndex, loaded from disk on first use, with `jds` added.
+    New JDs and skills are saved back so other processes can start from them. Other
+    threads may change the index; use `match_jobs` to score against it.
+    """
+    with _lock:
+        return _shared_index(jds, path)[0]
+
+
+def match_jobs(
+    resume: Union[str, dict],
+    jds: Optional[Iterable[Union[str, dict]]] = None,
+    top_n: int = 10,
+    analyze_top: int = 0,
+) -> List[dict]:
+    """
+    Ranks job descriptions for one resume.
+
+    Args:
+        resume: Resume text, or `extract_resume` output with "skills".
+        jds: JD texts or dicts with "text" and optional "id" and "title". Only these
+            JDs are ranked. Defaults to every JD in the cached index.
+        top_n: Number of jobs returned.
+        analyze_top: Also run the full Gemini analysis for this many of the best jobs.
+
+    Returns:
+        Dicts with the JD "id", "title", "score", "matched_skills" and
+        "missing_skills" (plus "analysis" for the analyzed ones), best first.
+    """
+    from backend.jd_comparator import encode_skills
+
+    if isinstance(resume, str):
+        from backend.skill_matcher import extract_skills
+        resume_text, resume_skills = resume, extract_skills(resume)["skills"]
+    else:
+        resume_text, resume_skills = resume.get("text"), resume.get("skills", [])
+    # Embedded before taking the lock; only the index work is serialized.
+    resume_vectors = _unit(encode_skills(resume_skills)) if resume_skills else None
+
+    jds = list(jds) if jds is not None else None
+    results, texts = [], []
+    with _lock:
+        index, added = _shared_index(jds or (), None)
+        scores, similarities = index.score(resume_skills, resume_vectors)
+        if jds is not None:
+            positions = np.array(sorted(set(added)), dtype=np.int64)
+        else:
+            positions = np.arange(len(index), dtype=np.int64)
+        for position in positions[np.argsort(-scores[positions], kind="stable")][:top_n]:
+            job = index.jobs[position]
+            result = {"id": job["id"], "title": job["title"], "score": round(float(scores[position]), 1)}
+            result.update(index.skill_matches(position, resume_skills, similarities))
+            results.append(result)
+            texts.append(job["text"])
+
+    if analyze_top and resume_text:
+        from backend.resume_analyzer import get_semantic_analysis
+        for result, jd_text in zip(results[:analyze_top], texts):
+            result["analysis"] = get_semantic_analysis(resume_text, jd_text)
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    import glob
+    import time
+
+    arg_parser = argparse.ArgumentParser(description="Rank job descriptions for a resume.")
+    arg_parser.add_argument("resume", help="Plain-text resume.")
+    arg_parser.add_argument("jds", nargs="*", help="Plain-text JD files or glob patterns. Defaults to the cached index.")
+    arg_parser.add_argument("--top", type=int, default=10, help="Number of jobs to print.")
+    args = arg_parser.parse_args()
+
+    jd_list = None
+    if args.jds:
+        jd_list = []
+        for pattern in args.jds:
+            for jd_path in sorted(glob.glob(pattern)):
+                with open(jd_path, encoding="utf-8") as f:
+                    jd_list.append({"id": jd_path, "title": os.path.basename(jd_path), "text": f.read()})
+    with open(args.resume, encoding="utf-8") as f:
+        resume_text = f.read()
+
+    started = time.perf_counter()
+    ranked = match_jobs(resume_text, jd_list, top_n=args.top)
+    elapsed = time.perf_counter() - started
+    for job in ranked:
+        matched = ", ".join(match["skill"] for match in job["matched_skills"])
+        print(f"{job['score']:5.1f}  {job['title'] or job['id']}  [{matched}]")
+    print(f"Ranked {len(jd_list) if jd_list is not None else len(get_job_index())} job(s) in {elapsed:.2f}s")
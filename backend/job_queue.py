@@ -0,0 +1,420 @@
+import json
+import multiprocessing
+import os
+import sqlite3
+import time
+import traceback
+import uuid
+from typing import Callable, Dict, Optional
+
+from backend.config import DATA_DIR
+from backend.profiling import profiled, start_from_env
+
+# Jobs live in a local SQLite file so they survive browser disconnects, script
+# reruns and process restarts.
+DEFAULT_DB_PATH = os.environ.get("PROSCAN_JOBS_DB", os.path.join(DATA_DIR, "jobs.db"))
+
+# A worker holds a job for LEASE_SECONDS. If it dies without finishing, the lease
+# expires and another worker picks the job up again (at-least-once execution).
+LEASE_SECONDS = 300
+MAX_ATTEMPTS = 3
+POLL_INTERVAL = 0.5
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    idempotency_key TEXT UNIQUE,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_expires REAL,
+    lease_token TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs(status, created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs(kind, status, updated_at, id);
+"""
+
+# Registry of job kinds to the functions that run them. A task receives the job
+# payload and a progress callback, and returns a JSON-serializable result.
+TASKS: Dict[str, Callable[[dict, Callable[[float, str], None]], dict]] = {}
+
+
+def task(kind: str):
+    """Decorator that registers a function as the handler for a job kind."""
+    def register(func):
+        TASKS[kind] = func
+        return func
+    return register
+
+
+def _connect(db_path: Optional[str] = None) -> sqlite3.Connection:
+    db_path = db_path or DEFAULT_DB_PATH
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    # WAL lets the UI poll while workers write.
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    if "lease_token" not in {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}:
+        # Databases created before leases had tokens.
+        conn.execute("ALTER TABLE jobs ADD COLUMN lease_token TEXT")
+    return conn
+
+
+def _row_to_job(row: sqlite3.Row) -> dict:
+    job = dict(row)
+    job["payload"] = json.loads(job["payload"])
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+def submit(kind: str, payload: dict, idempotency_key: Optional[str] = None, db_path: Optional[str] = None) -> str:
+    """
+    Queues a job and returns its id immediately.
+
+    Args:
+        kind: The registered task name to run.
+        payload: JSON-serializable arguments for the task.
+        idempotency_key: Jobs submitted with the same key are deduplicated. The id of
+            the existing job is returned, and a previously failed job, or one that
+            finished with a degraded (fallback) result, is re-queued.
+
+    Returns:
+        The job id.
+    """
+    now = time.time()
+    job_id = uuid.uuid4().hex
+    conn = _connect(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        if idempotency_key:
+            row = conn.execute(
+                "SELECT id, status, result FROM jobs WHERE idempotency_key = ?", (idempotency_key,)
+            ).fetchone()
+            if row:
+                degraded = row["status"] == DONE and row["result"] and json.loads(row["result"]).get("degraded")
+                if row["status"] == FAILED or degraded:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, progress = 0, message = NULL, result = NULL, error = NULL, "
+                        "attempts = 0, lease_expires = NULL, lease_token = NULL, updated_at = ? WHERE id = ?",
+                        (QUEUED, now, row["id"]),
+                    )
+                conn.execute("COMMIT")
+                return row["id"]
+        conn.execute(
+            "INSERT INTO jobs (id, kind, idempotency_key, payload, status, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, kind, idempotency_key, json.dumps(payload), QUEUED, now, now),
+        )
+        conn.execute("COMMIT")
+        return job_id
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+def get_job(job_id: str, db_path: Optional[str] = None) -> Optional[dict]:
+    """Returns the job's status, progress, message, result and error, or None if unknown."""
+    conn = _connect(db_path)
+    try:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _row_to_job(row) if row else None
+    finally:
+        conn.close()
+
+
+def report_progress(job_id: str, progress: float, message: str = "", db_path: Optional[str] = None,
+                    lease_token: Optional[str] = None) -> None:
+    """
+    Records job progress (0.0 - 1.0) and extends the worker's lease.
+
+    Args:
+        lease_token: The token from claiming the job. If given, nothing is recorded
+            once another worker has taken the job over.
+    """
+    conn = _connect(db_path)
+    try:
+        now = time.time()
+        conn.execute(
+            "UPDATE jobs SET progress = ?, message = ?, lease_expires = ?, updated_at = ? "
+            "WHERE id = ? AND status = ? AND (? IS NULL OR lease_token = ?)",
+            (min(max(progress, 0.0), 1.0), message, now + LEASE_SECONDS, now, job_id, RUNNING,
+             lease_token, lease_token),
+        )
+    finally:
+        conn.close()
+
+
+def _claim(conn: sqlite3.Connection) -> Optional[dict]:
+    """
+    Atomically takes the oldest runnable job, including ones whose lease expired.
+    The job's "lease_token" identifies this claim when the job is finished.
+    """
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Jobs abandoned by a dead worker too many times are given up on.
+        conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ? "
+            "WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+            (FAILED, "Job exceeded the maximum number of attempts.", now, RUNNING, now, MAX_ATTEMPTS),
+        )
+        row = conn.execute(
+            "SELECT * FROM jobs WHERE status = ? OR (status = ? AND lease_expires < ?) "
+            "ORDER BY created_at LIMIT 1",
+            (QUEUED, RUNNING, now),
+        ).fetchone()
+        if not row:
+            conn.execute("COMMIT")
+            return None
+        lease_token = uuid.uuid4().hex
+        conn.execute(
+            "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_expires = ?, lease_token = ?, updated_at = ? "
+            "WHERE id = ?",
+            (RUNNING, now + LEASE_SECONDS, lease_token, now, row["id"]),
+        )
+        conn.execute("COMMIT")
+        return dict(_row_to_job(row), status=RUNNING, lease_token=lease_token)
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _finish(conn: sqlite3.Connection, job: dict, result: Optional[dict] = None, error: Optional[str] = None) -> bool:
+    """
+    Records the outcome of a claimed job, unless its lease expired and another worker
+    took the job over, in which case that worker's outcome counts.
+
+    Returns:
+        Whether the outcome was recorded.
+    """
+    now = time.time()
+    if error is None:
+        cursor = conn.execute(
+            "UPDATE jobs SET status = ?, progress = 1, result = ?, lease_expires = NULL, updated_at = ? "
+            "WHERE id = ? AND status = ? AND lease_token = ?",
+            (DONE, json.dumps(result), now, job["id"], RUNNING, job["lease_token"]),
+        )
+    else:
+        cursor = conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, lease_expires = NULL, updated_at = ? "
+            "WHERE id = ? AND status = ? AND lease_token = ?",
+            (FAILED, error, now, job["id"], RUNNING, job["lease_token"]),
+        )
+    if cursor.rowcount == 0:
+        print(f"Job {job['id']} was taken over by another worker; this outcome is discarded.")
+    return cursor.rowcount > 0
+
+
+def run_worker(db_path: Optional[str] = None, stop_after: Optional[int] = None) -> None:
+    """
+    Runs a worker loop that claims and executes jobs until the process exits.
+
+    Args:
+        db_path: Path to the jobs database. Defaults to DEFAULT_DB_PATH.
+        stop_after: Stop after this many jobs (used for one-off draining).
+    """
+    # PROSCAN_PROFILE applies to workers; SIGUSR2 toggles stack sampling on a running one.
+    start_from_env(signals=True)
+    conn = _connect(db_path)
+    handled = 0
+    while stop_after is None or handled < stop_after:
+        job = _claim(conn)
+        if job is None:
+            time.sleep(POLL_INTERVAL)
+            continue
+
+        handler = TASKS.get(job["kind"])
+        if handler is None:
+            _finish(conn, job, error=f"Unknown job kind: {job['kind']}")
+        else:
+            def progress(fraction, message="", _job=job):
+                report_progress(_job["id"], fraction, message, db_path, _job["lease_token"])
+            try:
+                with profiled(job["kind"]):
+                    result = handler(job["payload"], progress)
+                _finish(conn, job, result=result)
+            except Exception as e:
+                print(f"Job {job['id']} failed: {e}")
+                traceback.print_exc()
+                _finish(conn, job, error=str(e))
+        handled += 1
+
+
+def start_workers(count: int = 2, db_path: Optional[str] = None) -> list:
+    """Starts `count` background worker processes and returns them."""
+    # "spawn" avoids inheriting the threads and sockets of the Streamlit server.
+    ctx = multiprocessing.get_context("spawn")
+    workers = []
+    for _ in range(count):
+        process = ctx.Process(target=run_worker, args=(db_path,), daemon=True)
+        process.start()
+        workers.append(process)
+    return workers
+
+
+def _parse_resume(resume_text: str):
+    """Returns the parsed entities and embedding of a resume, or None for each if unavailable."""
+    entities, embedding = None, None
+    try:
+        from backend.extraction import extract_resume
+        entities = extract_resume(resume_text)
+    except Exception as e:
+        print(f"Could not extract entities for the candidate store: {e}")
+    try:
+        from backend.jd_comparator import model as embedding_model
+        embedding = embedding_model.encode(resume_text).tolist()
+    except Exception as e:
+        print(f"Could not embed resume for the candidate store: {e}")
+    return entities, embedding
+
+
+# Contact fields of an analysis and the extracted contact fields they come from.
+_ANALYSIS_CONTACT_FIELDS = {"email": "email", "phone": "phone", "linkedin_url": "linkedin", "github_url": "github"}
+
+
+def _own_contact_details(entities: Optional[dict]) -> dict:
+    """
+    The candidate name and contact fields of an analysis, taken from a resume's
+    extracted entities. Fields that were not found (or all of them, if extraction
+    failed) are None.
+    """
+    entities = entities or {}
+    contact = entities.get("contact") or {}
+    details = {"candidate_name": entities.get("name") or None}
+    for field, contact_field in _ANALYSIS_CONTACT_FIELDS.items():
+        details[field] = contact.get(contact_field) or None
+    return details
+
+
+def _find_near_duplicate(store, index, resume_text: str, signature, jd_id: Optional[int],
+                         candidate_id: Optional[int]):
+    """
+    Returns (candidate_id, similarity, analysis) for the most similar other indexed
+    resume, where analysis is its stored analysis against `jd_id` (or None).
+    """
+    matches = [match for match in index.query(resume_text, signature) if match[0] != candidate_id]
+    if jd_id is not None:
+        for match_id, score in matches:
+            analysis = store.get_analysis(match_id, jd_id)
+            if analysis is not None:
+                return match_id, score, analysis
+    if matches:
+        return matches[0][0], matches[0][1], None
+    return None
+
+
+@task("analyze_resume")
+def _analyze_resume(payload: dict, progress) -> dict:
+    """Runs the Gemini analysis for a resume and job description, reusing stored analyses."""
+    # Imported lazily so the UI process can submit jobs without configuring the AI model.
+    from backend.candidate_store import CandidateStore
+    from backend.near_duplicates import DUPLICATE_MODE, FLAG, REUSE, NearDuplicateIndex, minhash
+
+    store = CandidateStore()
+    index = NearDuplicateIndex() if DUPLICATE_MODE in (REUSE, FLAG) else None
+    try:
+        resume_text, jd_text = payload["resume_text"], payload["jd_text"]
+        candidate_id = store.find_candidate_id(resume_text)
+        jd_id = store.find_job_description_id(jd_text)
+        if candidate_id is not None and jd_id is not None:
+            stored = store.get_analysis(candidate_id, jd_id)
+            if stored is not None:
+                return stored
+
+        # Resubmitted CVs with small edits are detected by their MinHash signature.
+        signature, duplicate = None, None
+        if index is not None:
+            signature = minhash(resume_text)
+            duplicate = _find_near_duplicate(store, index, resume_text, signature, jd_id, candidate_id)
+
+        reused = bool(duplicate) and DUPLICATE_MODE == REUSE and duplicate[2] is not None
+        if reused:
+            progress(0.5, "Found an earlier analysis of a nearly identical resume...")
+            analysis = dict(duplicate[2])
+        else:
+            from backend.resume_analyzer import get_semantic_analysis
+
+            progress(0.1, "Analyzing resume against the job description...")
+            analysis = get_semantic_analysis(resume_text, jd_text)
+            if "error" in analysis:
+                # Fail the job so resubmitting the same resume and JD retries it.
+                raise RuntimeError(analysis.get("details", analysis["error"]))
+        if duplicate:
+            analysis["duplicate_of"] = {"candidate_id": duplicate[0], "similarity": round(duplicate[1], 3)}
+
+        progress(0.8, "Saving candidate...")
+        entities = None
+        if candidate_id is None:
+            entities, embedding = _parse_resume(resume_text)
+            candidate_id = store.add_candidate(resume_text, entities, embedding)
+            if embedding is not None:
+                # Shared, memory-mapped copy for similarity search across processes.
+                from backend.embedding_store import get_embedding_store
+                get_embedding_store(dim=len(embedding)).append([candidate_id], [embedding])
+        elif reused:
+            entities = (store.get_candidate(candidate_id) or {}).get("entities")
+        if reused:
+            # Name and contact details are what most often differs in a resubmitted CV:
+            # they always come from this resume, never from the copied analysis.
+            analysis.update(_own_contact_details(entities))
+        if index is not None and candidate_id not in index:
+            index.add(candidate_id, resume_text, signature)
+        if not analysis.get("degraded"):
+            # Quick local scores are not stored, so the next request gets a full analysis.
+            store.save_analysis(candidate_id, store.add_job_description(jd_text), analysis)
+        progress(0.9, "Finalizing results...")
+        return analysis
+    finally:
+        store.close()
+        if index is not None:
+            index.close()
+
+
+@task("rescore_job_description")
+def _rescore_job_description(payload: dict, progress) -> dict:
+    """Re-scores candidates against an edited JD, evaluating only its new or changed requirements."""
+    from backend.requirement_scoring import RequirementScorer
+
+    scorer = RequirementScorer()
+    try:
+        progress(0.1, "Scoring changed requirements...")
+        scores = scorer.rescore(
+            payload["jd_text"], payload.get("candidate_ids"), payload.get("previous_jd_id"), payload.get("title")
+        )
+        return {"jd_id": scorer.store.find_job_description_id(payload["jd_text"]),
+                "scores": {str(candidate_id): score for candidate_id, score in scores.items()}}
+    finally:
+        scorer.store.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Run ProScan background job workers.")
+    arg_parser.add_argument("--workers", type=int, default=2, help="Number of worker processes.")
+    arg_parser.add_argument("--db", default=None, help="Path to the jobs database.")
+    args = arg_parser.parse_args()
+
+    processes = start_workers(args.workers, args.db)
+    print(f"Started {len(processes)} ProScan worker(s). Press Ctrl+C to stop.")
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,244 @@
+import collections
+import itertools
+import math
+import os
+import resource
+import threading
+import time
+from typing import Dict, List, Optional
+
+from backend.profiling import PROFILE_MODE, STACKS, profiled, start_stack_sampler
+
+# Stages of one simulated upload, in order; "total" is the whole request.
+STAGES = ("extract_text", "extract_entities", "calculate_similarity", "get_semantic_analysis")
+TOTAL = "total"
+MEMORY_INTERVAL = 1.0
+
+
+def rss_mb() -> float:
+    """The resident memory of this process in MB (the peak, where the current one is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """The nearest-rank percentile of values, or None if there are none."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+
+def _run_request(document: tuple, jd_text: str, jd_skills: list, depth: Optional[str],
+                 budget: Optional[float]) -> dict:
+    """Runs one upload through the pipeline the app runs. Returns the stage timings and outcome."""
+    from backend.document_extractor import extract_text
+    from backend.jd_comparator import calculate_similarity
+    from backend.parser import extract_entities
+    from backend.resume_analyzer import DEFAULT_DEPTH, get_semantic_analysis
+
+    timings, started = {}, time.perf_counter()
+
+    def timed(stage, func, *args, **kwargs):
+        stage_started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timings[stage] = time.perf_counter() - stage_started
+
+    filename, file_bytes = document
+    try:
+        with profiled("load_test"):
+            resume_text = timed("extract_text", extract_text, file_bytes, filename)
+            if not resume_text:
+                return {"timings": timings, "error": f"No text extracted from {filename}"}
+            entities = timed("extract_entities", extract_entities, resume_text)
+            timed("calculate_similarity", calculate_similarity, entities["skills"], jd_skills)
+            analysis = timed("get_semantic_analysis", get_semantic_analysis, resume_text, jd_text,
+                             depth=depth or DEFAULT_DEPTH, latency_budget=budget)
+    except Exception as e:
+        return {"timings": timings, "error": f"{type(e).__name__}: {e}"}
+    timings[TOTAL] = time.perf_counter() - started
+    return {"timings": timings, "error": analysis.get("error"), "degraded": bool(analysis.get("degraded"))}
+
+
+def run_load_test(
+    documents: List[tuple],
+    jd_text: str,
+    sessions: int = 8,
+    duration: float = 60.0,
+    requests: Optional[int] = None,
+    think_time: float = 0.0,
+    depth: Optional[str] = None,
+    budget: Optional[float] = None,
+    llm_latency_scale: float = 1 / 8,
+    llm_failure_rate: float = 0.0,
+    memory_interval: float = MEMORY_INTERVAL,
+) -> dict:
+    """
+    Drives the upload pipeline (extract_text, extract_entities, calculate_similarity
+    and get_semantic_analysis) from `sessions` concurrent threads, the way Streamlit
+    runs concurrent sessions in one server process, against the local fake LLM.
+
+    Args:
+        documents: (filename, bytes) pairs of PDF or DOCX resumes, used round-robin.
+        jd_text: The job description every resume is compared with.
+        duration: Seconds to run for.
+        requests: Stop after this many requests in total, if reached before `duration`.
+        think_time: Seconds each session waits between its requests.
+        llm_latency_scale, llm_failure_rate: Fake model settings, see `build_router`.
+        memory_interval: Seconds between memory samples.
+
+    Returns:
+        The "requests", "failed" and "degraded" counts, "throughput" in requests per second,
+        p50/p95/p99/max seconds per stage under "latency", the "errors" by message
+        and the "memory" samples as (seconds, RSS MB, requests done) triples.
+    """
+    import backend.resume_analyzer as resume_analyzer
+    from backend.chunked_analysis import MAX_CONCURRENT_CHUNKS
+    from backend.model_router import FAKE, build_router
+    from backend.skill_matcher import extract_skills
+
+    resume_analyzer.model = build_router(FAKE, fake_latency_scale=llm_latency_scale,
+                                         fake_failure_rate=llm_failure_rate,
+                                         max_workers=sessions * MAX_CONCURRENT_CHUNKS)
+    jd_skills = extract_skills(jd_text)["skills"]
+
+    # Only the timings are kept, so the harness itself adds little to the memory measured.
+    timings: Dict[str, List[float]] = {stage: [] for stage in STAGES + (TOTAL,)}
+    errors, memory = collections.Counter(), []
+    counts = {"requests": 0, "degraded": 0}
+    lock = threading.Lock()
+    counter = itertools.count()
+    stop = threading.Event()
+    started = time.perf_counter()
+    deadline = started + duration
+
+    def session():
+        while not stop.is_set() and time.perf_counter() < deadline:
+            index = next(counter)
+            if requests is not None and index >= requests:
+                return
+            outcome = _run_request(documents[index % len(documents)], jd_text, jd_skills, depth, budget)
+            with lock:
+                counts["requests"] += 1
+                counts["degraded"] += outcome.get("degraded", False)
+                if outcome["error"]:
+                    errors[outcome["error"]] += 1
+                for stage, seconds in outcome["timings"].items():
+                    timings[stage].append(seconds)
+            if think_time:
+                stop.wait(think_time)
+
+    def sample_memory():
+        while True:
+            memory.append((round(time.perf_counter() - started, 1), round(rss_mb(), 1), counts["requests"]))
+            if stop.wait(memory_interval):
+                return
+
+    sampler = threading.Thread(target=sample_memory, name="load-test-memory", daemon=True)
+    sampler.start()
+    threads = [threading.Thread(target=session, name=f"session-{i}", daemon=True) for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        print("Interrupted; waiting for requests in flight...")
+        stop.set()
+        for thread in threads:
+            thread.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    sampler.join()
+    memory.append((round(elapsed, 1), round(rss_mb(), 1), counts["requests"]))
+
+    latency = {
+        stage: {"p50": percentile(values, 0.5), "p95": percentile(values, 0.95),
+                "p99": percentile(values, 0.99), "max": max(values, default=None)}
+        for stage, values in timings.items()
+    }
+    return {
+        "sessions": sessions,
+        "seconds": round(elapsed, 2),
+        "requests": counts["requests"],
+        "failed": sum(errors.values()),
+        "degraded": counts["degraded"],
+        "throughput": counts["requests"] / elapsed if elapsed else 0.0,
+        "latency": latency,
+        "errors": dict(errors),
+        "memory": memory,
+    }
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"{report['requests']} requests from {report['sessions']} sessions in {report['seconds']}s: "
+        f"{report['throughput']:.2f} req/s, {report['failed']} failed, {report['degraded']} degraded",
+        "",
+        f"{'stage':<24}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}",
+    ]
+    for stage, stats in report["latency"].items():
+        cells = "".join(f"{value:>9.3f}s" if value is not None else f"{'-':>10}" for value in stats.values())
+        lines.append(f"{stage:<24}{cells}")
+    lines += ["", "Memory (RSS):"]
+    lines += [f"  {seconds:>7.1f}s {rss:>9.1f} MB {done:>7} done" for seconds, rss, done in report["memory"]]
+    if report["errors"]:
+        lines += ["", "Errors:"]
+        lines += [f"  {count:>5} x {message}" for message, count in report["errors"].items()]
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    arg_parser = argparse.ArgumentParser(
+        description="Load-test the resume pipeline with concurrent sessions against a local fake LLM.")
+    arg_parser.add_argument("resumes", nargs="+", help="PDF or DOCX resumes, uploaded round-robin.")
+    arg_parser.add_argument("--jd", required=True, help="Text file with the job description.")
+    arg_parser.add_argument("--sessions", type=int, default=8)
+    arg_parser.add_argument("--duration", type=float, default=60.0, help="Seconds to run for.")
+    arg_parser.add_argument("--requests", type=int, help="Stop after this many requests in total.")
+    arg_parser.add_argument("--think-time", type=float, default=0.0, help="Seconds between a session's requests.")
+    arg_parser.add_argument("--depth", choices=["quick", "standard", "deep"])
+    arg_parser.add_argument("--budget", type=float, help="Latency budget in seconds per analysis.")
+    arg_parser.add_argument("--llm-latency-scale", type=float, default=1 / 8,
+                            help="Fake model median latency, as a fraction of each tier's usual latency.")
+    arg_parser.add_argument("--llm-failure-rate", type=float, default=0.0)
+    arg_parser.add_argument("--json", help="Also write the full report to this file.")
+    args = arg_parser.parse_args()
+
+    # Never call the real model from a load test.
+    os.environ["PROSCAN_LLM_BACKEND"] = "fake"
+    documents = []
+    for path in args.resumes:
+        with open(path, "rb") as f:
+            documents.append((os.path.basename(path), f.read()))
+    with open(args.jd, encoding="utf-8") as f:
+        jd_text = f.read()
+
+    sampler = start_stack_sampler() if PROFILE_MODE == STACKS else None
+    load_report = run_load_test(
+        documents,
+        jd_text,
+        sessions=args.sessions,
+        duration=args.duration,
+        requests=args.requests,
+        think_time=args.think_time,
+        depth=args.depth,
+        budget=args.budget,
+        llm_latency_scale=args.llm_latency_scale,
+        llm_failure_rate=args.llm_failure_rate,
+    )
+    print(format_report(load_report))
+    if sampler:
+        sampler.stop()
+        print(f"\nStack samples written to {sampler.path}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(load_report, f, indent=2)
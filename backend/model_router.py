@@ -0,0 +1,287 @@
+import collections
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+
+# Generative model tiers, fastest first. A request starts at the tier for its depth
+# and steps down to faster tiers when the latency budget would be exceeded.
+TIER_MODELS = {
+    "fast": os.environ.get("PROSCAN_MODEL_FAST", "gemini-1.5-flash-8b"),
+    "standard": os.environ.get("PROSCAN_MODEL_STANDARD", "gemini-1.5-flash"),
+    "deep": os.environ.get("PROSCAN_MODEL_DEEP", "gemini-1.5-pro"),
+}
+TIER_ORDER = ["fast", "standard", "deep"]
+# Depth requested by the caller -> starting tier.
+DEPTHS = {"quick": "fast", "standard": "standard", "deep": "deep"}
+DEFAULT_DEPTH = os.environ.get("PROSCAN_ANALYSIS_DEPTH", "standard")
+
+# Prompts longer than this (in characters) skip the fast tier, which is weaker on
+# long inputs.
+FAST_TIER_MAX_CHARS = 12000
+# Latency assumed for a tier (seconds, p95) until it has answered a few requests.
+DEFAULT_TIER_LATENCY = {"fast": 4.0, "standard": 8.0, "deep": 25.0}
+LATENCY_WINDOW = 200
+MIN_SAMPLES = 10
+# Latencies older than this (seconds) are forgotten, so a tier skipped for being slow
+# is tried again later.
+LATENCY_MAX_AGE = 600
+
+# End-to-end budget for one analysis, in seconds. Interactive users get an answer,
+# possibly from a faster tier or the local score, within this time.
+DEFAULT_LATENCY_BUDGET = float(os.environ.get("PROSCAN_LATENCY_BUDGET", "45"))
+# Send a second, identical request when the first has not answered by the tier's
+# p95 latency. The first answer wins.
+HEDGE_REQUESTS = os.environ.get("PROSCAN_HEDGE_REQUESTS", "1") != "0"
+# Don't start a request or hedge with less than this much budget left. Fallback tiers
+# always have at least this much reserved for them.
+MIN_ATTEMPT_SECONDS = 1.0
+
+# "gemini" calls the Google API; "fake" answers locally (tests and load tests).
+LLM_BACKEND = os.environ.get("PROSCAN_LLM_BACKEND", "gemini")
+GEMINI = "gemini"
+FAKE = "fake"
+
+
+class BudgetExceeded(Exception):
+    """No tier answered within the latency budget."""
+
+
+class GeminiBackend:
+    """Calls a Gemini model. genai must already be configured with an API key."""
+
+    def __init__(self, model_name: str):
+        import google.generativeai as genai
+
+        self.name = model_name
+        self.model = genai.GenerativeModel(model_name)
+        self._client = None
+
+    def generate(self, prompt: str, timeout: float) -> str:
+        from google.generativeai import client
+        from google.generativeai.types import generation_types
+
+        # google-generativeai 0.3.2 has no per-call timeout on generate_content (extra
+        # arguments become request fields), so the request goes through the API client,
+        # whose calls take one.
+        if self._client is None:
+            self._client = client.get_default_generative_client()
+        request = self.model._prepare_request(contents=prompt)
+        response = self._client.generate_content(request, timeout=max(timeout, 1.0))
+        return generation_types.GenerateContentResponse.from_response(response).text
+
+
+class FakeBackend:
+    """
+    Local stand-in for a generative model with configurable latency and failures.
+
+    Latency is log-normally distributed around `median_latency`, with `sigma`
+    controlling the tail. Answers are well-formed analysis JSON derived from a
+    hash of the prompt, so the same prompt always gets the same answer.
+    """
+
+    def __init__(self, name: str = "fake", median_latency: float = 0.5, sigma: float = 0.5,
+                 failure_rate: float = 0.0, respond: Optional[Callable[[str], str]] = None):
+        self.name = name
+        self.median_latency = median_latency
+        self.sigma = sigma
+        self.failure_rate = failure_rate
+        self.respond = respond or fake_analysis_response
+        self._random = random.Random(name)
+        self._lock = threading.Lock()
+
+    def generate(self, prompt: str, timeout: float) -> str:
+        with self._lock:
+            latency = self.median_latency * self._random.lognormvariate(0, self.sigma)
+            failed = self._random.random() < self.failure_rate
+        time.sleep(min(latency, timeout))
+        if latency > timeout:
+            raise TimeoutError(f"{self.name} timed out after {timeout:.1f}s")
+        if failed:
+            raise RuntimeError(f"{self.name} failed")
+        return self.respond(prompt)
+
+
+def fake_analysis_response(prompt: str) -> str:
+    """A deterministic, schema-complete analysis for FakeBackend."""
+    digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+    skills = sorted(set(re.findall(r"\b(python|java|react|aws|docker|kubernetes|sql|go)\b", prompt.lower())))
+    return json.dumps({
+        "candidate_name": None,
+        "email": None,
+        "phone": None,
+        "linkedin_url": None,
+        "github_url": None,
+        "match_score": digest[0] % 101,
+        "executive_summary": "Generated by the local fake model.",
+        "skills_analysis": {
+            "technical_skills": {"matching": skills[:3], "missing": skills[3:]},
+            "soft_skills": {"matching": [], "missing": []},
+            "keywords": {"matching": [], "missing": []},
+        },
+        "experience_analysis": "Not analyzed by the fake model.",
+        "project_analysis": [],
+        "interview_questions": ["Tell us about a recent project."],
+        "overall_vibe": "Neutral",
+        "recommended_courses": [],
+    })
+
+
+class Tier:
+    """A model tier with a rolling record of its recent latencies."""
+
+    def __init__(self, name: str, backend, default_latency: float):
+        self.name = name
+        self.backend = backend
+        self.default_latency = default_latency
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.latencies.append((time.monotonic(), seconds))
+
+    def p95(self) -> float:
+        with self._lock:
+            while self.latencies and self.latencies[0][0] < time.monotonic() - LATENCY_MAX_AGE:
+                self.latencies.popleft()
+            if len(self.latencies) < MIN_SAMPLES:
+                return self.default_latency
+            ordered = sorted(seconds for _, seconds in self.latencies)
+        return ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)]
+
+
+class ModelRouter:
+    """
+    Routes prompts to model tiers within a latency budget.
+
+    A request starts at the tier for its depth (skipping tiers that cannot take
+    the input) and moves to a faster tier if the starting tier's p95 latency does
+    not fit the budget, less the time reserved for the next faster tier. Each attempt may be hedged with a second request after the
+    tier's p95 latency. If a tier fails or times out, the next faster tier gets
+    the remaining budget; when none is left, BudgetExceeded is raised so the
+    caller can fall back to a local answer.
+    """
+
+    def __init__(self, tiers: List[Tier], hedge: bool = HEDGE_REQUESTS, max_workers: int = 16):
+        """
+        Args:
+            max_workers: Requests that may be in flight at once, e.g. all parts of as
+                many long resumes as are analyzed concurrently. Hedges have a pool of
+                the same size, so they never wait behind first requests.
+        """
+        self.tiers: Dict[str, Tier] = {tier.name: tier for tier in tiers}
+        self.order = [name for name in TIER_ORDER if name in self.tiers]
+        self.hedge = hedge
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="model-router")
+        self.hedge_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="model-router-hedge")
+        self.stats = collections.Counter()
+
+    def plan(self, prompt_chars: int, depth: str, budget: float) -> List[str]:
+        """Returns the tiers to try, in order, for a prompt of the given size."""
+        start = self.order.index(DEPTHS.get(depth, "standard")) if DEPTHS.get(depth) in self.order else 0
+        if prompt_chars > FAST_TIER_MAX_CHARS and self.order[start] == "fast" and len(self.order) > 1:
+            start += 1
+        while start > 0 and self.tiers[self.order[start]].p95() > budget - self._reserve(self.order[start - 1]):
+            start -= 1
+        return [self.order[i] for i in range(start, -1, -1)]
+
+    def _reserve(self, name: str) -> float:
+        """Time kept back for a fallback to the given tier."""
+        return max(self.tiers[name].p95(), MIN_ATTEMPT_SECONDS)
+
+    def _call(self, tier: Tier, prompt: str, timeout: float) -> str:
+        started = time.monotonic()
+        try:
+            return tier.backend.generate(prompt, timeout)
+        finally:
+            # Timeouts and errors count too, so a tier that keeps timing out is not
+            # planned for on the strength of its few fast answers.
+            tier.record(time.monotonic() - started)
+
+    def _attempt(self, tier: Tier, prompt: str, deadline: float) -> str:
+        remaining = deadline - time.monotonic()
+        futures = {self.executor.submit(self._call, tier, prompt, remaining)}
+        hedge_delay = tier.p95()
+        done, _ = wait(futures, timeout=min(hedge_delay, remaining) if self.hedge else remaining,
+                       return_when=FIRST_COMPLETED)
+        if not done and self.hedge and deadline - time.monotonic() >= MIN_ATTEMPT_SECONDS:
+            self.stats["hedged"] += 1
+            futures.add(self.hedge_executor.submit(self._call, tier, prompt, deadline - time.monotonic()))
+
+        errors = []
+        while futures:
+            done, futures = wait(futures, timeout=max(deadline - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    errors.append(e)
+        raise BudgetExceeded(f"{tier.name}: {errors[-1] if errors else 'timed out'}")
+
+    def generate(self, prompt: str, depth: str = DEFAULT_DEPTH, budget: Optional[float] = None) -> dict:
+        """
+        Generates a response within the latency budget.
+
+        Returns:
+            A dict with the response "text", the "tier" that produced it and the
+            "latency" in seconds.
+
+        Raises:
+            BudgetExceeded: No tier answered in time.
+        """
+        budget = DEFAULT_LATENCY_BUDGET if budget is None else budget
+        started = time.monotonic()
+        deadline = started + budget
+        last_error = None
+        plan = self.plan(len(prompt), depth, budget)
+        for position, name in enumerate(plan):
+            if deadline - time.monotonic() < (MIN_ATTEMPT_SECONDS if position == 0 else 0.05):
+                break
+            # Leave the next faster tier its p95 latency, unless that would leave this
+            # tier less than its own.
+            attempt_deadline = deadline
+            if position + 1 < len(plan):
+                reserve = self._reserve(plan[position + 1])
+                if deadline - reserve - time.monotonic() >= self.tiers[name].p95():
+                    attempt_deadline = deadline - reserve
+            try:
+                text = self._attempt(self.tiers[name], prompt, attempt_deadline)
+            except BudgetExceeded as e:
+                self.stats[f"{name}_failed"] += 1
+                last_error = e
+                continue
+            self.stats[name] += 1
+            return {"text": text, "tier": name, "latency": time.monotonic() - started}
+        self.stats["budget_exceeded"] += 1
+        raise BudgetExceeded(str(last_error) if last_error else f"No tier fits a {budget:.1f}s budget")
+
+
+def build_router(backend: str = LLM_BACKEND, hedge: bool = HEDGE_REQUESTS,
+                 fake_latency_scale: float = 1 / 8, fake_failure_rate: float = 0.0,
+                 max_workers: int = 16) -> ModelRouter:
+    """
+    Builds a router over all tiers, using Gemini models or local fakes.
+
+    Args:
+        max_workers: Requests in flight at once, see `ModelRouter`.
+        fake_latency_scale: Median latency of each fake tier, as a fraction of the
+            tier's DEFAULT_TIER_LATENCY.
+        fake_failure_rate: Fraction of fake requests that fail.
+    """
+    tiers = []
+    for name in TIER_ORDER:
+        if backend == FAKE:
+            model = FakeBackend(f"fake-{name}", median_latency=DEFAULT_TIER_LATENCY[name] * fake_latency_scale,
+                                failure_rate=fake_failure_rate)
+        else:
+            model = GeminiBackend(TIER_MODELS[name])
+        tiers.append(Tier(name, model, DEFAULT_TIER_LATENCY[name]))
+    return ModelRouter(tiers, hedge=hedge, max_workers=max_workers)
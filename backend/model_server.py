@@ -0,0 +1,285 @@
+import json
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional
+
+from backend.config import DATA_DIR
+
+# One model server per host owns the spaCy pipeline and the sentence encoder. Other
+# processes talk to it over a Unix socket instead of loading their own copies.
+#   python -m backend.model_server
+SOCKET_PATH = os.environ.get("PROSCAN_MODEL_SOCKET", os.path.join(DATA_DIR, "models.sock"))
+# "auto" uses the server when its socket is reachable, "off" always loads models in-process.
+MODEL_SERVER_MODE = os.environ.get("PROSCAN_MODEL_SERVER", "auto")
+
+# Requests from concurrent clients are merged into one model call of up to
+# MAX_BATCH_TEXTS texts, waiting at most MAX_BATCH_WAIT seconds for more to arrive.
+MAX_BATCH_TEXTS = int(os.environ.get("PROSCAN_MODEL_MAX_BATCH", "128"))
+MAX_BATCH_WAIT = float(os.environ.get("PROSCAN_MODEL_MAX_WAIT_MS", "5")) / 1000
+
+# Wire format, both directions: uint32 header length, JSON header, uint32 body
+# length, body bytes. Embeddings travel as raw float32 and spaCy docs as Doc.to_bytes.
+_LENGTH = struct.Struct("!I")
+# Doc attributes the clients never use; leaving them out keeps messages small.
+_DOC_EXCLUDE = ["tensor", "user_data"]
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Model server connection closed.")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _send(sock: socket.socket, header: dict, body: bytes = b"") -> None:
+    raw_header = json.dumps(header).encode("utf-8")
+    sock.sendall(_LENGTH.pack(len(raw_header)) + raw_header + _LENGTH.pack(len(body)) + body)
+
+
+def _recv(sock: socket.socket):
+    header = json.loads(_recv_exact(sock, _LENGTH.unpack(_recv_exact(sock, _LENGTH.size))[0]))
+    body = _recv_exact(sock, _LENGTH.unpack(_recv_exact(sock, _LENGTH.size))[0])
+    return header, body
+
+
+class _Batcher:
+    """Merges concurrent requests into batched model calls on a single thread."""
+
+    def __init__(self, run_batch: Callable[[List[str]], list]):
+        self.run_batch = run_batch
+        self.requests = queue.Queue()
+        threading.Thread(target=self._loop, daemon=True).start()
+
+    def submit(self, texts: List[str]) -> list:
+        future = Future()
+        self.requests.put((texts, future))
+        return future.result()
+
+    def _loop(self) -> None:
+        while True:
+            batch = [self.requests.get()]
+            size = len(batch[0][0])
+            deadline = time.monotonic() + MAX_BATCH_WAIT
+            while size < MAX_BATCH_TEXTS:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self.requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                size += len(request[0])
+
+            texts = [text for request_texts, _ in batch for text in request_texts]
+            try:
+                results = self.run_batch(texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            start = 0
+            for request_texts, future in batch:
+                future.set_result(results[start:start + len(request_texts)])
+                start += len(request_texts)
+
+
+class ModelServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    # Unix sockets refuse connections outright once the backlog is full.
+    request_queue_size = 128
+
+    def __init__(self, socket_path: str = SOCKET_PATH):
+        import numpy as np
+        from backend.models import EMBEDDING_BACKEND, load_local_encoder, load_local_nlp
+
+        self.nlp = load_local_nlp()
+        self.encoder = load_local_encoder()
+        self.info = {
+            "spacy_model": self.nlp.meta.get("name"),
+            "embedding_backend": EMBEDDING_BACKEND,
+            "dimension": self.encoder.get_sentence_embedding_dimension(),
+        }
+
+        def encode(texts):
+            return list(np.asarray(self.encoder.encode(texts, convert_to_numpy=True), dtype=np.float32))
+
+        def parse(texts):
+            return [doc.to_bytes(exclude=_DOC_EXCLUDE) for doc in self.nlp.pipe(texts)]
+
+        self.batchers = {"encode": _Batcher(encode), "nlp": _Batcher(parse)}
+
+        os.makedirs(os.path.dirname(os.path.abspath(socket_path)), exist_ok=True)
+        if os.path.exists(socket_path):
+            if connect(socket_path, force=True) is not None:
+                raise RuntimeError(f"A model server is already listening on {socket_path}.")
+            os.remove(socket_path)  # stale socket from a previous run
+        super().__init__(socket_path, _RequestHandler)
+        os.chmod(socket_path, 0o660)
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server = self.server
+        while True:
+            try:
+                header, _ = _recv(self.request)
+            except (ConnectionError, OSError):
+                return
+            try:
+                op = header.get("op")
+                if op == "info":
+                    _send(self.request, {"ok": True, **server.info})
+                elif op == "encode":
+                    vectors = server.batchers["encode"].submit(header["texts"])
+                    _send(self.request, {"ok": True, "count": len(vectors)}, b"".join(v.tobytes() for v in vectors))
+                elif op == "nlp":
+                    docs = server.batchers["nlp"].submit(header["texts"])
+                    _send(self.request, {"ok": True, "sizes": [len(d) for d in docs]}, b"".join(docs))
+                else:
+                    _send(self.request, {"ok": False, "error": f"Unknown op: {op}"})
+            except (ConnectionError, OSError):
+                return
+            except Exception as e:
+                _send(self.request, {"ok": False, "error": str(e)})
+
+
+class ModelClient:
+    """Client for the host's model server. Each thread uses its own connection."""
+
+    def __init__(self, socket_path: str = SOCKET_PATH):
+        self.socket_path = socket_path
+        self._local = threading.local()
+        self.info = self.request({"op": "info"})[0]
+
+    def _socket(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def request(self, header: dict):
+        try:
+            sock = self._socket()
+            _send(sock, header)
+            response, body = _recv(sock)
+        except (ConnectionError, OSError):
+            self._local.sock = None
+            raise
+        if not response.get("ok"):
+            raise RuntimeError(f"Model server error: {response.get('error')}")
+        return response, body
+
+    def encoder(self) -> "RemoteEncoder":
+        return RemoteEncoder(self)
+
+    def nlp(self) -> "RemoteNLP":
+        return RemoteNLP(self)
+
+
+class RemoteEncoder:
+    """Drop-in for SentenceTransformer.encode that runs on the model server."""
+
+    def __init__(self, client: ModelClient):
+        self.client = client
+        self.backend = client.info["embedding_backend"]
+        self.dimension = client.info["dimension"]
+        self._fallback = None
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(self, sentences, **kwargs):
+        import numpy as np
+
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if self._fallback is None:
+            try:
+                _, body = self.client.request({"op": "encode", "texts": texts})
+                embeddings = np.frombuffer(body, dtype=np.float32).reshape(len(texts), self.dimension)
+                return embeddings[0] if single else embeddings
+            except (ConnectionError, OSError) as e:
+                print(f"Model server unavailable, loading the encoder in-process: {e}")
+                from backend.models import load_local_encoder
+                self._fallback = load_local_encoder(self.backend)
+        return self._fallback.encode(sentences, **kwargs)
+
+
+class RemoteNLP:
+    """Callable like a spaCy Language object; parsing runs on the model server."""
+
+    def __init__(self, client: ModelClient):
+        import spacy
+
+        self.client = client
+        # Docs from the server are rebuilt on this blank pipeline's vocab. Its
+        # tokenizer is also used by make_doc, for matcher patterns.
+        self._blank = spacy.blank("en")
+        self.vocab = self._blank.vocab
+        self._fallback = None
+
+    def make_doc(self, text: str):
+        return self._blank.make_doc(text)
+
+    def pipe(self, texts, **kwargs):
+        from spacy.tokens import Doc
+
+        texts = list(texts)
+        if self._fallback is None:
+            try:
+                response, body = self.client.request({"op": "nlp", "texts": texts})
+                docs, start = [], 0
+                for size in response["sizes"]:
+                    docs.append(Doc(self.vocab).from_bytes(body[start:start + size], exclude=_DOC_EXCLUDE))
+                    start += size
+                return docs
+            except (ConnectionError, OSError) as e:
+                print(f"Model server unavailable, loading spaCy in-process: {e}")
+                from backend.models import load_local_nlp
+                self._fallback = load_local_nlp()
+                self.vocab = self._fallback.vocab
+        return list(self._fallback.pipe(texts, **kwargs))
+
+    def __call__(self, text: str):
+        return self.pipe([text])[0]
+
+
+def connect(socket_path: str = SOCKET_PATH, force: bool = False) -> Optional[ModelClient]:
+    """Returns a client for the host's model server, or None if it is not running."""
+    if (MODEL_SERVER_MODE == "off" and not force) or not os.path.exists(socket_path):
+        return None
+    try:
+        return ModelClient(socket_path)
+    except (ConnectionError, OSError, RuntimeError):
+        return None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Serve spaCy and sentence embeddings to local processes.")
+    arg_parser.add_argument("--socket", default=SOCKET_PATH, help="Unix socket path.")
+    args = arg_parser.parse_args()
+
+    server = ModelServer(args.socket)
+    print(f"Model server listening on {args.socket} ({server.info})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.remove(args.socket)
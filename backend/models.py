@@ -0,0 +1,70 @@
+import os
+import threading
+
+# "torch" runs the full-precision SentenceTransformer. "onnx" runs the exported
+# int8-quantized model through onnxruntime (see backend/onnx_encoder.py), which is
+# faster and smaller on CPU-only hosts.
+EMBEDDING_BACKEND = os.environ.get("PROSCAN_EMBEDDING_BACKEND", "torch")
+SPACY_MODEL_NAME = "en_core_web_lg"
+SENTENCE_MODEL_NAME = "all-MiniLM-L6-v2"
+
+_lock = threading.Lock()
+_nlp = None
+_encoder = None
+
+
+def load_local_nlp():
+    """Loads the spaCy pipeline in this process."""
+    import spacy
+
+    # Load the large English model. This might take a moment.
+    try:
+        return spacy.load(SPACY_MODEL_NAME)
+    except OSError:
+        print("Downloading language model for the first time. This may take a while...")
+        from spacy.cli import download
+        download(SPACY_MODEL_NAME)
+        return spacy.load(SPACY_MODEL_NAME)
+
+
+def load_local_encoder(backend: str = EMBEDDING_BACKEND):
+    """Loads the sentence embedding model for the given backend in this process."""
+    if backend == "onnx":
+        from backend.onnx_encoder import OnnxEncoder
+        return OnnxEncoder()
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(SENTENCE_MODEL_NAME)
+
+
+def encoder_backend(encoder) -> str:
+    """Returns which backend produced an encoder's embeddings ("torch" or "onnx")."""
+    return getattr(encoder, "backend", "torch")
+
+
+def get_nlp():
+    """
+    Returns the process-wide spaCy pipeline.
+
+    If a model server is running on this host (see backend/model_server.py), this is
+    a client for it; otherwise the model is loaded in this process.
+    """
+    global _nlp
+    if _nlp is None:
+        with _lock:
+            if _nlp is None:
+                from backend.model_server import connect
+                client = connect()
+                _nlp = client.nlp() if client else load_local_nlp()
+    return _nlp
+
+
+def get_encoder():
+    """Returns the process-wide sentence encoder, served by the model server when available."""
+    global _encoder
+    if _encoder is None:
+        with _lock:
+            if _encoder is None:
+                from backend.model_server import connect
+                client = connect()
+                _encoder = client.encoder() if client else load_local_encoder()
+    return _encoder
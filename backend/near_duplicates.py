@@ -0,0 +1,244 @@
+import hashlib
+import os
+import re
+import sqlite3
+import zlib
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from backend.config import DATA_DIR
+
+DEFAULT_DB_PATH = os.environ.get("PROSCAN_DUPLICATES_DB", os.path.join(DATA_DIR, "near_duplicates.db"))
+# Estimated Jaccard similarity (of word 5-grams) above which two resumes count as
+# near-duplicates. Light edits such as a new phone number or one more bullet point
+# stay well above 0.9; different candidates are far below it.
+DEFAULT_THRESHOLD = float(os.environ.get("PROSCAN_DUPLICATE_THRESHOLD", "0.9"))
+# What the analysis job does with a near-duplicate of a resume already analyzed:
+# "reuse" returns the earlier analysis for the same JD instead of calling the AI model,
+# "flag" runs a fresh analysis but marks the result, "off" skips the check.
+DUPLICATE_MODE = os.environ.get("PROSCAN_NEAR_DUPLICATES", "reuse")
+REUSE = "reuse"
+FLAG = "flag"
+
+NUM_PERM = 128
+SHINGLE_SIZE = 5
+
+# MinHash permutations h(x) = (a * x + b) mod p over 32-bit shingle hashes, with a and
+# b drawn from the whole range [0, p). a * x can wrap around 2**64 in numpy; the
+# result is still a good hash, and a is much better mixed than if it were kept small.
+_PRIME = np.uint64((1 << 61) - 1)
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+del _rng
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Signatures are kept per document, and every document is entered into one LSH bucket
+# per band. A query only reads the buckets of its own bands and compares the full
+# signatures of the documents found there, so lookups stay cheap however many
+# resumes are indexed.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS signatures (
+    doc_id INTEGER PRIMARY KEY,
+    signature BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS buckets (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    doc_id INTEGER NOT NULL,
+    PRIMARY KEY (band, bucket, doc_id)
+) WITHOUT ROWID;
+"""
+
+
+def minhash(text: str) -> np.ndarray:
+    """Returns the MinHash signature (NUM_PERM uint32 values) of a text's word shingles."""
+    words = _WORD_PATTERN.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+    hashes = np.fromiter(
+        (zlib.crc32(shingle.encode("utf-8")) for shingle in set(shingles)), dtype=np.uint64
+    )
+    permuted = (np.outer(_PERM_A, hashes) + _PERM_B[:, None]) % _PRIME
+    return (permuted.min(axis=1) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    return float(np.mean(a == b))
+
+
+def lsh_bands(threshold: float, num_perm: int = NUM_PERM) -> Tuple[int, int]:
+    """
+    Chooses (bands, rows) so that pairs at or above `threshold` very likely share a
+    bucket and pairs well below it rarely do, weighing false positives and false
+    negatives equally.
+    """
+    grid = np.linspace(0, 1, 201)
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        collision = 1 - (1 - grid ** rows) ** bands
+        below = grid < threshold
+        # Areas over [0, 1]; the grid is uniform, so a mean is close enough.
+        false_positive = np.where(below, collision, 0).mean()
+        false_negative = np.where(below, 0, 1 - collision).mean()
+        if false_positive + false_negative < best_error:
+            best, best_error = (bands, rows), false_positive + false_negative
+    return best
+
+
+class NearDuplicateIndex:
+    """
+    Persistent MinHash/LSH index of resumes for finding near-duplicate documents.
+
+    Documents are identified by integer ids (candidate ids). Inserts are
+    incremental; the LSH buckets are rebuilt from the stored signatures only when
+    the threshold changes.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, threshold: float = DEFAULT_THRESHOLD):
+        self.db_path = db_path or DEFAULT_DB_PATH
+        self.threshold = threshold
+        self.bands, self.rows = lsh_bands(threshold)
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+
+        layout = f"{NUM_PERM}:{self.bands}:{self.rows}"
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'layout'").fetchone()
+        if row is None or row[0] != layout:
+            self._rebuild_buckets(layout)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _band_keys(self, signature: np.ndarray) -> List[int]:
+        keys = []
+        for band in range(self.bands):
+            digest = hashlib.blake2b(
+                signature[band * self.rows:(band + 1) * self.rows].tobytes(), digest_size=8
+            ).digest()
+            keys.append(int.from_bytes(digest, "little", signed=True))
+        return keys
+
+    def _rebuild_buckets(self, layout: str) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM buckets")
+            for doc_id, blob in self.conn.execute("SELECT doc_id, signature FROM signatures").fetchall():
+                self._insert_buckets(doc_id, np.frombuffer(blob, dtype=np.uint32))
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('layout', ?)", (layout,))
+
+    def _insert_buckets(self, doc_id: int, signature: np.ndarray) -> None:
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO buckets (band, bucket, doc_id) VALUES (?, ?, ?)",
+            [(band, key, doc_id) for band, key in enumerate(self._band_keys(signature))],
+        )
+
+    def __contains__(self, doc_id: int) -> bool:
+        return self.conn.execute("SELECT 1 FROM signatures WHERE doc_id = ?", (doc_id,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+
+    def _add(self, doc_id: int, signature: np.ndarray) -> None:
+        old = self.conn.execute("SELECT signature FROM signatures WHERE doc_id = ?", (doc_id,)).fetchone()
+        if old is not None:
+            self.conn.executemany(
+                "DELETE FROM buckets WHERE band = ? AND bucket = ? AND doc_id = ?",
+                [(band, key, doc_id)
+                 for band, key in enumerate(self._band_keys(np.frombuffer(old[0], dtype=np.uint32)))],
+            )
+        self.conn.execute(
+            "INSERT OR REPLACE INTO signatures (doc_id, signature) VALUES (?, ?)", (doc_id, signature.tobytes())
+        )
+        self._insert_buckets(doc_id, signature)
+
+    def add(self, doc_id: int, text: str, signature: Optional[np.ndarray] = None) -> None:
+        """Indexes a document. Re-adding an id replaces its signature."""
+        with self.conn:
+            self._add(doc_id, minhash(text) if signature is None else signature)
+
+    def add_many(self, documents: Iterable[Tuple[int, str]]) -> int:
+        """Indexes (doc_id, text) pairs in one transaction. Returns how many were added."""
+        count = 0
+        with self.conn:
+            for doc_id, text in documents:
+                self._add(doc_id, minhash(text))
+                count += 1
+        return count
+
+    def query(self, text: str, signature: Optional[np.ndarray] = None,
+              threshold: Optional[float] = None) -> List[Tuple[int, float]]:
+        """
+        Finds indexed documents that are near-duplicates of the text.
+
+        Args:
+            text: The document to look up.
+            signature: Its precomputed `minhash`, if available.
+            threshold: Minimum estimated similarity. Defaults to the index threshold;
+                values much lower than it miss some matches.
+
+        Returns:
+            (doc_id, estimated similarity) pairs, most similar first.
+        """
+        signature = minhash(text) if signature is None else signature
+        threshold = self.threshold if threshold is None else threshold
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(
+                row[0] for row in self.conn.execute(
+                    "SELECT doc_id FROM buckets WHERE band = ? AND bucket = ?", (band, key)
+                )
+            )
+        if not candidates:
+            return []
+
+        matches = []
+        candidates = list(candidates)
+        for start in range(0, len(candidates), 500):
+            chunk = candidates[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT doc_id, signature FROM signatures WHERE doc_id IN ({','.join('?' * len(chunk))})", chunk
+            )
+            for doc_id, blob in rows:
+                score = similarity(signature, np.frombuffer(blob, dtype=np.uint32))
+                if score >= threshold:
+                    matches.append((doc_id, score))
+        matches.sort(key=lambda match: -match[1])
+        return matches
+
+    def sync(self, store) -> int:
+        """Indexes every candidate of a CandidateStore that is not indexed yet. Returns how many were added."""
+        indexed = {row[0] for row in self.conn.execute("SELECT doc_id FROM signatures")}
+        rows = store.conn.execute("SELECT id, resume_text FROM candidates ORDER BY id")
+        return self.add_many((row["id"], row["resume_text"]) for row in rows if row["id"] not in indexed)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from backend.candidate_store import CandidateStore
+
+    arg_parser = argparse.ArgumentParser(description="Index stored resumes and look up near-duplicates.")
+    arg_parser.add_argument("command", choices=["sync", "check"])
+    arg_parser.add_argument("path", nargs="?", help="Plain-text resume to check.")
+    arg_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = arg_parser.parse_args()
+
+    index = NearDuplicateIndex(threshold=args.threshold)
+    if args.command == "sync":
+        print(f"Indexed {index.sync(CandidateStore())} new resume(s); {len(index)} in total.")
+    else:
+        with open(args.path, encoding="utf-8") as f:
+            for candidate_id, score in index.query(f.read()):
+                print(f"candidate {candidate_id}: {score:.2f}")
@@ -0,0 +1,140 @@
+import os
+from typing import List, Optional
+
+import numpy as np
+
+from backend.config import DATA_DIR
+
+# Exported, int8-quantized copy of all-MiniLM-L6-v2. Create it once with:
+#   python -m backend.onnx_encoder export
+HF_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+MODEL_DIR = os.environ.get("PROSCAN_ONNX_MODEL_DIR", os.path.join(DATA_DIR, "minilm-onnx-int8"))
+MODEL_FILE = "model.int8.onnx"
+
+# Skills and requirements are short, so larger batches amortize the per-call overhead
+# without much padding (texts are sorted by length before batching). Untuned default:
+# sweep it with `python -m backend.embedding_benchmark --batch-sizes ...`.
+DEFAULT_BATCH_SIZE = int(os.environ.get("PROSCAN_ONNX_BATCH_SIZE", "64"))
+# Intra-op threads per process. With several workers per host, keep
+# workers * threads <= physical cores.
+DEFAULT_NUM_THREADS = int(os.environ.get("PROSCAN_ONNX_THREADS", "0")) or max(1, (os.cpu_count() or 2) // 2)
+MAX_SEQ_LENGTH = 256
+
+
+def export_quantized_model(output_dir: Optional[str] = None) -> str:
+    """
+    Exports all-MiniLM-L6-v2 to ONNX and quantizes its weights to int8.
+
+    Requires torch, transformers and onnxruntime. Only needed once per host (or
+    once at build time); the encoder itself only needs onnxruntime and tokenizers.
+
+    Returns:
+        The output directory.
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel, AutoTokenizer
+
+    output_dir = output_dir or MODEL_DIR
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(HF_MODEL_NAME)
+    model = AutoModel.from_pretrained(HF_MODEL_NAME).eval()
+    tokenizer.save_pretrained(output_dir)
+
+    sample = tokenizer(["an example sentence"], return_tensors="pt")
+    fp32_path = os.path.join(output_dir, "model.fp32.onnx")
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"], sample["token_type_ids"]),
+            fp32_path,
+            input_names=["input_ids", "attention_mask", "token_type_ids"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "token_type_ids": {0: "batch", 1: "sequence"},
+                "last_hidden_state": {0: "batch", 1: "sequence"},
+            },
+            opset_version=14,
+        )
+    quantize_dynamic(fp32_path, os.path.join(output_dir, MODEL_FILE), weight_type=QuantType.QInt8)
+    os.remove(fp32_path)
+    return output_dir
+
+
+class OnnxEncoder:
+    """
+    CPU sentence encoder running the int8-quantized MiniLM through onnxruntime.
+
+    Produces the same mean-pooled, L2-normalized embeddings as
+    SentenceTransformer('all-MiniLM-L6-v2') and exposes the subset of its API
+    that the rest of the backend uses.
+    """
+
+    backend = "onnx"
+
+    def __init__(self, model_dir: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                 num_threads: int = DEFAULT_NUM_THREADS):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_dir = model_dir or MODEL_DIR
+        self.batch_size = batch_size
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding()
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = num_threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, MODEL_FILE), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.dimension = self.session.get_outputs()[0].shape[-1]
+        if not isinstance(self.dimension, int):
+            self.dimension = 384
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+        hidden = self.session.run(None, feeds)[0]
+
+        # Mean pooling over real tokens, then L2 normalization.
+        mask = attention_mask[..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+    def encode(self, sentences, batch_size: Optional[int] = None, **kwargs) -> np.ndarray:
+        """Encodes a string or list of strings into float32 embeddings."""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        batch_size = batch_size or self.batch_size
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+
+        # Batching texts of similar length keeps padding (and wasted compute) low.
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        for start in range(0, len(order), batch_size):
+            indices = order[start:start + batch_size]
+            embeddings[indices] = self._encode_batch([texts[i] for i in indices])
+        return embeddings[0] if single else embeddings
+
+
+if __name__ == "__main__":
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Manage the int8 ONNX embedding model.")
+    arg_parser.add_argument("command", choices=["export"])
+    arg_parser.add_argument("--output", default=None, help="Directory for the exported model.")
+    args = arg_parser.parse_args()
+
+    print(f"Exported quantized model to {export_quantized_model(args.output)}")
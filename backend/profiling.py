@@ -0,0 +1,148 @@
+import collections
+import contextlib
+import cProfile
+import os
+import random
+import signal
+import sys
+import threading
+import time
+from typing import Optional
+
+from backend.config import DATA_DIR
+
+# Profiling is off unless PROSCAN_PROFILE is set, and costs nothing then:
+#   "cprofile": a cProfile dump per profiled request (a PROSCAN_PROFILE_SAMPLE_RATE
+#               fraction of them), for a detailed look at one request;
+#   "stacks":   the stacks of all threads sampled every PROSCAN_PROFILE_INTERVAL
+#               seconds and written as folded stacks (one "frame;frame;... count"
+#               line per stack, the input format of flamegraph tools).
+PROFILE_MODE = os.environ.get("PROSCAN_PROFILE", "")
+CPROFILE = "cprofile"
+STACKS = "stacks"
+PROFILE_DIR = os.environ.get("PROSCAN_PROFILE_DIR", os.path.join(DATA_DIR, "profiles"))
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROSCAN_PROFILE_SAMPLE_RATE", "1.0"))
+STACK_INTERVAL = float(os.environ.get("PROSCAN_PROFILE_INTERVAL", "0.01"))
+# How often the stack sampler writes its counts so far.
+STACK_FLUSH_SECONDS = 30
+MAX_STACK_DEPTH = 64
+
+
+@contextlib.contextmanager
+def profiled(name: str):
+    """
+    Profiles the enclosed request with cProfile when PROSCAN_PROFILE=cprofile, and
+    writes the stats to PROFILE_DIR/<name>-<pid>-<time>.prof (open with pstats or
+    snakeviz). Otherwise does nothing.
+    """
+    if PROFILE_MODE != CPROFILE or random.random() >= PROFILE_SAMPLE_RATE:
+        yield
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Python 3.12+ allows one active profiler per process; this request is skipped.
+        yield
+        return
+    try:
+        yield
+    finally:
+        profiler.disable()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(os.path.join(
+            PROFILE_DIR, f"{name}-{os.getpid()}-{int(time.time() * 1000)}-{threading.get_ident()}.prof"
+        ))
+
+
+class StackSampler:
+    """Samples the stacks of all other threads of this process at a fixed interval."""
+
+    def __init__(self, interval: float = STACK_INTERVAL, path: Optional[str] = None):
+        self.interval = interval
+        self.path = path or os.path.join(PROFILE_DIR, f"stacks-{os.getpid()}.folded")
+        self.counts = collections.Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        last_flush = time.monotonic()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.counts[";".join(reversed(stack))] += 1
+            if time.monotonic() - last_flush >= STACK_FLUSH_SECONDS:
+                self.flush()
+                last_flush = time.monotonic()
+
+    def flush(self) -> None:
+        """Writes the counts so far (replacing the previous file) atomically."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+        os.replace(tmp_path, self.path)
+
+
+_sampler: Optional[StackSampler] = None
+_lock = threading.Lock()
+
+
+def start_stack_sampler() -> StackSampler:
+    """Starts this process' stack sampler, if it is not running yet."""
+    global _sampler
+    with _lock:
+        if _sampler is None:
+            _sampler = StackSampler()
+        _sampler.start()
+        return _sampler
+
+
+def toggle_stack_sampler(*_) -> None:
+    """Starts the stack sampler, or stops it and writes its file."""
+    with _lock:
+        running = _sampler is not None and _sampler.running
+    if running:
+        _sampler.stop()
+        print(f"Stack sampling stopped; wrote {_sampler.path}")
+    else:
+        print(f"Stack sampling started; stop with SIGUSR2 to write {start_stack_sampler().path}")
+
+
+def start_from_env(signals: bool = False) -> None:
+    """
+    Starts the profiling PROSCAN_PROFILE asks for in this process.
+
+    Args:
+        signals: Also let SIGUSR2 switch stack sampling on and off, so a running
+            worker can be profiled without a restart. Only possible from the main thread.
+    """
+    if PROFILE_MODE == STACKS:
+        start_stack_sampler()
+    if signals and hasattr(signal, "SIGUSR2") and threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGUSR2, toggle_stack_sampler)
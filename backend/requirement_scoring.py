@@ -0,0 +1,371 @@
+import hashlib
+import json
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from backend.candidate_store import CandidateStore
+
+# A job description is scored as a list of requirements (its bullet points and
+# sentences). Each candidate's match against each requirement is stored under the
+# requirement's content hash, so after a JD edit only the new or reworded
+# requirements are matched again; the rest are read back and re-aggregated.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS requirements (
+    hash TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    skills TEXT NOT NULL,
+    weight REAL NOT NULL,
+    embedding BLOB
+);
+
+CREATE TABLE IF NOT EXISTS jd_requirements (
+    jd_id INTEGER NOT NULL REFERENCES job_descriptions(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    requirement_hash TEXT NOT NULL REFERENCES requirements(hash),
+    PRIMARY KEY (jd_id, position)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS requirement_matches (
+    candidate_id INTEGER NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+    requirement_hash TEXT NOT NULL,
+    score REAL NOT NULL,
+    matched_skills TEXT NOT NULL,
+    PRIMARY KEY (candidate_id, requirement_hash)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS requirement_scores (
+    candidate_id INTEGER NOT NULL REFERENCES candidates(id) ON DELETE CASCADE,
+    jd_id INTEGER NOT NULL REFERENCES job_descriptions(id) ON DELETE CASCADE,
+    match_score REAL NOT NULL,
+    scored_at REAL NOT NULL,
+    PRIMARY KEY (candidate_id, jd_id)
+);
+CREATE INDEX IF NOT EXISTS idx_requirement_scores_jd ON requirement_scores(jd_id, match_score);
+"""
+
+_BULLET_PATTERN = re.compile(r"^[\s\-–•*▪■·>]+|^\s*\d{1,2}[.)]\s+")
+_SENTENCE_SPLIT_PATTERN = re.compile(r"(?<=[.!?;])\s+(?=[A-Z])")
+_SPACE_PATTERN = re.compile(r"\s+")
+_WORD_PATTERN = re.compile(r"[A-Za-z]+")
+# Requirements phrased like these count half as much as the rest.
+_OPTIONAL_PATTERN = re.compile(
+    r"\b(nice to have|preferred|bonus|a plus|is a plus|desirable|optional|ideally)\b", re.IGNORECASE
+)
+OPTIONAL_WEIGHT = 0.5
+# Lines with fewer words than this that mention no skill are headings or filler.
+MIN_REQUIREMENT_WORDS = 4
+
+# Skill similarity above which a related skill counts as a partial match, as in
+# jd_comparator.similarity_from_embeddings.
+SKILL_MATCH_THRESHOLD = 0.7
+# Credit for a required skill the candidate has without a stated duration, when the
+# requirement asks for a minimum experience.
+UNKNOWN_EXPERIENCE_CREDIT = 0.5
+# Requirements without a recognizable skill are matched on the whole-resume embedding;
+# cosine similarities in this range map linearly onto 0-1.
+_EMBEDDING_SCORE_RANGE = (0.2, 0.7)
+
+
+def requirement_hash(text: str) -> str:
+    """Stable id of a requirement that ignores case, whitespace and bullet characters."""
+    normalized = _SPACE_PATTERN.sub(" ", _BULLET_PATTERN.sub("", text)).strip().lower()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def requirement_weight(text: str) -> float:
+    """Weight of a requirement in the overall score: OPTIONAL_WEIGHT for nice-to-haves, else 1."""
+    return OPTIONAL_WEIGHT if _OPTIONAL_PATTERN.search(text) else 1.0
+
+
+def split_requirements(jd_text: str) -> List[str]:
+    """Splits a job description into requirement texts: bullet points, lines and sentences."""
+    from backend.skill_matcher import get_matcher
+
+    matcher = get_matcher()
+    requirements, seen = [], set()
+    for line in jd_text.splitlines():
+        line = _BULLET_PATTERN.sub("", line).strip()
+        if not line or line.endswith(":"):
+            continue
+        for sentence in _SENTENCE_SPLIT_PATTERN.split(line):
+            sentence = sentence.strip()
+            if len(_WORD_PATTERN.findall(sentence)) < MIN_REQUIREMENT_WORDS and not matcher.find(sentence):
+                continue
+            key = requirement_hash(sentence)
+            if key not in seen:
+                seen.add(key)
+                requirements.append(sentence)
+    return requirements
+
+
+def _unit(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.clip(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12, None)
+
+
+class RequirementScorer:
+    """Per-requirement candidate scoring against job descriptions, stored in a CandidateStore."""
+
+    def __init__(self, store: Optional[CandidateStore] = None):
+        self.store = store or CandidateStore()
+        self.conn = self.store.conn
+        self.conn.executescript(_SCHEMA)
+        self._skill_embeddings: Dict[str, np.ndarray] = {}
+
+    def _embed_skills(self, skills: Iterable[str]) -> None:
+        missing = sorted({skill for skill in skills if skill not in self._skill_embeddings})
+        if missing:
+            from backend.jd_comparator import encode_skills
+            for skill, embedding in zip(missing, _unit(encode_skills(missing))):
+                self._skill_embeddings[skill] = embedding
+
+    def set_job_description(self, jd_text: str, title: Optional[str] = None) -> Tuple[int, List[dict]]:
+        """
+        Stores a job description with its requirements. Only requirements not seen
+        in any earlier JD are analyzed (skills, weight, embedding).
+
+        Returns:
+            The JD id and its requirements as dicts with "hash", "text", "skills"
+            ({skill: minimum months}), "weight" and "embedding".
+        """
+        from backend.skill_matcher import get_matcher
+
+        jd_id = self.store.add_job_description(jd_text, title)
+        texts = split_requirements(jd_text)
+        hashes = [requirement_hash(text) for text in texts]
+        known = self._load_requirements(hashes)
+
+        new = [(key, text) for key, text in zip(hashes, texts) if key not in known]
+        if new:
+            from backend.jd_comparator import model
+            embeddings = model.encode([text for _, text in new], convert_to_numpy=True)
+            matcher = get_matcher()
+            with self.conn:
+                for (key, text), embedding in zip(new, embeddings):
+                    skills = {
+                        skill["name"]: skill["experience"]
+                        for category_skills in matcher.extract(text)["categorized_skills"].values()
+                        for skill in category_skills
+                    }
+                    weight = requirement_weight(text)
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO requirements (hash, text, skills, weight, embedding) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (key, text, json.dumps(skills), weight, np.asarray(embedding, dtype=np.float32).tobytes()),
+                    )
+            known.update(self._load_requirements([key for key, _ in new]))
+
+        with self.conn:
+            self.conn.execute("DELETE FROM jd_requirements WHERE jd_id = ?", (jd_id,))
+            self.conn.executemany(
+                "INSERT INTO jd_requirements (jd_id, position, requirement_hash) VALUES (?, ?, ?)",
+                [(jd_id, position, key) for position, key in enumerate(hashes)],
+            )
+        return jd_id, [known[key] for key in hashes]
+
+    def _load_requirements(self, hashes: List[str]) -> Dict[str, dict]:
+        requirements = {}
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT * FROM requirements WHERE hash IN ({','.join('?' * len(chunk))})", chunk
+            )
+            for row in rows:
+                requirements[row["hash"]] = {
+                    "hash": row["hash"],
+                    "text": row["text"],
+                    "skills": json.loads(row["skills"]),
+                    "weight": row["weight"],
+                    "embedding": np.frombuffer(row["embedding"], dtype=np.float32) if row["embedding"] else None,
+                }
+        return requirements
+
+    def _candidate_profiles(self, candidate_ids: List[int]) -> Dict[int, dict]:
+        profiles = {candidate_id: {"skills": {}, "embedding": None} for candidate_id in candidate_ids}
+        for start in range(0, len(candidate_ids), 500):
+            chunk = candidate_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for row in self.conn.execute(
+                f"SELECT candidate_id, skill, experience_months FROM candidate_skills "
+                f"WHERE candidate_id IN ({placeholders})", chunk
+            ):
+                profiles[row["candidate_id"]]["skills"][row["skill"]] = row["experience_months"]
+            for row in self.conn.execute(
+                f"SELECT id, embedding FROM candidates WHERE id IN ({placeholders})", chunk
+            ):
+                if row["embedding"]:
+                    profiles[row["id"]]["embedding"] = _unit(np.frombuffer(row["embedding"], dtype=np.float32))
+        return profiles
+
+    def _match(self, requirement: dict, profile: dict) -> Tuple[float, List[str]]:
+        """Scores one requirement for one candidate (0-1) and lists the candidate skills that matched it."""
+        required = requirement["skills"]
+        if not required:
+            if profile["embedding"] is None or requirement["embedding"] is None:
+                return 0.0, []
+            cosine = float(profile["embedding"] @ _unit(requirement["embedding"]))
+            low, high = _EMBEDDING_SCORE_RANGE
+            return min(max((cosine - low) / (high - low), 0.0), 1.0), []
+
+        candidate_skills = profile["skills"]
+        if "matrix" not in profile:
+            names = list(candidate_skills)
+            profile["names"] = names
+            profile["matrix"] = (
+                np.stack([self._skill_embeddings[name] for name in names]) if names else None
+            )
+
+        credits, matched = [], []
+        for skill, months in required.items():
+            if skill in candidate_skills:
+                have = candidate_skills[skill]
+                if not months:
+                    credit = 1.0
+                elif have:
+                    credit = min(have / months, 1.0)
+                else:
+                    credit = UNKNOWN_EXPERIENCE_CREDIT
+                credits.append(credit)
+                matched.append(skill)
+                continue
+            if profile["matrix"] is None:
+                credits.append(0.0)
+                continue
+            similarities = profile["matrix"] @ self._skill_embeddings[skill]
+            best = int(np.argmax(similarities))
+            if similarities[best] > SKILL_MATCH_THRESHOLD:
+                credits.append(float(similarities[best]))
+                matched.append(profile["names"][best])
+            else:
+                credits.append(0.0)
+        return float(np.mean(credits)), matched
+
+    def rescore(
+        self,
+        jd_text: str,
+        candidate_ids: Optional[Iterable[int]] = None,
+        previous_jd_id: Optional[int] = None,
+        title: Optional[str] = None,
+    ) -> Dict[int, float]:
+        """
+        Scores candidates against a (possibly edited) job description.
+
+        Requirement matches already stored for a candidate are reused, so after an
+        edit only the added or changed requirements are evaluated.
+
+        Args:
+            jd_text: The job description.
+            candidate_ids: Candidates to score. Defaults to those scored or analyzed
+                against `previous_jd_id`, or to every stored candidate.
+            previous_jd_id: The JD this one is an edit of.
+            title: Optional title stored with the JD.
+
+        Returns:
+            Candidate id to aggregate match score (0 to 100), also stored in
+            requirement_scores.
+        """
+        jd_id, requirements = self.set_job_description(jd_text, title)
+        if candidate_ids is None:
+            if previous_jd_id is not None:
+                rows = self.conn.execute(
+                    "SELECT candidate_id FROM requirement_scores WHERE jd_id = ? "
+                    "UNION SELECT candidate_id FROM analyses WHERE jd_id = ?",
+                    (previous_jd_id, previous_jd_id),
+                )
+            else:
+                rows = self.conn.execute("SELECT id FROM candidates")
+            candidate_ids = [row[0] for row in rows]
+        candidate_ids = list(candidate_ids)
+        if not candidate_ids:
+            return {}
+
+        hashes = [requirement["hash"] for requirement in requirements]
+        stored: Dict[Tuple[int, str], float] = {}
+        for start in range(0, len(candidate_ids), 500):
+            chunk = candidate_ids[start:start + 500]
+            for row in self.conn.execute(
+                f"SELECT candidate_id, requirement_hash, score FROM requirement_matches "
+                f"WHERE candidate_id IN ({','.join('?' * len(chunk))})", chunk
+            ):
+                stored[(row["candidate_id"], row["requirement_hash"])] = row["score"]
+
+        pending = [
+            candidate_id for candidate_id in candidate_ids
+            if any((candidate_id, key) not in stored for key in hashes)
+        ]
+        if pending:
+            profiles = self._candidate_profiles(pending)
+            self._embed_skills(
+                {skill for profile in profiles.values() for skill in profile["skills"]}
+                | {skill for requirement in requirements for skill in requirement["skills"]}
+            )
+            new_matches = []
+            for candidate_id in pending:
+                for requirement in requirements:
+                    key = (candidate_id, requirement["hash"])
+                    if key not in stored:
+                        score, matched = self._match(requirement, profiles[candidate_id])
+                        stored[key] = score
+                        new_matches.append((candidate_id, requirement["hash"], score, json.dumps(matched)))
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO requirement_matches (candidate_id, requirement_hash, score, matched_skills) "
+                    "VALUES (?, ?, ?, ?)",
+                    new_matches,
+                )
+
+        total_weight = sum(requirement["weight"] for requirement in requirements)
+        scores = {}
+        for candidate_id in candidate_ids:
+            weighted = sum(stored[(candidate_id, requirement["hash"])] * requirement["weight"]
+                           for requirement in requirements)
+            scores[candidate_id] = round(100 * weighted / total_weight, 1) if total_weight else 0.0
+
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO requirement_scores (candidate_id, jd_id, match_score, scored_at) "
+                "VALUES (?, ?, ?, ?)",
+                [(candidate_id, jd_id, score, now) for candidate_id, score in scores.items()],
+            )
+        return scores
+
+    def breakdown(self, candidate_id: int, jd_id: int) -> List[dict]:
+        """Returns the per-requirement matches of a candidate for a JD, in JD order."""
+        rows = self.conn.execute(
+            "SELECT r.text, r.weight, m.score, m.matched_skills FROM jd_requirements j "
+            "JOIN requirements r ON r.hash = j.requirement_hash "
+            "LEFT JOIN requirement_matches m ON m.requirement_hash = j.requirement_hash AND m.candidate_id = ? "
+            "WHERE j.jd_id = ? ORDER BY j.position",
+            (candidate_id, jd_id),
+        )
+        return [
+            {
+                "requirement": row["text"],
+                "weight": row["weight"],
+                "score": row["score"],
+                "matched_skills": json.loads(row["matched_skills"]) if row["matched_skills"] else [],
+            }
+            for row in rows
+        ]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Re-score stored candidates against an edited job description.")
+    arg_parser.add_argument("path", help="Plain-text job description.")
+    arg_parser.add_argument("--previous-jd", type=int, default=None, help="Id of the JD this one replaces.")
+    arg_parser.add_argument("--top", type=int, default=20, help="Number of candidates to print.")
+    args = arg_parser.parse_args()
+
+    with open(args.path, encoding="utf-8") as f:
+        text = f.read()
+    started = time.perf_counter()
+    results = RequirementScorer().rescore(text, previous_jd_id=args.previous_jd)
+    elapsed = time.perf_counter() - started
+    for candidate_id, match_score in sorted(results.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"candidate {candidate_id}: {match_score}")
+    print(f"Scored {len(results)} candidate(s) in {elapsed:.2f}s")
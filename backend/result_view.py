@@ -0,0 +1,164 @@
+import collections
+import hashlib
+import html
+import json
+import os
+import threading
+from typing import List, Optional, Tuple
+from urllib.parse import quote
+
+# Skill chips and resume text are shown a page at a time, so the page sent to the
+# browser stays small however long the lists and the resume are.
+SKILL_PAGE_SIZE = 40
+RESUME_PAGE_CHARS = 6000
+RANKED_PAGE_SIZE = 50
+# Rendered analyses kept in memory, most recently used last.
+FRAGMENT_CACHE_SIZE = 128
+# The ranked table shows every stored candidate, with email addresses, only on
+# recruiter deployments; otherwise it ranks the resumes submitted in the current
+# session, without email addresses.
+RECRUITER_MODE = os.environ.get("PROSCAN_RECRUITER_MODE", "off") == "on"
+
+SKILL_GROUPS = ("technical_skills", "soft_skills", "keywords")
+_RING_CIRCUMFERENCE = 2 * 3.14159 * 90
+
+_fragments = collections.OrderedDict()
+_lock = threading.Lock()
+
+
+def result_hash(analysis: dict) -> str:
+    """A stable key for an analysis result."""
+    return hashlib.sha256(json.dumps(analysis, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def score_color(score: float) -> str:
+    return "red" if score < 20 else "yellow" if score < 50 else "lightgreen" if score < 70 else "green"
+
+
+def score_ring_html(score: float) -> str:
+    return f"""
+            <div style="display: flex; justify-content: center;">
+                <div style="position: relative; width: 200px; height: 200px;">
+                    <svg width="200" height="200" viewBox="0 0 200 200">
+                        <circle cx="100" cy="100" r="90" fill="none" stroke="#e6e6e6" stroke-width="10"></circle>
+                        <circle cx="100" cy="100" r="90" fill="none" stroke="{score_color(score)}" stroke-width="10" stroke-dasharray="{_RING_CIRCUMFERENCE}" stroke-dashoffset="{_RING_CIRCUMFERENCE * (1 - score / 100)}" transform="rotate(-90 100 100)"></circle>
+                    </svg>
+                    <div style="position: absolute; top: 50%; left: 50%; transform: translate(-50%, -50%); font-size: 2rem; font-weight: bold;">{score}%</div>
+                </div>
+            </div>
+        """
+
+
+def _chip(skill: str, color: str, mark: str) -> str:
+    return (f'<span style="background-color: {color}; color: white; padding: 5px 10px; border-radius: 15px;">'
+            f'{html.escape(str(skill))} {mark}</span>')
+
+
+def chips_html(chips: List[str]) -> str:
+    """Wraps pre-rendered chips (a page of them) in the flex container."""
+    return f"""
+                <div style="display: flex; flex-wrap: wrap; gap: 10px;">
+                    {''.join(chips)}
+                </div>
+            """
+
+
+def course_card_html(course: dict) -> str:
+    # Udemy search URL with filters for top-rated courses
+    search_url = (
+        'https://www.udemy.com/courses/search/'
+        f'?q={quote(course["skill"])}'
+        '&sort=rating'  # Sort by rating
+        '&ratings=4.5'  # Minimum 4.5 stars
+        '&instructional_level=all'
+    )
+    return f"""
+            <div class="course-card">
+                <div class="course-title">
+                    <a href="{search_url}" target="_blank">Find top-rated courses for: {html.escape(course['skill'])}</a>
+                </div>
+                <div class="course-description">
+                    {html.escape(course['description'])}
+                </div>
+            </div>
+            """
+
+
+def text_pages(text: str, page_chars: int = RESUME_PAGE_CHARS) -> List[Tuple[int, int]]:
+    """Splits text into (start, end) pages of about page_chars, ending at line breaks where possible."""
+    pages, start = [], 0
+    while start < len(text):
+        end = min(start + page_chars, len(text))
+        if end < len(text):
+            line_end = text.rfind("\n", start, end)
+            if line_end > start:
+                end = line_end + 1
+        pages.append((start, end))
+        start = end
+    return pages or [(0, 0)]
+
+
+def _render(analysis: dict) -> dict:
+    skills_analysis = analysis.get("skills_analysis") or {}
+    matching, missing = [], []
+    for skill_type in SKILL_GROUPS:
+        if skill_type in skills_analysis:
+            matching.extend(skills_analysis[skill_type].get("matching", []))
+            missing.extend(skills_analysis[skill_type].get("missing", []))
+    return {
+        "score_ring": score_ring_html(analysis.get("match_score", 0)),
+        "matching_chips": [_chip(skill, "#2E8B57", "✓") for skill in matching],
+        "missing_chips": [_chip(skill, "#FF4500", "⚡") for skill in missing],
+        "courses": [course_card_html(course) for course in analysis.get("recommended_courses") or []
+                    if course.get("skill") and course.get("description")],
+    }
+
+
+def analysis_fragments(analysis: dict, key: Optional[str] = None) -> dict:
+    """
+    The HTML fragments of an analysis, rendered once per result and then served from
+    an LRU cache, so reruns of the page do not rebuild them.
+
+    Args:
+        key: The analysis' `result_hash`, if already known.
+
+    Returns:
+        "score_ring" HTML, "matching_chips" and "missing_chips" (one HTML chip per
+        skill, to be shown a page at a time with `chips_html`) and "courses" (one
+        card per course).
+    """
+    key = key or result_hash(analysis)
+    with _lock:
+        if key in _fragments:
+            _fragments.move_to_end(key)
+            return _fragments[key]
+    fragments = _render(analysis)
+    with _lock:
+        _fragments[key] = fragments
+        while len(_fragments) > FRAGMENT_CACHE_SIZE:
+            _fragments.popitem(last=False)
+    return fragments
+
+
+def ranked_rows(analyses: List[dict], offset: int = 0, show_email: bool = False) -> List[dict]:
+    """
+    Compact table rows for ranked candidates, from `CandidateStore.ranked_analyses`.
+    Only the counts and the first few missing skills of each analysis are kept, and
+    the email address only with `show_email`.
+    """
+    rows = []
+    for rank, entry in enumerate(analyses, offset + 1):
+        skills_analysis = entry["result"].get("skills_analysis") or {}
+        matching = [skill for group in SKILL_GROUPS for skill in (skills_analysis.get(group) or {}).get("matching", [])]
+        missing = [skill for group in SKILL_GROUPS for skill in (skills_analysis.get(group) or {}).get("missing", [])]
+        row = {"Rank": rank, "Candidate": entry["name"] or f"#{entry['candidate_id']}"}
+        if show_email:
+            row["Email"] = entry["email"]
+        row.update({
+            "Score": entry["match_score"],
+            "Matching": len(matching),
+            "Missing": len(missing),
+            "Top gaps": ", ".join(missing[:3]),
+        })
+        rows.append(row)
+    return rows
@@ -1,13 +1,31 @@
 import google.generativeai as genai
 import os
-import json
+import time
 import streamlit as st
 
+from backend.analysis_schema import field_formats, fill_defaults, parse_json, validate_analysis
+from backend.chunked_analysis import CHUNK_CHARS, MAX_CONCURRENT_CHUNKS, analyze_in_chunks
+from backend.model_router import (FAKE, LLM_BACKEND, BudgetExceeded, DEFAULT_DEPTH, DEFAULT_LATENCY_BUDGET,
+                                  MIN_ATTEMPT_SECONDS, build_router)
+from backend.section_segmenter import join_sections, segment
+
+def _secret_api_key():
+    """Reads the API key from Streamlit secrets, if a secrets file is available."""
+    # Background workers run outside Streamlit and usually have no secrets file,
+    # in which case accessing st.secrets raises instead of returning nothing.
+    try:
+        return st.secrets['GOOGLE_API_KEY'] if 'GOOGLE_API_KEY' in st.secrets else None
+    except Exception:
+        return None
+
 # Get API key from Streamlit secrets or environment variables
 try:
+    # The local fake backend needs no API key.
+    if LLM_BACKEND == FAKE:
+        api_key = None
     # First try getting from Streamlit secrets
-    if 'GOOGLE_API_KEY' in st.secrets:
-        api_key = st.secrets['GOOGLE_API_KEY']
+    elif _secret_api_key():
+        api_key = _secret_api_key()
     # Then try environment variable
     elif os.environ.get('GOOGLE_API_KEY'):
         api_key = os.environ.get('GOOGLE_API_KEY')
@@ -15,8 +33,11 @@ try:
         st.error("⚠️ Google API Key not found. Please configure it in Streamlit secrets or environment variables.")
         raise ValueError("GOOGLE_API_KEY not found")
         
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel('gemini-1.5-flash')
+    if api_key:
+        genai.configure(api_key=api_key)
+    # Picks a model tier per request and keeps each call within its latency budget.
+    # A worker runs one analysis at a time, which sends at most one request per part.
+    model = build_router(max_workers=MAX_CONCURRENT_CHUNKS)
     
 except Exception as e:
     st.error(f"⚠️ Error configuring AI: {str(e)}")
@@ -99,7 +120,67 @@ Your task is to analyze a resume against a job description and provide a detaile
 **Analysis (JSON Output Only):**
 """
 
-def get_semantic_analysis(resume_text: str, jd_text: str) -> dict:
+# Asks for only the fields an earlier response left out or got wrong, so a truncated or
+# malformed answer costs a short follow-up instead of a full new analysis.
+FOLLOW_UP_TEMPLATE = """
+You are an expert HR analyst. You analyzed the resume below against the job description, but
+some fields of your analysis were missing or invalid.
+Return ONLY a single, clean JSON object with exactly these fields and nothing else:
+{{
+{fields}
+}}
+
+**Job Description:**
+---
+{jd_text}
+---
+
+**Resume:**
+---
+{resume_text}
+---
+
+**Missing Fields (JSON Output Only):**
+"""
+
+# Resume sections that never affect the analysis and are left out of the prompt.
+IRRELEVANT_SECTIONS = ("interests", "references")
+
+def relevant_resume_text(resume_text: str) -> str:
+    """Returns the resume without its IRRELEVANT_SECTIONS, keeping each section's heading."""
+    sections = segment(resume_text)
+    kept = [section for section in sections if section.name not in IRRELEVANT_SECTIONS]
+    if len(kept) == len(sections):
+        return resume_text
+    return join_sections(resume_text, kept, headings=True)
+
+def local_analysis(resume_text: str, jd_text: str, reason: str) -> dict:
+    """
+    A quick analysis from the local skill matcher, used when no model tier answers
+    within the latency budget. Only the score and technical skills are filled in.
+    """
+    from backend.jd_comparator import calculate_similarity
+    from backend.skill_matcher import extract_skills
+
+    resume_skills = extract_skills(resume_text)["skills"]
+    jd_skills = extract_skills(jd_text)["skills"]
+    resume_lower = {skill.lower() for skill in resume_skills}
+    return {
+        "match_score": round(calculate_similarity(resume_skills, jd_skills)),
+        "executive_summary": "The AI analysis did not finish in time; this is a quick score based on "
+                             "matching skills only.",
+        "skills_analysis": {
+            "technical_skills": {
+                "matching": [skill for skill in jd_skills if skill.lower() in resume_lower],
+                "missing": [skill for skill in jd_skills if skill.lower() not in resume_lower],
+            },
+        },
+        "degraded": True,
+        "details": reason,
+    }
+
+def get_semantic_analysis(resume_text: str, jd_text: str, depth: str = DEFAULT_DEPTH,
+                          latency_budget: float = None) -> dict:
     """
     Performs a deep semantic analysis of a resume against a job description
     using a generative AI model.
@@ -107,10 +188,13 @@ def get_semantic_analysis(resume_text: str, jd_text: str) -> dict:
     Args:
         resume_text: The full text of the resume.
         jd_text: The full text of the job description.
+        depth: "quick", "standard" or "deep"; picks the starting model tier.
+        latency_budget: Seconds the analysis may take. Defaults to PROSCAN_LATENCY_BUDGET.
 
     Returns:
         A dictionary containing the analysis (score, summary, skills),
-        or an error dictionary if the analysis fails.
+        or an error dictionary if the analysis fails. If no model answers within
+        the budget, a quick local analysis marked "degraded" is returned instead.
     """
     if not model:
         return {
@@ -121,16 +205,31 @@ def get_semantic_analysis(resume_text: str, jd_text: str) -> dict:
         return {"error": "Resume or Job Description text is missing."}
 
     try:
+        started = time.monotonic()
+        budget = DEFAULT_LATENCY_BUDGET if latency_budget is None else latency_budget
+        resume_text = relevant_resume_text(resume_text)
+        if len(resume_text) > CHUNK_CHARS:
+            # Long CVs are analyzed in parts at once, so latency follows the part size.
+            return analyze_in_chunks(model, resume_text, jd_text, depth, budget)
         prompt = PROMPT_TEMPLATE.format(resume_text=resume_text, jd_text=jd_text)
-        response = model.generate_content(prompt)
-
-        # Clean the response to extract only the JSON part.
-        cleaned_response = response.text.strip().replace("```json", "").replace("```", "").strip()
+        response = model.generate(prompt, depth=depth, budget=budget)
 
-        # Parse the JSON string into a Python dictionary
-        analysis_result = json.loads(cleaned_response)
+        # Parse the JSON, repairing truncated or malformed output, and check it
+        # against the fields display_analysis relies on.
+        analysis_result, missing = validate_analysis(parse_json(response["text"]))
+        if missing:
+            remaining = budget - (time.monotonic() - started)
+            analysis_result.update(request_missing_fields(missing, resume_text, jd_text, depth, remaining))
+            missing = [field for field in missing if field not in analysis_result]
+        missing = fill_defaults(analysis_result, missing)
+        if missing:
+            raise ValueError(f"AI response is missing {', '.join(missing)}")
         return analysis_result
 
+    except BudgetExceeded as e:
+        print(f"Semantic analysis exceeded its latency budget: {e}")
+        return local_analysis(resume_text, jd_text, str(e))
+
     except Exception as e:
         print(f"An error occurred during semantic analysis: {e}")
         # Fallback or error dictionary
@@ -138,3 +237,22 @@ def get_semantic_analysis(resume_text: str, jd_text: str) -> dict:
             "error": "Failed to get analysis from the AI model.",
             "details": str(e)
         }
+
+def request_missing_fields(fields: list, resume_text: str, jd_text: str, depth: str, budget: float) -> dict:
+    """
+    Asks the model for only the given analysis fields.
+
+    Returns:
+        The requested fields that came back valid; empty if there is no time left
+        or the follow-up fails.
+    """
+    if budget < MIN_ATTEMPT_SECONDS:
+        return {}
+    prompt = FOLLOW_UP_TEMPLATE.format(fields=field_formats(fields), resume_text=resume_text, jd_text=jd_text)
+    try:
+        response = model.generate(prompt, depth=depth, budget=budget)
+        answer, still_missing = validate_analysis(parse_json(response["text"]))
+    except Exception as e:
+        print(f"Follow-up request for {', '.join(fields)} failed: {e}")
+        return {}
+    return {field: answer[field] for field in fields if field not in still_missing}
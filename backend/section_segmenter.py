@@ -0,0 +1,154 @@
+import re
+from typing import Iterable, List, NamedTuple
+
+# Section headings recognized in resumes, by canonical section name. Matching is
+# case-insensitive, and "and" also matches "&".
+HEADINGS = {
+    "summary": ["summary", "professional summary", "profile", "professional profile", "about me",
+                "objective", "career objective"],
+    "experience": ["experience", "work experience", "professional experience", "employment history",
+                   "employment", "work history", "career history"],
+    "education": ["education", "academic background", "qualifications", "education and training"],
+    "projects": ["projects", "personal projects", "academic projects", "key projects"],
+    "skills": ["skills", "technical skills", "key skills", "core competencies", "technologies",
+               "tech stack", "skills and tools"],
+    "certifications": ["certifications", "certificates", "licenses and certifications"],
+    "awards": ["awards", "honors", "honors and awards", "achievements"],
+    "publications": ["publications"],
+    "languages": ["languages"],
+    "volunteering": ["volunteering", "volunteer experience"],
+    "interests": ["interests", "hobbies", "hobbies and interests"],
+    "references": ["references"],
+}
+# Text before the first heading (name and contact details), and sections under a
+# heading that is not in HEADINGS.
+HEADER = "header"
+OTHER = "other"
+
+_ALIASES = {alias: name for name, aliases in HEADINGS.items() for alias in aliases}
+# Words of the headings above that name a kind of section, singular. An ALL-CAPS line
+# must contain one ("RESEARCH EXPERIENCE", "SELECTED PUBLICATIONS") to be a heading,
+# so employer names like "IBM" in an experience list stay in their section.
+_GENERIC_WORDS = {"and", "about", "me", "professional", "work", "career", "academic", "personal", "key",
+                  "technical", "core", "tech", "tool", "stack", "background"}
+_HEADING_WORDS = {word.rstrip("s") for alias in _ALIASES for word in alias.split()} - _GENERIC_WORDS
+
+
+def _alias_pattern(alias: str) -> str:
+    return r"[ \t]+".join(r"(?:and|&)" if word == "and" else re.escape(word) for word in alias.split())
+
+
+# Regex alternation of every heading, longest first. Also used by other patterns that
+# must not mistake a heading line for content.
+HEADING_ALTERNATION = "|".join(_alias_pattern(alias) for alias in sorted(_ALIASES, key=len, reverse=True))
+
+# The heading grammar. A heading is a line holding, after an optional bullet or number,
+#   - a known heading, optionally followed by ":" and the start of the section
+#     ("Skills: Python, SQL"), or
+#   - a short ALL-CAPS line, a common layout for headings this grammar does not know,
+#     if it has one of _HEADING_WORDS.
+_HEADING_PATTERN = re.compile(rf'''
+    ^[ \t]*(?:[\#*•▪■\-–]+[ \t]*|\d{{1,2}}[.)][ \t]+)?
+    (?:
+        (?P<known>(?i:{HEADING_ALTERNATION}))[ \t]*(?::[ \t]*(?P<inline>[^\n]*?))?
+      | (?P<caps>[A-Z][A-Z&/]*(?:[ \t][A-Z&/]+){{0,3}}):?
+    )[ \t]*$
+''', re.VERBOSE | re.MULTILINE)
+_NON_SPACE = re.compile(r"\S")
+_SPACE = re.compile(r"\s+")
+
+
+class Section(NamedTuple):
+    """A section of a resume, as offsets into the original text."""
+    name: str           # canonical name from HEADINGS, HEADER or OTHER
+    heading_start: int  # start of the heading line (== start for the header)
+    start: int          # start of the section body
+    end: int            # end of the section body (start of the next heading)
+
+
+def canonical_section(heading: str) -> str:
+    """Returns the canonical section name of a heading, or OTHER if it is not known."""
+    return _ALIASES.get(_SPACE.sub(" ", heading.strip().lower()).replace("&", "and"), OTHER)
+
+
+def _has_content(text: str, start: int, end: int) -> bool:
+    return _NON_SPACE.search(text, start, end) is not None
+
+
+def _has_heading_word(line: str) -> bool:
+    return any(word.rstrip("S").lower() in _HEADING_WORDS for word in re.split(r"[\s&/]+", line))
+
+
+def _follows_blank_line(text: str, line_start: int) -> bool:
+    previous_start = text.rfind("\n", 0, max(line_start - 1, 0)) + 1
+    return not _has_content(text, previous_start, line_start)
+
+
+def segment(text: str) -> List[Section]:
+    """
+    Splits a resume into sections in a single pass over the text.
+
+    ALL-CAPS headings must follow a blank line, name a kind of section and only count
+    after the first known heading, so a capitalized name at the top stays in the header
+    and ALL-CAPS employer names stay in the experience section.
+
+    Returns:
+        Sections in document order, covering the whole text. Nothing is copied;
+        use `text[section.start:section.end]` for a section's body.
+    """
+    sections = []
+    name, heading_start, body_start = HEADER, 0, 0
+    seen_known = False
+    for match in _HEADING_PATTERN.finditer(text):
+        if match.group("known"):
+            new_name = canonical_section(match.group("known"))
+            seen_known = True
+        elif (seen_known and match.start() > 0 and _follows_blank_line(text, match.start())
+              and _has_heading_word(match.group("caps"))):
+            new_name = OTHER
+        else:
+            continue
+        if name != HEADER or _has_content(text, body_start, match.start()):
+            sections.append(Section(name, heading_start, body_start, match.start()))
+        name, heading_start = new_name, match.start()
+        body_start = match.start("inline") if match.group("inline") else match.end()
+    if name != HEADER or _has_content(text, body_start, len(text)):
+        sections.append(Section(name, heading_start, body_start, len(text)))
+    return sections
+
+
+def select(sections: List[Section], names: Iterable[str]) -> List[Section]:
+    """Returns the sections with one of the given canonical names, in document order."""
+    names = set(names)
+    return [section for section in sections if section.name in names]
+
+
+def join_sections(text: str, sections: List[Section], headings: bool = False) -> str:
+    """
+    Joins the given sections of `text` into one string.
+
+    Args:
+        headings: Include each section's heading line, e.g. for prompts.
+    """
+    return "\n\n".join(
+        text[section.heading_start if headings else section.start:section.end].strip() for section in sections
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    arg_parser = argparse.ArgumentParser(description="Print the sections found in a plain-text resume.")
+    arg_parser.add_argument("path", help="Path to a plain-text resume.")
+    args = arg_parser.parse_args()
+
+    with open(args.path, encoding="utf-8") as f:
+        resume_text = f.read()
+    started = time.perf_counter()
+    found = segment(resume_text)
+    elapsed = time.perf_counter() - started
+    for section in found:
+        preview = resume_text[section.start:section.end].strip().replace("\n", " ")[:60]
+        print(f"{section.name:<15} {section.start:>7}-{section.end:<7} {preview}")
+    print(f"{len(found)} sections in {elapsed * 1000:.2f} ms")
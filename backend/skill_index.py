@@ -0,0 +1,352 @@
+import os
+import pickle
+import re
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from backend.config import DATA_DIR
+from backend.skills import canonical_skill
+from backend.taxonomy import get_taxonomy
+
+DEFAULT_INDEX_PATH = os.path.join(DATA_DIR, "skill_index.bin")
+
+# Candidate ids are split into chunks of 2**16. Each chunk that holds at least one id
+# is stored as a Python int used as a bitmap, so empty ranges cost nothing and
+# AND/OR/NOT run as a handful of big-integer operations per chunk.
+_CHUNK_BITS = 16
+_CHUNK_SIZE = 1 << _CHUNK_BITS
+_CHUNK_MASK = _CHUNK_SIZE - 1
+_CHUNK_BYTES = _CHUNK_SIZE // 8
+_FORMAT_VERSION = 2
+
+if hasattr(int, "bit_count"):
+    _popcount = int.bit_count
+else:  # Python < 3.10
+    def _popcount(value: int) -> int:
+        return bin(value).count("1")
+
+
+class Bitmap:
+    """A compressed set of non-negative integer ids."""
+
+    __slots__ = ("chunks",)
+
+    def __init__(self, chunks: Optional[Dict[int, int]] = None):
+        self.chunks = chunks or {}
+
+    @classmethod
+    def from_ids(cls, ids: Iterable[int]) -> "Bitmap":
+        bitmap = cls()
+        for candidate_id in ids:
+            bitmap.add(candidate_id)
+        return bitmap
+
+    def add(self, candidate_id: int) -> None:
+        key = candidate_id >> _CHUNK_BITS
+        self.chunks[key] = self.chunks.get(key, 0) | (1 << (candidate_id & _CHUNK_MASK))
+
+    def discard(self, candidate_id: int) -> None:
+        key = candidate_id >> _CHUNK_BITS
+        if key in self.chunks:
+            value = self.chunks[key] & ~(1 << (candidate_id & _CHUNK_MASK))
+            if value:
+                self.chunks[key] = value
+            else:
+                del self.chunks[key]
+
+    def __contains__(self, candidate_id: int) -> bool:
+        return bool(self.chunks.get(candidate_id >> _CHUNK_BITS, 0) >> (candidate_id & _CHUNK_MASK) & 1)
+
+    def __and__(self, other: "Bitmap") -> "Bitmap":
+        small, large = (self, other) if len(self.chunks) <= len(other.chunks) else (other, self)
+        chunks = {}
+        for key, value in small.chunks.items():
+            both = value & large.chunks.get(key, 0)
+            if both:
+                chunks[key] = both
+        return Bitmap(chunks)
+
+    def __or__(self, other: "Bitmap") -> "Bitmap":
+        chunks = dict(self.chunks)
+        for key, value in other.chunks.items():
+            chunks[key] = chunks.get(key, 0) | value
+        return Bitmap(chunks)
+
+    def __sub__(self, other: "Bitmap") -> "Bitmap":
+        chunks = {}
+        for key, value in self.chunks.items():
+            rest = value & ~other.chunks.get(key, 0)
+            if rest:
+                chunks[key] = rest
+        return Bitmap(chunks)
+
+    def __len__(self) -> int:
+        return sum(_popcount(value) for value in self.chunks.values())
+
+    def __iter__(self) -> Iterator[int]:
+        for key in sorted(self.chunks):
+            base = key << _CHUNK_BITS
+            data = self.chunks[key].to_bytes(_CHUNK_BYTES, "little")
+            for byte_index, byte in enumerate(data):
+                if byte:
+                    for bit in range(8):
+                        if byte >> bit & 1:
+                            yield base + byte_index * 8 + bit
+
+    def to_bytes(self) -> Dict[int, bytes]:
+        """Serializes each chunk to zlib-compressed bytes."""
+        return {
+            key: zlib.compress(value.to_bytes((value.bit_length() + 7) // 8, "little"))
+            for key, value in self.chunks.items()
+        }
+
+    @classmethod
+    def from_bytes(cls, data: Dict[int, bytes]) -> "Bitmap":
+        return cls({key: int.from_bytes(zlib.decompress(raw), "little") for key, raw in data.items()})
+
+
+# Query grammar: terms joined by AND / OR / NOT with parentheses. A term is a skill
+# (multi-word skills such as "machine learning" need no quotes) or "category:<name>".
+_TOKEN_PATTERN = re.compile(r'\s*(?:(\()|(\))|"([^"]*)"|([^\s()"]+))')
+_OPERATORS = {"AND", "OR", "NOT"}
+
+
+def _tokenize(query: str) -> List[str]:
+    tokens, words = [], []
+    for match in _TOKEN_PATTERN.finditer(query):
+        open_paren, close_paren, quoted, word = match.groups()
+        if word is not None and word.upper() not in _OPERATORS:
+            # Consecutive plain words form a single multi-word term.
+            words.append(word)
+            continue
+        if words:
+            tokens.append(" ".join(words))
+            words = []
+        if open_paren:
+            tokens.append("(")
+        elif close_paren:
+            tokens.append(")")
+        elif quoted is not None:
+            tokens.append(quoted)
+        elif word is not None:
+            tokens.append(word.upper())
+    if words:
+        tokens.append(" ".join(words))
+    return tokens
+
+
+class SkillIndex:
+    """
+    Inverted index from canonical skills to the bitmap of candidate ids that have them.
+
+    Built from the candidate store and kept current incrementally with `add` or `sync`.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Bitmap] = {}
+        self.all = Bitmap()
+        # Highest candidate revision seen by `sync`, so only candidates added or
+        # re-parsed since are loaded.
+        self.last_synced_revision = 0
+
+    def add(self, candidate_id: int, skills: Iterable[str]) -> None:
+        """Indexes a candidate's skills, replacing any previously indexed ones."""
+        if candidate_id in self.all:
+            self.remove(candidate_id)
+        self.all.add(candidate_id)
+        for skill in skills:
+            skill = canonical_skill(skill)
+            self.postings.setdefault(skill, Bitmap()).add(candidate_id)
+
+    def add_entities(self, candidate_id: int, entities: dict) -> None:
+        """Indexes the skills from `extract_resume` output."""
+        skills = [
+            skill["name"]
+            for category_skills in entities.get("categorized_skills", {}).values()
+            for skill in category_skills
+        ]
+        self.add(candidate_id, skills or entities.get("skills", []))
+
+    def remove(self, candidate_id: int) -> None:
+        self.all.discard(candidate_id)
+        for bitmap in self.postings.values():
+            bitmap.discard(candidate_id)
+
+    def sync(self, store) -> int:
+        """
+        Loads skills of candidates added to the store, or re-parsed, since the last sync.
+
+        Args:
+            store: A `CandidateStore`.
+
+        Returns:
+            The number of candidates indexed.
+        """
+        rows = store.conn.execute(
+            "SELECT c.id, c.revision, s.skill FROM candidates c "
+            "LEFT JOIN candidate_skills s ON s.candidate_id = c.id "
+            "WHERE c.revision > ? ORDER BY c.revision",
+            (self.last_synced_revision,),
+        )
+        count = 0
+        current_id, current_skills = None, []
+        for candidate_id, revision, skill in rows:
+            if candidate_id != current_id:
+                if current_id is not None:
+                    self.add(current_id, current_skills)
+                    count += 1
+                current_id, current_skills = candidate_id, []
+                self.last_synced_revision = revision
+            if skill:
+                current_skills.append(skill)
+        if current_id is not None:
+            # `add` replaces the skills indexed for a re-parsed candidate.
+            self.add(current_id, current_skills)
+            count += 1
+        return count
+
+    def skill(self, name: str) -> Bitmap:
+        return self.postings.get(canonical_skill(name), Bitmap())
+
+    def category(self, name: str) -> Bitmap:
+        """Candidates with any skill in the category."""
+        result = Bitmap()
+        for skill in get_taxonomy().categories.get(name, []):
+            result = result | self.skill(skill)
+        return result
+
+    def query(self, query: str) -> Bitmap:
+        """
+        Evaluates a boolean skill query, e.g. "python AND (aws OR gcp) AND NOT java".
+
+        NOT binds tighter than AND, which binds tighter than OR.
+
+        Returns:
+            A Bitmap of matching candidate ids. Iterate it or call len() for the count.
+        """
+        tokens = _tokenize(query)
+        position = 0
+
+        def peek():
+            return tokens[position] if position < len(tokens) else None
+
+        def take():
+            nonlocal position
+            position += 1
+            return tokens[position - 1]
+
+        def parse_or():
+            result = parse_and()
+            while peek() == "OR":
+                take()
+                result = result | parse_and()
+            return result
+
+        def parse_and():
+            result = parse_not()
+            while peek() == "AND":
+                take()
+                result = result & parse_not()
+            return result
+
+        def parse_not():
+            if peek() == "NOT":
+                take()
+                return self.all - parse_not()
+            return parse_term()
+
+        def parse_term():
+            token = take() if peek() is not None else None
+            if token == "(":
+                result = parse_or()
+                if peek() != ")":
+                    raise ValueError(f"Unbalanced parentheses in query: {query}")
+                take()
+                return result
+            if token is None or token in _OPERATORS or token == ")":
+                raise ValueError(f"Invalid skill query: {query}")
+            if token.lower().startswith("category:"):
+                return self.category(token[len("category:"):].strip())
+            return self.skill(token)
+
+        if not tokens:
+            return Bitmap(dict(self.all.chunks))
+        result = parse_or()
+        if position != len(tokens):
+            raise ValueError(f"Invalid skill query: {query}")
+        return result
+
+    def category_counts(self, within: Optional[Bitmap] = None) -> Dict[str, int]:
+        """Counts candidates per skill category, optionally restricted to a query result."""
+        counts = {}
+        for category in get_taxonomy().categories:
+            bitmap = self.category(category)
+            counts[category] = len(bitmap & within if within is not None else bitmap)
+        return counts
+
+    def skill_counts(self, within: Optional[Bitmap] = None) -> Dict[str, int]:
+        """Counts candidates per indexed skill, optionally restricted to a query result."""
+        return {
+            skill: len(bitmap & within if within is not None else bitmap)
+            for skill, bitmap in self.postings.items()
+        }
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Writes the index atomically so readers never see a partial file."""
+        path = path or DEFAULT_INDEX_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        data = {
+            "version": _FORMAT_VERSION,
+            "last_synced_revision": self.last_synced_revision,
+            "all": self.all.to_bytes(),
+            "postings": {skill: bitmap.to_bytes() for skill, bitmap in self.postings.items()},
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "SkillIndex":
+        with open(path or DEFAULT_INDEX_PATH, "rb") as f:
+            data = pickle.load(f)
+        if data.get("version") != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported skill index version: {data.get('version')}")
+        index = cls()
+        index.last_synced_revision = data["last_synced_revision"]
+        index.all = Bitmap.from_bytes(data["all"])
+        index.postings = {skill: Bitmap.from_bytes(raw) for skill, raw in data["postings"].items()}
+        return index
+
+
+def load_or_build(store, path: Optional[str] = None) -> SkillIndex:
+    """Loads the saved index, brings it up to date with the store and saves it again."""
+    path = path or DEFAULT_INDEX_PATH
+    try:
+        index = SkillIndex.load(path)
+    except (OSError, ValueError, pickle.UnpicklingError):
+        index = SkillIndex()
+    if index.sync(store):
+        index.save(path)
+    return index
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from backend.candidate_store import CandidateStore
+
+    arg_parser = argparse.ArgumentParser(description="Query the skill index of stored candidates.")
+    arg_parser.add_argument("query", nargs="?", default="", help='e.g. "python AND (aws OR gcp) AND NOT java"')
+    arg_parser.add_argument("--limit", type=int, default=20, help="Number of candidate ids to print.")
+    args = arg_parser.parse_args()
+
+    skill_index = load_or_build(CandidateStore())
+    matches = skill_index.query(args.query)
+    print(f"{len(matches)} matching candidate(s)")
+    for count, candidate_id in enumerate(matches):
+        if count >= args.limit:
+            break
+        print(candidate_id)
+    for category, count in skill_index.category_counts(matches).items():
+        print(f"{category}: {count}")
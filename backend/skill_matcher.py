@@ -0,0 +1,282 @@
+import bisect
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Text is split into word tokens and single punctuation characters, so "node.js"
+# becomes ["node", ".", "js"] and "c++" becomes ["c", "+", "+"]. Patterns are split
+# the same way, which makes every match start and end on a token boundary
+# ("go" never matches inside "google").
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+|[^\sa-z0-9]")
+
+# Sentences end at ., ! or ? followed by whitespace, or at a line break. A period
+# inside a token ("node.js", "3.5") does not end a sentence.
+_SENTENCE_END_PATTERN = re.compile(r"[.!?](?=\s)|\n")
+
+_WORD_NUMBERS = {
+    'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+    'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
+}
+_EXPERIENCE_PATTERN = re.compile(
+    r"\b(\d+(?:\.\d+)?|" + "|".join(_WORD_NUMBERS) + r")\s*\+?\s*(years?|yrs?|months?|mos?)\b"
+)
+
+# A skill joined to another word by a hyphen is part of a compound ("go-to",
+# "go-live", "t-sql") and does not count, unless the word only describes it
+# ("python-based", "aws-hosted").
+_COMPOUND_SUFFIXES = {
+    "based", "powered", "driven", "backed", "native", "first", "hosted", "heavy",
+    "related", "specific", "compatible", "enabled", "certified", "focused",
+}
+
+# Marks the end of a pattern in the trie and holds its canonical skill name.
+_END = ""
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def format_experience(months: float) -> str:
+    """Format experience in months to a human-readable string."""
+    if not months:
+        return "No experience specified"
+
+    years = months // 12
+    remaining_months = months % 12
+
+    parts = []
+    if years >= 1:
+        parts.append(f"{int(years)} {'year' if years == 1 else 'years'}")
+    if remaining_months >= 1:
+        parts.append(f"{int(remaining_months)} {'month' if remaining_months == 1 else 'months'}")
+
+    return "Experience: " + " and ".join(parts) if parts else "Experience: Less than a month"
+
+
+def _in_compound(spans: List[Tuple[str, int, int]], first: int, last: int) -> bool:
+    """Whether the tokens spans[first:last + 1] are hyphenated to a word on either side."""
+    def joined(left: int, right: int) -> bool:
+        return spans[left][2] == spans[right][1]
+
+    if (first >= 2 and spans[first - 1][0] == "-" and joined(first - 1, first)
+            and joined(first - 2, first - 1) and spans[first - 2][0].isalnum()):
+        return True
+    if last + 2 < len(spans) and spans[last + 1][0] == "-" and joined(last, last + 1):
+        word = spans[last + 2][0]
+        return joined(last + 1, last + 2) and word.isalnum() and word not in _COMPOUND_SUFFIXES
+    return False
+
+
+def _sentence_experience(sentence: str) -> float:
+    """Returns the largest experience, in months, mentioned in a sentence."""
+    months = 0
+    for number, unit in _EXPERIENCE_PATTERN.findall(sentence):
+        value = _WORD_NUMBERS.get(number)
+        if value is None:
+            value = float(number) if '.' in number else int(number)
+        if value > 0:
+            months = max(months, value * (12 if unit.startswith("y") else 1))
+    return months
+
+
+class SkillMatcher:
+    """
+    Multi-pattern skill matcher that works without spaCy.
+
+    Skills and their synonyms are compiled into a token trie. Matching walks the
+    trie from each token and keeps the longest match, so the whole text is
+    scanned once and each match maps to its canonical skill name.
+    """
+
+    def __init__(self, categories: Dict[str, List[str]], synonyms: Optional[Dict[str, str]] = None):
+        self.skill_to_category = {
+            skill.lower(): category for category, skills in categories.items() for skill in skills
+        }
+        self.trie: dict = {}
+        self.max_pattern_length = 0
+        for skill in self.skill_to_category:
+            self._add_pattern(skill, skill)
+        for alias, canonical in (synonyms or {}).items():
+            if canonical.lower() in self.skill_to_category:
+                self._add_pattern(alias, canonical.lower())
+
+    @classmethod
+    def from_compiled(cls, state: dict) -> "SkillMatcher":
+        """Rebuilds a matcher from `compiled_state()` without re-tokenizing the patterns."""
+        matcher = cls.__new__(cls)
+        matcher.skill_to_category = state["skill_to_category"]
+        matcher.trie = state["trie"]
+        matcher.max_pattern_length = state["max_pattern_length"]
+        return matcher
+
+    def compiled_state(self) -> dict:
+        return {
+            "skill_to_category": self.skill_to_category,
+            "trie": self.trie,
+            "max_pattern_length": self.max_pattern_length,
+        }
+
+    def _add_pattern(self, pattern: str, canonical: str) -> None:
+        tokens = tokenize(pattern)
+        if not tokens:
+            return
+        node = self.trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node[_END] = canonical
+        self.max_pattern_length = max(self.max_pattern_length, len(tokens))
+
+    def find(self, text: str) -> List[Tuple[str, int, int]]:
+        """
+        Finds non-overlapping skill mentions, preferring the longest match. Matches
+        start and end on token boundaries and are not part of a hyphenated word.
+
+        Returns:
+            A list of (canonical_skill, start, end) character offsets into `text`.
+        """
+        lowered = text.lower()
+        spans = [(m.group(), m.start(), m.end()) for m in _TOKEN_PATTERN.finditer(lowered)]
+        trie = self.trie
+        matches = []
+        i, count = 0, len(spans)
+        while i < count:
+            node = trie.get(spans[i][0])
+            if node is None:
+                i += 1
+                continue
+            best, best_end = node.get(_END), i
+            j = i + 1
+            while j < count:
+                node = node.get(spans[j][0])
+                if node is None:
+                    break
+                if _END in node:
+                    best, best_end = node[_END], j
+                j += 1
+            if best is None or _in_compound(spans, i, best_end):
+                i += 1
+                continue
+            matches.append((best, spans[i][1], spans[best_end][2]))
+            i = best_end + 1
+        return matches
+
+    def extract(self, text: str) -> dict:
+        """
+        Extracts categorized skills with the experience mentioned next to them.
+
+        Returns:
+            A dict with "skills" (canonical names) and "categorized_skills", in the
+            same shape as `extract_entities`:
+            {category: [{"name", "experience", "experience_text"}]}.
+        """
+        matches = self.find(text)
+        if not matches:
+            return {"skills": [], "categorized_skills": {}}
+
+        lowered = text.lower()
+        sentence_ends = [m.end() for m in _SENTENCE_END_PATTERN.finditer(lowered)]
+        sentence_months: Dict[int, float] = {}
+
+        matched_skills: Dict[str, Dict[str, float]] = {}
+        for skill, start, _ in matches:
+            index = bisect.bisect_right(sentence_ends, start)
+            if index not in sentence_months:
+                begin = sentence_ends[index - 1] if index > 0 else 0
+                end = sentence_ends[index] if index < len(sentence_ends) else len(lowered)
+                sentence_months[index] = _sentence_experience(lowered[begin:end])
+            category = self.skill_to_category[skill]
+            skills = matched_skills.setdefault(category, {})
+            skills[skill] = max(skills.get(skill, 0), sentence_months[index])
+
+        categorized_skills = {
+            category: [
+                {
+                    "name": skill,
+                    "experience": exp_months,
+                    "experience_text": format_experience(exp_months)
+                }
+                for skill, exp_months in skills.items()
+            ]
+            for category, skills in matched_skills.items()
+        }
+        return {
+            "skills": [skill for skills in matched_skills.values() for skill in skills],
+            "categorized_skills": categorized_skills,
+        }
+
+
+def get_matcher() -> SkillMatcher:
+    """Returns the matcher of the current skill taxonomy, which is reloaded when it changes."""
+    # Imported here because the taxonomy module builds matchers from this one.
+    from backend.taxonomy import get_taxonomy
+    return get_taxonomy().matcher
+
+
+def extract_skills(text: str) -> dict:
+    """Extracts categorized skills from text using the shared matcher."""
+    return get_matcher().extract(text)
+
+
+def compare_with_phrase_matcher(text: str, repeat: int = 100) -> dict:
+    """
+    Times `extract_skills` against the spaCy baseline it replaced: a PhraseMatcher on
+    lowercase tokens over the same skills and synonyms, run on a blank English
+    tokenizer (no tagger or parser, so the cheapest spaCy setup). Needs spaCy.
+
+    Returns:
+        Seconds per document for "trie" and "phrase_matcher", and their "speedup".
+    """
+    import time
+
+    import spacy
+    from spacy.matcher import PhraseMatcher
+
+    from backend.taxonomy import get_taxonomy
+
+    taxonomy = get_taxonomy()
+    nlp = spacy.blank("en")
+    phrase_matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+    for skill in taxonomy.matcher.skill_to_category:
+        phrase_matcher.add(skill, [nlp.make_doc(skill)])
+    for alias, canonical in taxonomy.synonyms.items():
+        if canonical in taxonomy.matcher.skill_to_category:
+            phrase_matcher.add(canonical, [nlp.make_doc(alias)])
+
+    def per_document(func) -> float:
+        func()  # warm-up
+        started = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - started) / repeat
+
+    trie_seconds = per_document(lambda: extract_skills(text))
+    baseline_seconds = per_document(lambda: phrase_matcher(nlp(text)))
+    return {"trie": trie_seconds, "phrase_matcher": baseline_seconds, "speedup": baseline_seconds / trie_seconds}
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import time
+
+    arg_parser = argparse.ArgumentParser(description="Extract skills from a text file without spaCy.")
+    arg_parser.add_argument("path", help="Path to a plain-text resume.")
+    arg_parser.add_argument("--repeat", type=int, default=1, help="Repeat extraction to measure throughput.")
+    arg_parser.add_argument("--compare-spacy", action="store_true",
+                            help="Also time the spaCy PhraseMatcher baseline on the same text (needs spaCy).")
+    args = arg_parser.parse_args()
+
+    with open(args.path, encoding="utf-8") as f:
+        resume_text = f.read()
+    if args.compare_spacy:
+        timings = compare_with_phrase_matcher(resume_text, max(args.repeat, 10))
+        print(f"trie:           {timings['trie'] * 1000:.3f} ms per document")
+        print(f"phrase matcher: {timings['phrase_matcher'] * 1000:.3f} ms per document")
+        print(f"speedup:        {timings['speedup']:.1f}x")
+        raise SystemExit
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        result = extract_skills(resume_text)
+    elapsed = time.perf_counter() - started
+    print(json.dumps(result["categorized_skills"], indent=2))
+    print(f"{args.repeat * len(resume_text) / elapsed / 1e6:.2f} MB/s ({elapsed / args.repeat * 1000:.2f} ms per document)")
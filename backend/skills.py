@@ -0,0 +1,25 @@
+from typing import Dict
+
+from backend.taxonomy import get_taxonomy, load_config
+
+# Skill categories and synonyms are defined in skills_config.json. These module-level
+# views reflect the config at import time; use get_taxonomy() to follow hot reloads.
+_config = load_config()
+
+# Skill categories with related keywords
+SKILL_CATEGORIES: Dict[str, list] = _config["categories"]
+
+# Alternative spellings mapped to the canonical skill name used in SKILL_CATEGORIES
+SKILL_SYNONYMS: Dict[str, str] = _config["synonyms"]
+
+# Flatten the categories for matching
+SKILL_KEYWORDS = [skill for skills in SKILL_CATEGORIES.values() for skill in skills]
+
+SKILL_TO_CATEGORY: Dict[str, str] = {
+    skill: category for category, skills in SKILL_CATEGORIES.items() for skill in skills
+}
+
+
+def canonical_skill(name: str) -> str:
+    """Maps a skill name or one of its synonyms to its canonical, lowercase form."""
+    return get_taxonomy().canonical(name)
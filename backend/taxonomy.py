@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import pickle
+import struct
+import threading
+import time
+from typing import Dict, List, Optional
+
+from backend.config import DATA_DIR
+from backend.skill_matcher import SkillMatcher, tokenize
+
+# The source of truth is the JSON config next to this file. `python -m backend.taxonomy`
+# compiles it into a binary artifact that workers load in milliseconds.
+CONFIG_PATH = os.environ.get(
+    "PROSCAN_SKILLS_CONFIG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "skills_config.json")
+)
+ARTIFACT_PATH = os.environ.get("PROSCAN_TAXONOMY", os.path.join(DATA_DIR, "taxonomy.bin"))
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+
+# Artifact layout: 8-byte magic, uint32 format version, then a pickled payload.
+_MAGIC = b"PSTAXON\x00"
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sI")
+
+# How often get_taxonomy() checks the artifact for changes.
+RELOAD_INTERVAL = 2.0
+
+
+def load_config(path: Optional[str] = None) -> dict:
+    """Reads the skill taxonomy JSON: {"version", "categories", "synonyms"}."""
+    with open(path or CONFIG_PATH, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    config.setdefault("synonyms", {})
+    return config
+
+
+class Taxonomy:
+    """A loaded skill taxonomy with its compiled matcher and optional skill embeddings."""
+
+    def __init__(self, payload: dict):
+        self.version = payload["version"]
+        self.source_hash = payload["source_hash"]
+        self.categories: Dict[str, List[str]] = payload["categories"]
+        self.synonyms: Dict[str, str] = payload["synonyms"]
+        self.patterns: Dict[str, str] = payload["patterns"]
+        self.matcher = SkillMatcher.from_compiled(payload["matcher"])
+        self.skill_to_category: Dict[str, str] = self.matcher.skill_to_category
+        self.embedding_skills: List[str] = payload.get("embedding_skills", [])
+        self.embedding_index: Dict[str, int] = {skill: i for i, skill in enumerate(self.embedding_skills)}
+        self._embedding_data = payload.get("embeddings")
+        self._embedding_shape = payload.get("embedding_shape")
+        self._embeddings = None
+
+    @property
+    def embeddings(self):
+        """A float32 numpy array with one row per skill in `embedding_skills`, or None."""
+        if self._embeddings is None and self._embedding_data is not None:
+            import numpy as np
+            self._embeddings = np.frombuffer(self._embedding_data, dtype=np.float32).reshape(self._embedding_shape)
+        return self._embeddings
+
+    def canonical(self, name: str) -> str:
+        name = " ".join(name.lower().split())
+        return self.synonyms.get(name, name)
+
+
+def _build_payload(config: dict, source_hash: str, with_embeddings: bool) -> dict:
+    categories = {category: [skill.lower() for skill in skills] for category, skills in config["categories"].items()}
+    synonyms = {" ".join(alias.lower().split()): canonical.lower() for alias, canonical in config["synonyms"].items()}
+    matcher = SkillMatcher(categories, synonyms)
+
+    # Normalized pattern -> canonical skill, for every skill and synonym.
+    patterns = {" ".join(tokenize(skill)): skill for skills in categories.values() for skill in skills}
+    patterns.update({" ".join(tokenize(alias)): canonical for alias, canonical in synonyms.items()})
+
+    payload = {
+        "version": config.get("version", 1),
+        "source_hash": source_hash,
+        "categories": categories,
+        "synonyms": synonyms,
+        "patterns": patterns,
+        "matcher": matcher.compiled_state(),
+    }
+    if with_embeddings:
+        from sentence_transformers import SentenceTransformer
+
+        skills = list(matcher.skill_to_category)
+        model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+        vectors = model.encode(skills, convert_to_numpy=True).astype("float32")
+        payload["embedding_skills"] = skills
+        payload["embeddings"] = vectors.tobytes()
+        payload["embedding_shape"] = vectors.shape
+    return payload
+
+
+def compile_taxonomy(config_path: Optional[str] = None, artifact_path: Optional[str] = None,
+                     with_embeddings: bool = True) -> str:
+    """
+    Compiles the taxonomy JSON into a versioned binary artifact.
+
+    The artifact is written to a temporary file and renamed into place, so readers
+    never see a partially written file.
+
+    Args:
+        config_path: The taxonomy JSON. Defaults to CONFIG_PATH.
+        artifact_path: Where to write the artifact. Defaults to ARTIFACT_PATH.
+        with_embeddings: Precompute MiniLM embeddings for every canonical skill.
+
+    Returns:
+        The artifact path.
+    """
+    config_path = config_path or CONFIG_PATH
+    artifact_path = artifact_path or ARTIFACT_PATH
+    with open(config_path, "rb") as f:
+        source_hash = hashlib.sha256(f.read()).hexdigest()
+    payload = _build_payload(load_config(config_path), source_hash, with_embeddings)
+
+    os.makedirs(os.path.dirname(os.path.abspath(artifact_path)), exist_ok=True)
+    tmp_path = f"{artifact_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION))
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, artifact_path)
+    return artifact_path
+
+
+def load_taxonomy(artifact_path: Optional[str] = None) -> Taxonomy:
+    """Loads a compiled artifact. Raises ValueError if it is not a supported artifact."""
+    with open(artifact_path or ARTIFACT_PATH, "rb") as f:
+        magic, version = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported taxonomy artifact (format version {version}).")
+        return Taxonomy(pickle.load(f))
+
+
+def _taxonomy_from_config() -> Taxonomy:
+    with open(CONFIG_PATH, "rb") as f:
+        source_hash = hashlib.sha256(f.read()).hexdigest()
+    return Taxonomy(_build_payload(load_config(), source_hash, with_embeddings=False))
+
+
+_lock = threading.Lock()
+_current: Optional[Taxonomy] = None
+_current_mtime: Optional[int] = None
+_last_check = 0.0
+
+
+def get_taxonomy() -> Taxonomy:
+    """
+    Returns the current taxonomy, reloading the artifact when it changes on disk.
+
+    When no artifact has been compiled, the taxonomy is built from the JSON config
+    (without embeddings). The swap is a single reference assignment, so callers
+    always see either the old or the new taxonomy, never a mix.
+    """
+    global _current, _current_mtime, _last_check
+    now = time.monotonic()
+    if _current is not None and now - _last_check < RELOAD_INTERVAL:
+        return _current
+
+    with _lock:
+        if _current is not None and now - _last_check < RELOAD_INTERVAL:
+            return _current
+        _last_check = now
+        try:
+            mtime = os.stat(ARTIFACT_PATH).st_mtime_ns
+        except OSError:
+            mtime = None
+
+        if mtime is not None and mtime != _current_mtime:
+            try:
+                _current = load_taxonomy(ARTIFACT_PATH)
+                _current_mtime = mtime
+            except (OSError, ValueError, pickle.UnpicklingError, EOFError) as e:
+                print(f"Could not load taxonomy artifact {ARTIFACT_PATH}: {e}")
+        if _current is None:
+            _current = _taxonomy_from_config()
+        return _current
+
+
+if __name__ == "__main__":
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Compile the skill taxonomy into a binary artifact.")
+    arg_parser.add_argument("--config", default=None, help="Path to the taxonomy JSON.")
+    arg_parser.add_argument("--output", default=None, help="Path of the compiled artifact.")
+    arg_parser.add_argument("--no-embeddings", action="store_true", help="Skip precomputing skill embeddings.")
+    args = arg_parser.parse_args()
+
+    started = time.perf_counter()
+    path = compile_taxonomy(args.config, args.output, with_embeddings=not args.no_embeddings)
+    print(f"Compiled taxonomy to {path} in {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from backend.analysis_schema import parse_json, repair_json, validate_analysis
+
+
+def test_truncated_object_keeps_complete_elements():
+    repaired = repair_json('{"match_score": 80, "interview_questions": ["Why Go?", "Describe a proj')
+    assert json.loads(repaired) == {"match_score": 80, "interview_questions": ["Why Go?"]}
+
+
+def test_trailing_commas_are_dropped():
+    assert parse_json('{"a": [1, 2,], "b": {"c": 3,},}') == {"a": [1, 2], "b": {"c": 3}}
+
+
+def test_missing_commas_are_inserted():
+    assert parse_json('{"a": 1 "b": "x"\n"c": [true "d"] "e": {}}') == {"a": 1, "b": "x", "c": [True, "d"], "e": {}}
+
+
+def test_inner_quotes_are_kept():
+    assert parse_json('{"overall_vibe": "Strong "fit", overall", "match_score": 70}') == {
+        "overall_vibe": 'Strong "fit", overall', "match_score": 70,
+    }
+    assert parse_json('{"summary": "Calls it "the best" team"}') == {"summary": 'Calls it "the best" team'}
+
+
+def test_text_around_the_object_is_ignored():
+    assert parse_json('Here it is:\n```json\n{"a": 1}\n```\nHope it helps.') == {"a": 1}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("no json here", None),
+    ("", None),
+    ('{"a": }', {}),
+    ('{"a": 1, "b": nope}', {"a": 1}),
+])
+def test_unrepairable_input_keeps_only_the_valid_part(text, expected):
+    assert parse_json(text) == expected
+
+
+def test_defects_surface_as_missing_fields():
+    analysis, missing = validate_analysis(parse_json('{"match_score": "85%", "executive_summary": "Go'))
+    assert analysis == {"match_score": 85}
+    assert "executive_summary" in missing and "match_score" not in missing
+
+
+class _ScriptedRouter:
+    """Answers each generate call with the next canned response."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.prompts = []
+
+    def generate(self, prompt, depth=None, budget=None):
+        self.prompts.append(prompt)
+        return {"text": self.responses.pop(0)}
+
+
+def test_missing_fields_are_requested_again(monkeypatch):
+    pytest.importorskip("google.generativeai")
+    pytest.importorskip("streamlit")
+    import backend.resume_analyzer as resume_analyzer
+
+    router = _ScriptedRouter(
+        '{"match_score": 75, "executive_summary": "Solid", "skills_ana',
+        '{"skills_analysis": {"technical_skills": {"matching": ["Go"], "missing": []}}}',
+    )
+    monkeypatch.setattr(resume_analyzer, "model", router)
+    analysis = resume_analyzer.get_semantic_analysis("Go developer", "Go engineer", latency_budget=30)
+    assert "error" not in analysis
+    assert analysis["match_score"] == 75
+    assert analysis["skills_analysis"]["technical_skills"]["matching"] == ["Go"]
+    assert len(router.prompts) == 2 and '"skills_analysis"' in router.prompts[1]
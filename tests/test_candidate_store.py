@@ -0,0 +1,46 @@
+import pytest
+
+from backend.candidate_store import CandidateStore, content_hash
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CandidateStore(str(tmp_path / "candidates.db"))
+    yield store
+    store.close()
+
+
+def _add_analyzed(store, jd_id, resume_text, score):
+    candidate_id = store.add_candidate(resume_text, {"name": resume_text, "contact": {"email": f"{score}@example.com"}})
+    store.save_analysis(candidate_id, jd_id, {"match_score": score})
+    return candidate_id
+
+
+def test_ranked_analyses_can_be_restricted_to_given_resumes(store):
+    jd_id = store.add_job_description("Python developer")
+    for text, score in [("Ann", 90), ("Ben", 70), ("Cid", 80)]:
+        _add_analyzed(store, jd_id, text, score)
+
+    assert [entry["name"] for entry in store.ranked_analyses(jd_id)] == ["Ann", "Cid", "Ben"]
+    assert store.count_analyses(jd_id) == 3
+    own = [content_hash("Ben"), content_hash("Cid")]
+    assert [entry["name"] for entry in store.ranked_analyses(jd_id, content_hashes=own)] == ["Cid", "Ben"]
+    assert store.count_analyses(jd_id, own) == 2
+    assert store.ranked_analyses(jd_id, content_hashes=[]) == [] and store.count_analyses(jd_id, []) == 0
+
+
+def test_query_filters_on_skills_experience_and_score(store):
+    jd_id = store.add_job_description("Platform engineer")
+    for name, score, python_months in [("Ann", 90, 48), ("Ben", 60, 48), ("Cid", 95, 12)]:
+        candidate_id = store.add_candidate(name, {"name": name, "categorized_skills": {
+            "Languages": [{"name": "Python", "experience": python_months}],
+            "Cloud": [{"name": "Kubernetes", "experience": 0}],
+        }})
+        store.save_analysis(candidate_id, jd_id, {"match_score": score})
+
+    rows = store.query(skills=["kubernetes"], min_experience={"python": 36}, jd_id=jd_id)
+    assert [(row["name"], row["match_score"]) for row in rows] == [("Ann", 90), ("Ben", 60)]
+    assert [row["name"] for row in store.query(min_experience={"python": 36}, jd_id=jd_id, min_score=70)] == ["Ann"]
+    assert {row["name"] for row in store.query(skills=["Kubernetes"])} == {"Ann", "Ben", "Cid"}
+    with pytest.raises(ValueError):
+        store.query(skills=["kubernetes"], min_score=70)
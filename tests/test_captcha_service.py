@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+from backend import captcha_service
+from backend.captcha_service import CaptchaService
+
+ANSWER = "AB12CD"
+
+
+@pytest.fixture
+def service(monkeypatch):
+    pytest.importorskip("captcha.image")
+    monkeypatch.setattr(CaptchaService, "_render", lambda self: (ANSWER, b"png"))
+    return CaptchaService(secret="test-secret", pool_size=2, refill_per_second=100, ttl=60)
+
+
+def test_issued_challenge_verifies_once(service):
+    challenge = service.issue()
+    assert challenge["image"] == b"png" and ANSWER not in challenge["token"]
+    assert not service.verify(challenge["token"], "WRONG1")
+    assert service.verify(challenge["token"], " ab12cd ")
+    assert not service.verify(challenge["token"], ANSWER)
+
+
+def test_check_without_consuming(service):
+    token = service.issue()["token"]
+    assert service.verify(token, ANSWER, consume=False)
+    assert service.verify(token, ANSWER, consume=False)
+    service.consume(token)
+    assert not service.verify(token, ANSWER)
+
+
+def test_expired_and_tampered_tokens_are_rejected(service):
+    expired = int(time.time()) - 1
+    assert not service.verify(f"{expired}.n0nce.{service._sign(expired, 'n0nce', ANSWER)}", ANSWER)
+
+    expires, nonce, signature = service.issue()["token"].split(".")
+    assert not service.verify(f"{int(expires) + 3600}.{nonce}.{signature}", ANSWER)
+    for token in (None, "", "garbage", "1.2", f"{expires}.{nonce}"):
+        assert not service.verify(token, ANSWER)
+
+
+def test_tokens_verify_across_processes_sharing_the_secret(service):
+    token = service.issue()["token"]
+    other = CaptchaService(secret="test-secret", pool_size=1)
+    stranger = CaptchaService(secret="other-secret", pool_size=1)
+    assert not stranger.verify(token, ANSWER)
+    assert other.verify(token, ANSWER)
+    # Replay protection is per process.
+    assert service.verify(token, ANSWER)
+
+
+def test_used_nonces_are_bounded(service, monkeypatch):
+    monkeypatch.setattr(captcha_service, "USED_NONCES", 3)
+    tokens = [service.issue()["token"] for _ in range(4)]
+    for token in tokens:
+        service.consume(token)
+    assert len(service._used_nonces) == 3
+    assert service.verify(tokens[0], ANSWER) and not service.verify(tokens[-1], ANSWER)
@@ -0,0 +1,100 @@
+import json
+import re
+
+import pytest
+
+from backend.chunked_analysis import analyze_in_chunks, merge_chunk_analyses, split_resume
+from backend.model_router import BudgetExceeded
+
+RESUME = (
+    "Jane Doe\njane@example.com\n\nEXPERIENCE\n"
+    + "\n\n".join(f"Built service {i} in Python for team {i}." for i in range(30))
+    + "\n\nEDUCATION\nBSc Computer Science, 2015\n\nSKILLS\nPython, Go, AWS"
+)
+
+
+def _chunk(**fields):
+    chunk = {
+        "candidate_name": None, "email": None, "phone": None, "linkedin_url": None, "github_url": None,
+        "match_score": 50, "requirements": [],
+        "skills_analysis": {group: {"matching": [], "missing": []}
+                            for group in ("technical_skills", "soft_skills", "keywords")},
+        "experience_analysis": "", "project_analysis": [], "interview_questions": [],
+        "overall_vibe": "", "recommended_courses": [],
+    }
+    chunk.update(fields)
+    return chunk
+
+
+def test_long_sections_are_split_with_their_heading():
+    parts = split_resume(RESUME, 300)
+    assert len(parts) > 2 and all(len(part) <= 300 for part in parts)
+    experience = [part for part in parts if "Built service" in part]
+    assert all(part.startswith("EXPERIENCE\n") for part in experience)
+    assert all(f"Built service {i} in" in "".join(parts) for i in range(30))
+    assert parts[-1].endswith("SKILLS\nPython, Go, AWS")
+    assert split_resume(RESUME) == [RESUME]
+
+
+def test_merge_keeps_the_best_evidence_and_unites_skills():
+    first = _chunk(
+        candidate_name="Jane Doe", match_score=40,
+        requirements=[{"id": 1, "score": 30, "evidence": "Some Python"}, {"id": 2, "score": 90, "evidence": "AWS lead"}],
+        skills_analysis={"technical_skills": {"matching": ["Python"], "missing": ["Go", "Docker"]}},
+        interview_questions=["Q1", "Q2"], overall_vibe="Confident",
+        recommended_courses=[{"skill": "go", "course": "Go basics"}, {"skill": "docker", "course": "Docker"}],
+    )
+    second = _chunk(
+        email="jane@example.com", candidate_name="J. Doe", match_score=70,
+        requirements=[{"id": 1, "score": 80, "evidence": "Python services"}, {"id": 9, "score": 100, "evidence": "?"}],
+        skills_analysis={"technical_skills": {"matching": ["go", "python"], "missing": ["Kubernetes"]}},
+        interview_questions=["q1", "Q3"], overall_vibe="Confident",
+    )
+    analysis = merge_chunk_analyses([first, second], ["Python", "AWS", "Docker (a plus)"], [1.0, 1.0, 0.5])
+
+    assert analysis["candidate_name"] == "Jane Doe" and analysis["email"] == "jane@example.com"
+    assert analysis["skills_analysis"]["technical_skills"] == {
+        "matching": ["Python", "go"], "missing": ["Docker", "Kubernetes"],
+    }
+    assert [(entry["score"], entry["evidence"], entry["part"]) for entry in analysis["requirement_evidence"]] == [
+        (80, "Python services", 2), (90, "AWS lead", 1), (0, None, None),
+    ]
+    assert analysis["match_score"] == round((80 + 90) / 2.5)
+    assert "2 of 3 requirements" in analysis["executive_summary"]
+    assert analysis["interview_questions"] == ["Q1", "Q2", "Q3"]
+    assert analysis["recommended_courses"] == [{"skill": "docker", "course": "Docker"}]
+    assert analysis["overall_vibe"] == "Confident"
+
+
+def test_merge_without_requirements_takes_the_strongest_part():
+    assert merge_chunk_analyses([_chunk(match_score=40), _chunk(match_score=75)], [], [])["match_score"] == 75
+
+
+class _PartRouter:
+    """Answers each part's prompt with a canned analysis, failing the parts listed in `fail`."""
+
+    def __init__(self, fail=(), error=RuntimeError):
+        self.fail = set(fail)
+        self.error = error
+
+    def generate(self, prompt, depth=None, budget=None):
+        part = int(re.search(r"part (\d+) of \d+\):", prompt).group(1))
+        if part in self.fail:
+            raise self.error(f"part {part} failed")
+        return {"text": json.dumps(_chunk(
+            match_score=10 * part, requirements=[{"id": 1, "score": 10 * part, "evidence": f"part {part}"}],
+        ))}
+
+
+def test_failed_parts_are_left_out_and_counted():
+    jd = "5+ years of Python building backend services."
+    analysis = analyze_in_chunks(_PartRouter(fail={2}), RESUME, jd, "standard", 30, max_chars=300)
+    total = len(split_resume(RESUME, 300))
+    assert analysis["chunks"] == {"analyzed": total - 1, "total": total}
+    assert analysis["requirement_evidence"][0]["evidence"] == f"part {total}"
+
+    with pytest.raises(BudgetExceeded):
+        analyze_in_chunks(_PartRouter(fail=range(1, total + 1), error=BudgetExceeded), RESUME, jd, "standard", 30,
+                          max_chars=300)
+    with pytest.raises(ValueError):
+        analyze_in_chunks(_PartRouter(fail=range(1, total + 1)), RESUME, jd, "standard", 30, max_chars=300)
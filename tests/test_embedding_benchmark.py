@@ -0,0 +1,28 @@
+import multiprocessing
+import os
+import time
+
+from backend.embedding_benchmark import _collect, _runs
+
+
+def test_runs_sweep_only_the_onnx_backend():
+    assert _runs(("torch", "onnx"), [], []) == [("torch", "torch", {}), ("onnx", "onnx", {})]
+    runs = _runs(("torch", "onnx"), [32, 64], [2])
+    assert [label for label, _, _ in runs] == ["torch", "onnx b=32 t=2", "onnx b=64 t=2"]
+    assert runs[1][2] == {"PROSCAN_ONNX_BATCH_SIZE": "32", "PROSCAN_ONNX_THREADS": "2"}
+
+
+def test_collect_reports_crashed_and_hung_backends():
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    crashed = ctx.Process(target=os._exit, args=(3,))
+    crashed.start()
+    assert _collect(crashed, queue, timeout=30) == {"error": "exited with code 3 without a result"}
+    crashed.join()
+
+    hung = ctx.Process(target=time.sleep, args=(60,))
+    hung.start()
+    started = time.monotonic()
+    assert _collect(hung, queue, timeout=0.5)["error"].startswith("timed out")
+    hung.join()
+    assert time.monotonic() - started < 10
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from backend.embedding_store import FLOAT16, INT8, EmbeddingStore
+
+
+@pytest.mark.parametrize("dtype", [FLOAT16, INT8])
+def test_search_ranks_by_cosine_similarity(tmp_path, dtype):
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(50, 16)).astype(np.float32)
+    store = EmbeddingStore(str(tmp_path / "embeddings"), dim=16, dtype=dtype)
+    store.append([f"c{i}" for i in range(50)], vectors)
+
+    results = store.search(vectors[7], k=3)
+    assert results[0][0] == "c7" and results[0][1] == pytest.approx(1.0, abs=0.01)
+    assert [score for _, score in results] == sorted((score for _, score in results), reverse=True)
+    assert store.search(vectors[7], k=5, ids=["c1", "c2", "missing"])[0][0] in {"c1", "c2"}
+    expected = vectors[3] / np.linalg.norm(vectors[3])
+    assert np.allclose(store.get("c3"), expected, atol=0.02)
+    store.close()
+
+
+def test_readers_see_appends_and_replaced_ids(tmp_path):
+    path = str(tmp_path / "embeddings")
+    writer = EmbeddingStore(path, dim=4)
+    reader = EmbeddingStore(path)
+    writer.append(["a", "b"], [[1, 0, 0, 0], [0, 1, 0, 0]])
+    assert reader.search([1, 0, 0, 0], k=1)[0][0] == "a"
+
+    writer.append(["a"], [[0, 0, 1, 0]])
+    assert len(writer) == 2
+    assert [key for key, _ in reader.search([0, 0, 1, 0], k=2)] == ["a", "b"]
+    assert reader.search([1, 0, 0, 0], k=1)[0][1] == pytest.approx(0.0, abs=1e-3)
+
+
+def test_invalid_input_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        EmbeddingStore(str(tmp_path / "missing"))
+    store = EmbeddingStore(str(tmp_path / "embeddings"), dim=4)
+    with pytest.raises(ValueError):
+        store.append(["a", "b"], [[1, 0, 0, 0]])
+    with pytest.raises(ValueError):
+        store.append(["x" * 65], [[1, 0, 0, 0]])
+    assert len(store) == 0 and store.search([1, 0, 0, 0]) == []
@@ -0,0 +1,103 @@
+import csv
+import json
+
+import pytest
+
+from backend import export, job_queue
+from backend.candidate_store import CandidateStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CandidateStore(str(tmp_path / "candidates.db"))
+    jd_id = store.add_job_description("Backend engineer with Python.", "Backend")
+    for i in range(7):
+        candidate_id = store.add_candidate(f"Candidate {i}\ncandidate{i}@example.com\nPython")
+        store.save_analysis(candidate_id, jd_id, {
+            "candidate_name": f"Candidate {i}", "match_score": 10 * i,
+            "skills_analysis": {"technical_skills": {"matching": ["Python", "SQL"], "missing": ["Go"]}},
+        })
+    yield store
+    store.close()
+
+
+def _lines(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def test_csv_rows_flatten_skills_and_fill_contacts_from_the_store(store, tmp_path):
+    store.conn.execute("UPDATE candidates SET email = 'stored@example.com' WHERE id = 1")
+    path = str(tmp_path / "out.csv")
+    summary = export.export(path, store=store, chunk_size=3, min_score=30)
+    assert summary["exported"] == summary["total"] == 4
+
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["candidate_name"] for row in rows] == [f"Candidate {i}" for i in range(3, 7)]
+    assert rows[0]["matching_technical_skills"] == "Python; SQL" and rows[0]["missing_technical_skills"] == "Go"
+    assert rows[0]["jd_title"] == "Backend" and rows[0]["degraded"] == "False"
+
+    export.export(path, store=store)
+    with open(path, newline="", encoding="utf-8") as f:
+        assert next(csv.DictReader(f))["email"] == "stored@example.com"
+
+
+def test_interrupted_export_resumes_and_cuts_the_partial_chunk(store, tmp_path):
+    expected = str(tmp_path / "expected.jsonl")
+    export.export(expected, store=store, chunk_size=3)
+
+    path = str(tmp_path / "out.jsonl")
+
+    def interrupt(total):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        export.export(path, store=store, chunk_size=3, progress=interrupt)
+    with open(path, "ab") as f:
+        f.write(b'{"candidate_id": 4, "partly wri')
+
+    summary = export.export(path, store=store, chunk_size=3, resume=True)
+    assert summary["exported"] == 4 and summary["total"] == 7
+    assert _lines(path) == _lines(expected)
+
+
+def test_finished_export_appends_only_new_analyses(store, tmp_path):
+    path = str(tmp_path / "out.jsonl")
+    export.export(path, store=store, resume=True)
+    candidate_id = store.add_candidate("Candidate 7\nPython")
+    store.save_analysis(candidate_id, 1, {"candidate_name": "Candidate 7", "match_score": 99})
+    store.save_analysis(1, 1, {"candidate_name": "Candidate 0", "match_score": 5})
+
+    summary = export.export(path, store=store, resume=True)
+    assert summary["exported"] == 2 and summary["total"] == 9
+    assert [json.loads(line)["analysis"]["match_score"] for line in _lines(path)[-2:]] == [99, 5]
+    assert export.export(path, store=store, resume=True)["exported"] == 0
+
+
+def test_resume_refuses_different_settings(store, tmp_path):
+    path = str(tmp_path / "out.jsonl")
+    export.export(path, store=store, min_score=50)
+    with pytest.raises(ValueError):
+        export.export(path, store=store, resume=True, min_score=60)
+    with pytest.raises(ValueError):
+        export.export(path, source=export.JOBS, jd_id=1)
+
+
+def test_job_results_are_exported_in_finish_order(tmp_path):
+    jobs_db = str(tmp_path / "jobs.db")
+    conn = job_queue._connect(jobs_db)
+    try:
+        for score in (40, 90, 70):
+            job_queue.submit("analyze_resume", {}, db_path=jobs_db)
+            job_queue._finish(conn, job_queue._claim(conn), result={"match_score": score})
+        job_queue.submit("analyze_resume", {}, db_path=jobs_db)
+        job_queue._finish(conn, job_queue._claim(conn), error="boom")
+    finally:
+        conn.close()
+
+    path = str(tmp_path / "jobs.csv")
+    summary = export.export(path, source=export.JOBS, jobs_db_path=jobs_db, min_score=50)
+    assert summary["exported"] == 2
+    with open(path, newline="", encoding="utf-8") as f:
+        assert [row["match_score"] for row in csv.DictReader(f)] == ["90", "70"]
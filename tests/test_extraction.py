@@ -0,0 +1,49 @@
+import pytest
+
+from backend.extraction import extract_resume
+
+RESUME = """Jane Doe
+jane@example.com | Java, Docker
+
+SUMMARY
+Backend engineer working with Python.
+
+SIDE WORK
+Built a React front end on PostgreSQL.
+
+Experience
+Engineer at Acme (Jan 2020 - Present)
+Deployed services on Kubernetes with Terraform.
+"""
+
+
+def test_skills_outside_listed_sections_are_found():
+    skills = {skill.lower() for skill in extract_resume(RESUME, stages=["skills"])["skills"]}
+    assert {"java", "docker", "python", "react", "postgresql", "kubernetes", "terraform"} <= skills
+
+
+def test_contact_experience_and_sections_without_spacy():
+    text = RESUME + """
+Education
+BSc Computer Science, 2019
+
+Projects
+Resume parser
+github.com/jane-doe
+"""
+    result = extract_resume(text + "Call +1 (555) 123-4567 or see linkedin.com/in/jane-doe",
+                            stages=["contact", "experience", "sections"])
+    assert result["contact"] == {"email": "jane@example.com", "phone": "+1 (555) 123-4567",
+                                 "linkedin": "linkedin.com/in/jane-doe", "github": "github.com/jane-doe"}
+    assert result["experience"] == [
+        {"title": "Engineer", "company": "Acme", "start_date": "Jan 2020", "end_date": "Present"}
+    ]
+    assert result["education"] == ["BSc Computer Science, 2019"]
+    assert "Resume parser" in result["projects"]
+    # Stages that did not run keep their empty values.
+    assert result["name"] is None and result["skills"] == []
+
+
+def test_unknown_stage_is_rejected():
+    with pytest.raises(ValueError):
+        extract_resume(RESUME, stages=["contact", "salary"])
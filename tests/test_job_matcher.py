@@ -0,0 +1,110 @@
+import sys
+import types
+
+import numpy as np
+import pytest
+
+from backend import job_matcher
+from backend.job_matcher import JobIndex
+
+# MySQL is close to PostgreSQL (cosine 0.8); every other skill is unrelated.
+_VECTORS = {
+    "postgresql": [1.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+    "mysql": [0.8, 0.6, 0.0, 0.0, 0.0, 0.0, 0.0],
+    "python": [0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0],
+    "aws": [0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0],
+    "docker": [0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0],
+    "go": [0.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0],
+    "java": [0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0],
+}
+
+PYTHON_JD = "Python developer with PostgreSQL and AWS."
+GO_JD = "Go engineer with AWS and Docker."
+JAVA_JD = "Java developer, 3 years of MySQL."
+OFFICE_JD = "Office manager, friendly and organized."
+RESUME_SKILLS = ["python", "postgresql", "aws", "docker"]
+
+
+class _FakeEncoder:
+    def get_sentence_embedding_dimension(self):
+        return 7
+
+    def encode(self, texts, convert_to_numpy=True):
+        return np.array([_VECTORS[text] for text in texts], dtype=np.float32)
+
+
+@pytest.fixture(autouse=True)
+def comparator(monkeypatch):
+    module = types.ModuleType("backend.jd_comparator")
+    module.model = _FakeEncoder()
+    module.encode_skills = lambda skills: module.model.encode(skills)
+    monkeypatch.setitem(sys.modules, "backend.jd_comparator", module)
+
+
+def _reference_score(resume_skills, jd_skills):
+    """One JD scored the way jd_comparator.calculate_similarity does, skill by skill."""
+    if not jd_skills:
+        return 0.0
+    similarities = np.array([[float(np.dot(_VECTORS[r], _VECTORS[j])) for j in jd_skills] for r in resume_skills])
+    average = similarities.max(axis=1).mean()
+    coverage = (similarities.max(axis=0) > job_matcher.SKILL_MATCH_THRESHOLD).mean()
+    final = (average * 0.5 + coverage * 0.5) * 100
+    return round(100 * (1 - np.exp(-final / 30)), 1)
+
+
+def test_vectorized_scores_match_the_per_jd_formula():
+    index = JobIndex()
+    index.add_many([PYTHON_JD, GO_JD, JAVA_JD, OFFICE_JD])
+    scores, similarities = index.score(RESUME_SKILLS)
+    expected = [_reference_score(RESUME_SKILLS, list(job["skills"])) for job in index.jobs]
+    assert scores.tolist() == pytest.approx(expected, abs=0.1)
+    assert scores[3] == 0.0
+
+    java = index.skill_matches(2, RESUME_SKILLS, similarities)
+    assert java["missing_skills"] == ["java"]
+    assert java["matched_skills"] == [
+        {"skill": "mysql", "resume_skill": "postgresql", "similarity": 0.8, "required_months": 36}
+    ]
+
+
+def test_jds_are_keyed_by_id_else_by_text():
+    index = JobIndex()
+    assert index.add(PYTHON_JD, jd_id=1) != index.add(PYTHON_JD, jd_id=2)
+    assert index.add(GO_JD) == index.add(GO_JD)
+    assert len(index) == 3
+
+    position = index.add(JAVA_JD, jd_id=1, title="Java")
+    assert position == 0 and len(index) == 3
+    assert index.jobs[0]["skills"] == {"java": 36, "mysql": 36} and index.jobs[0]["title"] == "Java"
+
+
+def test_eviction_keeps_recent_jobs_and_their_skills(tmp_path):
+    index = JobIndex()
+    index.add_many([PYTHON_JD, GO_JD, JAVA_JD])
+    index.score(RESUME_SKILLS)
+    index.jobs[1]["used"] = 0
+    index.jobs[2]["used"] = 1
+    index.evict(2, keep=[1])
+    assert [job["text"] for job in index.jobs] == [PYTHON_JD, GO_JD]
+    assert "java" not in index.vocabulary and len(index.embeddings) == len(index.vocabulary)
+
+    path = str(tmp_path / "job_index.bin")
+    index.save(path)
+    loaded = JobIndex.load(path)
+    assert not index.dirty
+    assert loaded.score(RESUME_SKILLS)[0].tolist() == index.score(RESUME_SKILLS)[0].tolist()
+
+
+def test_match_jobs_ranks_only_the_given_jds(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_matcher, "DEFAULT_INDEX_PATH", str(tmp_path / "job_index.bin"))
+    monkeypatch.setattr(job_matcher, "_cached_index", None)
+    job_matcher.match_jobs({"skills": RESUME_SKILLS}, [JAVA_JD])
+
+    ranked = job_matcher.match_jobs({"skills": RESUME_SKILLS}, [
+        {"id": "go", "title": "Go", "text": GO_JD},
+        {"id": "py", "title": "Python", "text": PYTHON_JD},
+    ])
+    assert [job["id"] for job in ranked] == ["py", "go"]
+    assert ranked[1]["missing_skills"] == ["go"]
+    assert len(job_matcher.get_job_index()) == 3
+    assert len(JobIndex.load(job_matcher.DEFAULT_INDEX_PATH)) == 3
@@ -0,0 +1,92 @@
+import time
+
+import pytest
+
+import backend.candidate_store as candidate_store
+import backend.near_duplicates as near_duplicates
+from backend import job_queue
+
+JD = "Backend engineer with Python and PostgreSQL."
+RESUME = " ".join(f"Built service {i} in Python on PostgreSQL for team {i % 7}." for i in range(60))
+
+
+@pytest.fixture
+def stores(tmp_path, monkeypatch):
+    monkeypatch.setattr(candidate_store, "DEFAULT_DB_PATH", str(tmp_path / "candidates.db"))
+    monkeypatch.setattr(near_duplicates, "DEFAULT_DB_PATH", str(tmp_path / "near_duplicates.db"))
+    monkeypatch.setattr(near_duplicates, "DUPLICATE_MODE", near_duplicates.REUSE)
+    store, index = candidate_store.CandidateStore(), near_duplicates.NearDuplicateIndex()
+    candidate_id = store.add_candidate("Alice\n" + RESUME)
+    store.save_analysis(candidate_id, store.add_job_description(JD), {
+        "candidate_name": "Alice", "email": "alice@example.com", "phone": "+1 555 0100",
+        "linkedin_url": "linkedin.com/in/alice", "github_url": None, "match_score": 81,
+    })
+    index.add(candidate_id, "Alice\n" + RESUME)
+    store.close()
+    index.close()
+
+
+@pytest.mark.parametrize("entities, expected", [
+    ({"name": "Bob", "contact": {"email": "bob@example.com", "phone": None, "linkedin": None, "github": "github.com/bob"}},
+     {"candidate_name": "Bob", "email": "bob@example.com", "phone": None, "linkedin_url": None,
+      "github_url": "github.com/bob"}),
+    (None, {"candidate_name": None, "email": None, "phone": None, "linkedin_url": None, "github_url": None}),
+])
+def test_reused_analysis_takes_contact_details_from_the_new_resume(stores, monkeypatch, entities, expected):
+    monkeypatch.setattr(job_queue, "_parse_resume", lambda text: (entities, None))
+    analysis = job_queue._analyze_resume({"resume_text": "Bob\n" + RESUME, "jd_text": JD}, lambda *args: None)
+    assert "duplicate_of" in analysis and analysis["match_score"] == 81
+    assert {field: analysis[field] for field in expected} == expected
+
+
+@pytest.fixture
+def jobs_db(tmp_path):
+    return str(tmp_path / "jobs.db")
+
+
+def test_expired_lease_cannot_overwrite_the_new_owner(jobs_db):
+    job_id = job_queue.submit("analyze_resume", {"resume_text": "x"}, db_path=jobs_db)
+    conn = job_queue._connect(jobs_db)
+    try:
+        first = job_queue._claim(conn)
+        conn.execute("UPDATE jobs SET lease_expires = ? WHERE id = ?", (time.time() - 1, job_id))
+        second = job_queue._claim(conn)
+        assert second["id"] == job_id and second["lease_token"] != first["lease_token"]
+
+        job_queue.report_progress(job_id, 0.7, "stale", jobs_db, first["lease_token"])
+        assert job_queue.get_job(job_id, jobs_db)["message"] is None
+        assert not job_queue._finish(conn, first, error="stale worker")
+        assert job_queue._finish(conn, second, result={"match_score": 90})
+        assert not job_queue._finish(conn, first, result={"match_score": 10})
+    finally:
+        conn.close()
+    job = job_queue.get_job(job_id, jobs_db)
+    assert job["status"] == job_queue.DONE and job["result"] == {"match_score": 90} and job["attempts"] == 2
+
+
+def test_resubmitting_requeues_failed_and_degraded_jobs_only(jobs_db):
+    def run(key, result=None, error=None):
+        job_id = job_queue.submit("analyze_resume", {}, idempotency_key=key, db_path=jobs_db)
+        conn = job_queue._connect(jobs_db)
+        try:
+            job_queue._finish(conn, job_queue._claim(conn), result=result, error=error)
+        finally:
+            conn.close()
+        return job_id
+
+    done, failed, degraded = run("done", {"match_score": 1}), run("failed", error="boom"), run("degraded", {"degraded": True})
+    assert job_queue.submit("analyze_resume", {}, idempotency_key="done", db_path=jobs_db) == done
+    assert job_queue.get_job(done, jobs_db)["status"] == job_queue.DONE
+    for job_id, key in [(failed, "failed"), (degraded, "degraded")]:
+        assert job_queue.submit("analyze_resume", {}, idempotency_key=key, db_path=jobs_db) == job_id
+        job = job_queue.get_job(job_id, jobs_db)
+        assert job["status"] == job_queue.QUEUED and job["result"] is None and job["error"] is None
+
+
+def test_worker_runs_registered_tasks(jobs_db, monkeypatch):
+    monkeypatch.setitem(job_queue.TASKS, "double", lambda payload, progress: {"value": payload["value"] * 2})
+    job_id = job_queue.submit("double", {"value": 21}, db_path=jobs_db)
+    unknown = job_queue.submit("unknown", {}, db_path=jobs_db)
+    job_queue.run_worker(jobs_db, stop_after=2)
+    assert job_queue.get_job(job_id, jobs_db)["result"] == {"value": 42}
+    assert job_queue.get_job(unknown, jobs_db)["status"] == job_queue.FAILED
@@ -0,0 +1,71 @@
+import json
+import threading
+
+import pytest
+
+from backend import model_router
+from backend.model_router import BudgetExceeded, FakeBackend, ModelRouter, Tier
+
+
+def _fake_tier(name, failure_rate=0.0, latency=0.01):
+    return Tier(name, FakeBackend(f"fake-{name}", median_latency=latency, sigma=0, failure_rate=failure_rate), latency)
+
+
+def test_plan_starts_at_the_depth_tier_that_fits_the_budget():
+    router = model_router.build_router(model_router.FAKE, hedge=False, max_workers=2)
+    assert router.plan(1000, "quick", 45) == ["fast"]
+    assert router.plan(1000, "deep", 45) == ["deep", "standard", "fast"]
+    # The deep tier's 25s p95 plus 8s reserved for the standard tier exceed 30s.
+    assert router.plan(1000, "deep", 30) == ["standard", "fast"]
+    assert router.plan(model_router.FAST_TIER_MAX_CHARS + 1, "quick", 45) == ["standard", "fast"]
+
+
+def test_p95_uses_the_default_until_enough_samples():
+    tier = _fake_tier("fast", latency=4.0)
+    for seconds in range(model_router.MIN_SAMPLES - 1):
+        tier.record(seconds / 10)
+    assert tier.p95() == 4.0
+    tier.record(0.1)
+    assert tier.p95() == 0.8
+
+
+def test_slow_request_is_hedged_and_the_first_answer_wins():
+    release = threading.Event()
+    calls = []
+
+    class _SlowThenFast:
+        def generate(self, prompt, timeout):
+            calls.append(prompt)
+            if len(calls) == 1:
+                release.wait(timeout)
+                return "slow"
+            return "fast"
+
+    router = ModelRouter([Tier("fast", _SlowThenFast(), 0.05)], hedge=True, max_workers=2)
+    try:
+        result = router.generate("prompt", depth="quick", budget=5)
+    finally:
+        release.set()
+    assert result["text"] == "fast" and result["tier"] == "fast"
+    assert result["latency"] < 1 and router.stats["hedged"] == 1 and len(calls) == 2
+
+
+def test_failed_tier_falls_back_to_a_faster_one():
+    router = ModelRouter([_fake_tier("fast"), _fake_tier("standard", failure_rate=1.0)], hedge=False, max_workers=2)
+    result = router.generate("Python and AWS", depth="standard", budget=5)
+    assert result["tier"] == "fast"
+    assert router.stats["standard_failed"] == 1 and router.stats["fast"] == 1
+    assert json.loads(result["text"])["skills_analysis"]["technical_skills"]["matching"] == ["aws", "python"]
+
+
+def test_budget_exceeded_when_every_tier_fails():
+    router = ModelRouter([_fake_tier("fast", failure_rate=1.0), _fake_tier("standard", failure_rate=1.0)],
+                         hedge=False, max_workers=2)
+    with pytest.raises(BudgetExceeded, match="fast"):
+        router.generate("prompt", depth="standard", budget=5)
+    assert router.stats["budget_exceeded"] == 1
+
+
+def test_fake_responses_are_deterministic():
+    assert model_router.fake_analysis_response("a") == model_router.fake_analysis_response("a")
+    assert 0 <= json.loads(model_router.fake_analysis_response("b"))["match_score"] <= 100
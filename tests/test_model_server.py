@@ -0,0 +1,67 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import backend.models as models
+from backend import model_server
+
+
+class _FakeEncoder:
+    def get_sentence_embedding_dimension(self):
+        return 4
+
+    def encode(self, texts, convert_to_numpy=True):
+        return np.array([[len(text), 1, 0, 0] for text in texts], dtype=np.float32)
+
+
+class _FakeNLP:
+    meta = {"name": "fake"}
+
+
+def test_batcher_merges_concurrent_requests_and_keeps_order():
+    batches = []
+
+    def run_batch(texts):
+        batches.append(list(texts))
+        time.sleep(0.05)
+        return [text.upper() for text in texts]
+
+    batcher = model_server._Batcher(run_batch)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(batcher.submit, [f"a{i}", f"b{i}"]) for i in range(8)]
+        results = [future.result() for future in futures]
+    assert results == [[f"A{i}", f"B{i}"] for i in range(8)]
+    assert len(batches) < 8 and sum(len(batch) for batch in batches) == 16
+
+
+def test_batcher_passes_errors_to_every_caller():
+    def run_batch(texts):
+        raise ValueError("model failed")
+
+    with pytest.raises(ValueError, match="model failed"):
+        model_server._Batcher(run_batch).submit(["x"])
+
+
+def test_clients_encode_through_the_server(tmp_path, monkeypatch):
+    encoder = _FakeEncoder()
+    monkeypatch.setattr(models, "load_local_encoder", lambda *args: encoder)
+    monkeypatch.setattr(models, "load_local_nlp", lambda: _FakeNLP())
+    socket_path = str(tmp_path / "m.sock")
+    server = model_server.ModelServer(socket_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        client = model_server.connect(socket_path, force=True)
+        assert client.info["dimension"] == 4
+        remote = client.encoder()
+        assert remote.encode(["ab", "abcd"]).tolist() == [[2, 1, 0, 0], [4, 1, 0, 0]]
+        assert remote.encode("abc").tolist() == [3, 1, 0, 0]
+        with pytest.raises(RuntimeError, match="Unknown op"):
+            client.request({"op": "missing"})
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert model_server.connect(str(tmp_path / "none.sock"), force=True) is None
@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from backend.near_duplicates import NearDuplicateIndex, lsh_bands, minhash, similarity
+
+_rng = random.Random(3)
+_VOCABULARY = [f"word{i}" for i in range(2000)]
+
+
+def _resume():
+    return " ".join(_rng.choice(_VOCABULARY) for _ in range(400))
+
+
+def _edit(text, changes):
+    words = text.split()
+    for position in _rng.sample(range(len(words)), changes):
+        words[position] = "edited"
+    return " ".join(words)
+
+
+def test_minhash_estimates_jaccard_similarity():
+    text = _resume()
+    assert similarity(minhash(text), minhash(text)) == 1.0
+    assert similarity(minhash(text), minhash(_edit(text, 2))) > 0.9
+    assert similarity(minhash(text), minhash(_resume())) < 0.1
+
+
+@pytest.mark.parametrize("threshold", [0.5, 0.8, 0.9])
+def test_lsh_bands_center_the_collision_curve_on_the_threshold(threshold):
+    bands, rows = lsh_bands(threshold)
+    assert bands * rows <= 128
+    # The collision curve crosses 1/2 close to the threshold.
+    assert abs((1 / bands) ** (1 / rows) - threshold) < 0.15
+
+
+def test_index_finds_edited_resubmissions_only(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path / "near_duplicates.db"), threshold=0.9)
+    originals = [_resume() for _ in range(20)]
+    assert index.add_many(enumerate(originals)) == 20
+
+    matches = index.query(_edit(originals[4], 2))
+    assert [doc_id for doc_id, _ in matches] == [4] and matches[0][1] > 0.9
+    assert index.query(_resume()) == []
+
+    # Re-adding an id replaces its signature and buckets.
+    index.add(4, _resume())
+    assert index.query(originals[4]) == [] and len(index) == 20
+    index.close()
+
+    reopened = NearDuplicateIndex(str(tmp_path / "near_duplicates.db"), threshold=0.8)
+    assert [doc_id for doc_id, _ in reopened.query(originals[7])] == [7]
+    reopened.close()
@@ -0,0 +1,77 @@
+import glob
+import os
+import pstats
+import threading
+
+from backend import load_test, profiling
+from backend.load_test import format_report, percentile
+from backend.profiling import StackSampler, profiled
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(value) for value in range(100, 0, -1)]
+    assert percentile(values, 0.5) == 50.0
+    assert percentile(values, 0.95) == 95.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([3.0], 0.99) == 3.0
+    assert percentile([], 0.5) is None
+
+
+def test_report_shows_missing_stages_as_dashes():
+    report = {
+        "sessions": 2, "seconds": 1.5, "requests": 3, "failed": 1, "degraded": 0, "throughput": 2.0,
+        "latency": {"extract_text": {"p50": 0.1, "p95": 0.2, "p99": 0.2, "max": 0.25},
+                    load_test.TOTAL: {"p50": None, "p95": None, "p99": None, "max": None}},
+        "errors": {"No text extracted from a.pdf": 1},
+        "memory": [(0.0, 100.0, 0), (1.5, 120.5, 3)],
+    }
+    text = format_report(report)
+    assert "3 requests from 2 sessions in 1.5s: 2.00 req/s, 1 failed" in text
+    assert "    0.100s    0.200s" in text
+    assert f"{load_test.TOTAL:<24}{'-':>10}" in text
+    assert "1 x No text extracted from a.pdf" in text
+
+
+def test_profiled_is_a_no_op_unless_enabled(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(profiling, "PROFILE_MODE", "")
+    with profiled("request"):
+        sum(range(1000))
+    assert os.listdir(tmp_path) == []
+
+    def profiled_work():
+        return sorted(range(1000), key=lambda value: -value)
+
+    monkeypatch.setattr(profiling, "PROFILE_MODE", profiling.CPROFILE)
+    monkeypatch.setattr(profiling, "PROFILE_SAMPLE_RATE", 1.0)
+    with profiled("request"):
+        profiled_work()
+    dumps = glob.glob(str(tmp_path / "request-*.prof"))
+    assert len(dumps) == 1
+    assert any(name == "profiled_work" for _, _, name in pstats.Stats(dumps[0]).stats)
+
+
+def test_stack_sampler_writes_folded_stacks(tmp_path):
+    release = threading.Event()
+
+    def waiting_for_release():
+        release.wait()
+
+    worker = threading.Thread(target=waiting_for_release)
+    worker.start()
+    sampler = StackSampler(interval=0.005, path=str(tmp_path / "stacks.folded"))
+    sampler.start()
+    try:
+        while not any("waiting_for_release" in stack for stack in list(sampler.counts)):
+            release.wait(0.01)
+    finally:
+        sampler.stop()
+        release.set()
+        worker.join()
+    assert not sampler.running
+
+    with open(sampler.path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    stack, count = next(line for line in lines if "waiting_for_release" in line).rsplit(" ", 1)
+    assert int(count) >= 1
+    assert stack.index("test_profiling.py:waiting_for_release") < stack.index("threading.py:wait")
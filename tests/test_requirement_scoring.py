@@ -0,0 +1,93 @@
+import sys
+import types
+
+import numpy as np
+import pytest
+
+from backend import requirement_scoring
+from backend.candidate_store import CandidateStore
+from backend.requirement_scoring import RequirementScorer, requirement_hash, requirement_weight, split_requirements
+
+# MySQL sits at cosine 0.8 from PostgreSQL, so it earns partial credit; the rest are unrelated.
+_VECTORS = {
+    "postgresql": [1.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+    "mysql": [0.8, 0.6, 0.0, 0.0, 0.0, 0.0],
+    "python": [0.0, 0.0, 1.0, 0.0, 0.0, 0.0],
+    "docker": [0.0, 0.0, 0.0, 1.0, 0.0, 0.0],
+    "kubernetes": [0.0, 0.0, 0.0, 0.0, 1.0, 0.0],
+}
+
+
+class _FakeEncoder:
+    def get_sentence_embedding_dimension(self):
+        return 6
+
+    def encode(self, texts, convert_to_numpy=True):
+        return np.array([_VECTORS.get(text, [0.0] * 5 + [1.0]) for text in texts], dtype=np.float32)
+
+
+JD = """Requirements:
+- 5+ years of Python
+- MySQL experience required.
+- Kubernetes experience is a plus
+- Docker
+"""
+
+
+@pytest.fixture
+def scorer(tmp_path, monkeypatch):
+    comparator = types.ModuleType("backend.jd_comparator")
+    comparator.model = _FakeEncoder()
+    comparator.encode_skills = lambda skills: comparator.model.encode(skills)
+    monkeypatch.setitem(sys.modules, "backend.jd_comparator", comparator)
+    store = CandidateStore(str(tmp_path / "candidates.db"))
+    yield RequirementScorer(store)
+    store.close()
+
+
+def _add_candidate(store, text, **skills):
+    entities = {"categorized_skills": {"Skills": [
+        {"name": name, "experience": months} for name, months in skills.items()
+    ]}}
+    return store.add_candidate(text, entities)
+
+
+def test_requirements_are_split_from_bullets_and_sentences():
+    text = "About us:\n* 5+ years of Python. Docker experience is nice to have\nTeam\n1. 5+ years of python."
+    assert split_requirements(text) == ["5+ years of Python.", "Docker experience is nice to have"]
+    assert requirement_hash("- 5+ Years of  Python") == requirement_hash("5+ years of python")
+    assert requirement_weight("Docker experience is nice to have") == requirement_scoring.OPTIONAL_WEIGHT
+    assert requirement_weight("5+ years of Python") == 1.0
+
+
+def test_score_weighs_each_requirement(scorer):
+    alice = _add_candidate(scorer.store, "Alice", python=36, postgresql=24, docker=0)
+    bob = _add_candidate(scorer.store, "Bob")
+    scores = scorer.rescore(JD)
+    # Python 36/60 months, MySQL via PostgreSQL at 0.8, no Kubernetes (half weight), Docker.
+    assert scores == {alice: round(100 * (0.6 + 0.8 + 0 + 1) / 3.5, 1), bob: 0.0}
+
+    jd_id = scorer.conn.execute("SELECT MAX(jd_id) FROM requirement_scores").fetchone()[0]
+    breakdown = scorer.breakdown(alice, jd_id)
+    assert [row["requirement"] for row in breakdown] == [
+        "5+ years of Python", "MySQL experience required.", "Kubernetes experience is a plus", "Docker",
+    ]
+    assert [row["matched_skills"] for row in breakdown] == [["python"], ["postgresql"], [], ["docker"]]
+    assert [row["weight"] for row in breakdown] == [1.0, 1.0, 0.5, 1.0]
+
+
+def test_edited_jd_rematches_only_changed_requirements(scorer, monkeypatch):
+    alice = _add_candidate(scorer.store, "Alice", python=36, postgresql=24, docker=0)
+    scorer.rescore(JD)
+    previous_jd_id = scorer.conn.execute("SELECT MAX(jd_id) FROM requirement_scores").fetchone()[0]
+    _add_candidate(scorer.store, "Carol", kubernetes=12)
+
+    matched = []
+    original = scorer._match
+    monkeypatch.setattr(scorer, "_match", lambda requirement, profile: (
+        matched.append(requirement["text"]) or original(requirement, profile)
+    ))
+    scores = scorer.rescore(JD.replace("5+ years", "2+ years"), previous_jd_id=previous_jd_id)
+    # Carol was not scored against the previous JD, and Alice's other matches are reused.
+    assert matched == ["2+ years of Python"]
+    assert scores == {alice: round(100 * (1 + 0.8 + 0 + 1) / 3.5, 1)}
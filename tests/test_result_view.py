@@ -0,0 +1,20 @@
+from backend.result_view import ranked_rows, text_pages
+
+
+def test_text_pages_end_at_line_breaks_and_cover_the_text():
+    text = "".join(f"line {i}\n" for i in range(100))
+    pages = text_pages(text, page_chars=50)
+    assert pages[0][0] == 0 and pages[-1][1] == len(text)
+    assert all(end == next_start for (_, end), (next_start, _) in zip(pages, pages[1:]))
+    assert all(text[end - 1] == "\n" for _, end in pages)
+    assert text_pages("") == [(0, 0)]
+    assert text_pages("x" * 120, page_chars=50) == [(0, 50), (50, 100), (100, 120)]
+
+
+def test_ranked_rows_show_email_only_when_asked():
+    analyses = [{"candidate_id": 7, "name": None, "email": "a@example.com", "match_score": 88,
+                 "result": {"skills_analysis": {"technical_skills": {"matching": ["Go"], "missing": ["AWS", "K8s"]}}}}]
+    row = ranked_rows(analyses, offset=50)[0]
+    assert "Email" not in row
+    assert row == {"Rank": 51, "Candidate": "#7", "Score": 88, "Matching": 1, "Missing": 2, "Top gaps": "AWS, K8s"}
+    assert ranked_rows(analyses, show_email=True)[0]["Email"] == "a@example.com"
@@ -0,0 +1,52 @@
+from backend.section_segmenter import canonical_section, join_sections, segment, select
+
+RESUME = """Jane Doe
+jane@example.com
+
+Experience
+
+IBM
+Software Engineer, 2018 - 2020
+Built data pipelines.
+
+AWS
+Senior Engineer, 2020 - 2023
+Ran Kubernetes clusters.
+
+RESEARCH PUBLICATIONS
+Paper on distributed systems.
+"""
+
+
+def _sections(text):
+    return [(section.name, text[section.start:section.end].strip()) for section in segment(text)]
+
+
+def test_all_caps_employers_stay_in_experience():
+    sections = _sections(RESUME)
+    assert [name for name, _ in sections] == ["header", "experience", "other"]
+    experience = sections[1][1]
+    assert "IBM" in experience and "AWS" in experience and "Ran Kubernetes clusters." in experience
+
+
+def test_all_caps_heading_with_section_word_starts_a_section():
+    assert _sections(RESUME)[-1] == ("other", "Paper on distributed systems.")
+
+
+def test_heading_variants_and_inline_content():
+    text = "Jane\n\n1. Work History\nAcme\n\n## Skills & Tools: Python, SQL\nDocker\n\n• Hobbies\nChess\n"
+    sections = _sections(text)
+    assert sections == [("header", "Jane"), ("experience", "Acme"), ("skills", "Python, SQL\nDocker"),
+                        ("interests", "Chess")]
+    assert canonical_section("Licenses  &  Certifications") == "certifications"
+    assert canonical_section("Side quests") == "other"
+
+
+def test_sections_cover_the_text_and_join_with_headings():
+    text = "Summary\nBuilds things.\n\nEducation\nBSc\n\nEducation and Training\nAWS course\n"
+    sections = segment(text)
+    assert sections[0].heading_start == 0 and sections[-1].end == len(text)
+    assert all(a.end == b.heading_start for a, b in zip(sections, sections[1:]))
+    education = select(sections, ["education"])
+    assert join_sections(text, education) == "BSc\n\nAWS course"
+    assert join_sections(text, education, headings=True) == "Education\nBSc\n\nEducation and Training\nAWS course"
@@ -0,0 +1,51 @@
+import pytest
+
+from backend.candidate_store import CandidateStore
+from backend.skill_index import Bitmap, SkillIndex
+
+
+def _entities(*skills):
+    return {"categorized_skills": {"Skills": [{"name": skill} for skill in skills]}}
+
+
+def test_bitmap_set_operations_across_chunks():
+    left, right = Bitmap.from_ids([1, 5, 70000, 200000]), Bitmap.from_ids([5, 70000, 70001])
+    assert list(left & right) == [5, 70000]
+    assert list(left | right) == [1, 5, 70000, 70001, 200000]
+    assert list(left - right) == [1, 200000]
+    left.discard(200000)
+    assert 200000 not in left and len(left) == 3
+    assert list(Bitmap.from_bytes(left.to_bytes())) == [1, 5, 70000]
+
+
+def test_boolean_queries():
+    index = SkillIndex()
+    index.add(1, ["Python", "AWS"])
+    index.add(2, ["python", "GCP", "Java"])
+    index.add(3, ["Java"])
+    assert list(index.query("python AND (aws OR gcp) AND NOT java")) == [1]
+    assert list(index.query("NOT python")) == [3]
+    assert list(index.query("")) == [1, 2, 3]
+    with pytest.raises(ValueError):
+        index.query("python AND (aws")
+
+
+def test_sync_picks_up_reparsed_candidates(tmp_path):
+    store = CandidateStore(str(tmp_path / "candidates.db"))
+    try:
+        alice = store.add_candidate("Alice's resume", _entities("Python"))
+        bob = store.add_candidate("Bob's resume", _entities("Java"))
+        index = SkillIndex()
+        assert index.sync(store) == 2
+        assert index.sync(store) == 0
+
+        store.add_candidate("Alice's resume", _entities("Go", "Docker"))
+        path = str(tmp_path / "skill_index.bin")
+        index.save(path)
+        index = SkillIndex.load(path)
+        assert index.sync(store) == 1
+        assert list(index.query("go AND docker")) == [alice]
+        assert list(index.query("python")) == []
+        assert list(index.query("java")) == [bob]
+    finally:
+        store.close()
@@ -0,0 +1,54 @@
+import pytest
+
+from backend.skill_matcher import SkillMatcher, extract_skills
+
+CATEGORIES = {
+    "Languages": ["go", "c++", "python"],
+    "Web": ["node.js"],
+    "ML": ["machine learning", "deep learning"],
+    "Data": ["sql"],
+}
+SYNONYMS = {"golang": "go", "nodejs": "node.js", "ml": "machine learning", "deep neural networks": "deep learning"}
+
+
+@pytest.fixture
+def matcher():
+    return SkillMatcher(CATEGORIES, SYNONYMS)
+
+
+def _found(matcher, text):
+    return [skill for skill, _, _ in matcher.find(text)]
+
+
+def test_multi_word_skills_and_synonyms(matcher):
+    text = "Applied Machine   Learning and deep neural networks; services in Golang and NodeJS."
+    assert _found(matcher, text) == ["machine learning", "deep learning", "go", "node.js"]
+
+
+def test_offsets_point_into_the_original_text(matcher):
+    text = "Wrote C++ and Node.js."
+    assert [text[start:end] for _, start, end in matcher.find(text)] == ["C++", "Node.js"]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Worked at Google on Gopher tooling", []),
+    ("My go-to language; planned the go-live", []),
+    ("Tuned T-SQL stored procedures", []),
+    ("Built Python-based and ML-driven services", ["python", "machine learning"]),
+    ("Languages: Go, SQL.", ["go", "sql"]),
+    ("go", ["go"]),
+])
+def test_matches_stay_on_word_boundaries(matcher, text, expected):
+    assert _found(matcher, text) == expected
+
+
+def test_experience_is_read_from_the_same_sentence(matcher):
+    result = matcher.extract("Five years of Python. Some Go.\nSQL for 18 months")
+    experience = {skill["name"]: skill["experience"]
+                  for skills in result["categorized_skills"].values() for skill in skills}
+    assert experience == {"python": 60, "go": 0, "sql": 18}
+
+
+def test_taxonomy_synonyms_are_matched():
+    assert {"typescript", "kubernetes", "node.js"} <= set(extract_skills("TS on k8s with Node")["skills"])
+
@@ -0,0 +1,36 @@
+import json
+import os
+
+import backend.taxonomy as taxonomy
+from backend.taxonomy import compile_taxonomy, get_taxonomy, load_config, load_taxonomy
+
+
+def test_synonyms_map_to_canonical_skills():
+    current = get_taxonomy()
+    for alias, canonical in {"ts": "typescript", "node": "node.js", "dl": "deep learning",
+                             "k8s": "kubernetes", "Golang": "go"}.items():
+        assert current.canonical(alias.lower()) == canonical
+
+
+def test_recompiled_artifact_is_picked_up(tmp_path, monkeypatch):
+    config_path, artifact_path = str(tmp_path / "skills.json"), str(tmp_path / "taxonomy.bin")
+    config = load_config()
+    with open(config_path, "w", encoding="utf-8") as f:
+        json.dump(config, f)
+    compile_taxonomy(config_path, artifact_path, with_embeddings=False)
+    monkeypatch.setattr(taxonomy, "ARTIFACT_PATH", artifact_path)
+    monkeypatch.setattr(taxonomy, "RELOAD_INTERVAL", 0.0)
+    monkeypatch.setattr(taxonomy, "_current", None)
+    monkeypatch.setattr(taxonomy, "_current_mtime", None)
+    assert get_taxonomy().canonical("tf") == "tf"
+
+    config["synonyms"]["tf"] = "tensorflow"
+    config["version"] += 1
+    with open(config_path, "w", encoding="utf-8") as f:
+        json.dump(config, f)
+    compile_taxonomy(config_path, artifact_path, with_embeddings=False)
+    # mtime resolution can be coarse; make the change visible regardless.
+    stat = os.stat(artifact_path)
+    os.utime(artifact_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert get_taxonomy().canonical("tf") == "tensorflow"
+    assert load_taxonomy(artifact_path).version == config["version"]